@@ -4,9 +4,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from metrics import TimedQueuePool, register_pool
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, echo=True, poolclass=TimedQueuePool, pool_logging_name="primary")
+register_pool("primary", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
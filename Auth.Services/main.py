@@ -4,6 +4,7 @@ load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from metrics import PrometheusMiddleware, metrics_response
 from routes import adminRouter, authRouter
 
 app = FastAPI()
@@ -18,10 +19,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return metrics_response()
+
 app.include_router(adminRouter)
 app.include_router(authRouter)
\ No newline at end of file
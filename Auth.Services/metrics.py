@@ -0,0 +1,81 @@
+"""Prometheus metrics for the Auth Service, served at GET /metrics"""
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_REQUEST_ERRORS = Counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx or an unhandled exception", ["method", "route"]
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["pool"])
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use", ["pool"])
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool size", ["pool"])
+
+
+class PrometheusMiddleware:
+    """Latency, in-flight and 5xx metrics per route template (/admin/users/{user_id}/status is one series)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route_path = getattr(scope.get("route"), "path", "<unmatched>")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status)).observe(
+                time.perf_counter() - start
+            )
+            if status >= 500:
+                HTTP_REQUEST_ERRORS.labels(scope["method"], route_path).inc()
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.logging_name or "default").observe(time.perf_counter() - start)
+
+
+def register_pool(name: str, engine: Engine) -> None:
+    """Report the engine's pool size and usage, read at scrape time"""
+    DB_POOL_SIZE.labels(name).set_function(lambda: engine.pool.size())
+    DB_POOL_CHECKED_OUT.labels(name).set_function(lambda: engine.pool.checkedout())
+    DB_POOL_OVERFLOW.labels(name).set_function(lambda: max(engine.pool.overflow(), 0))
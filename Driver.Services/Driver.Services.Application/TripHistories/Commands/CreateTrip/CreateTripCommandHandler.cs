@@ -29,6 +29,14 @@ public class CreateTripCommandHandler : IRequestHandler<CreateTripCommand, Resul
         CancellationToken cancellationToken
     )
     {
+        // Order.Services retries this call from its outbox, so a repeat for an order
+        // that already has a trip returns that trip instead of failing on OrderId
+        var existing = await _tripRepository.GetByOrderIdAsync(request.OrderId, cancellationToken);
+        if (existing != null)
+        {
+            return Result.Success(existing.Id);
+        }
+
         // Check if order has any rejected trip history
         var tripQuery = await _tripRepository.GetAllAsync(cancellationToken);
 
@@ -61,9 +69,10 @@ public class CreateTripCommandHandler : IRequestHandler<CreateTripCommand, Resul
             );
         }
 
+        TripHistory? trip = null;
         try
         {
-            var trip = TripHistory.Create(
+            trip = TripHistory.Create(
                 selectedDriver.Id,
                 request.OrderId,
                 request.PickupAddress,
@@ -81,6 +90,17 @@ public class CreateTripCommandHandler : IRequestHandler<CreateTripCommand, Resul
 
             return Result.Success(trip.Id);
         }
+        catch (DbUpdateException ex)
+        {
+            // A concurrent request for the same order won the unique index on OrderId
+            _tripRepository.Remove(trip!);
+            var concurrent = await _tripRepository.GetByOrderIdAsync(request.OrderId, cancellationToken);
+            if (concurrent != null)
+            {
+                return Result.Success(concurrent.Id);
+            }
+            return Result.Failure<string>(Error.Validation("Trip.CreateFailed", ex.Message));
+        }
         catch (Exception ex)
         {
             return Result.Failure<string>(Error.Validation("Trip.CreateFailed", ex.Message));
@@ -0,0 +1,34 @@
+"""add order keyset pagination indexes
+
+Revision ID: a3c9d2e1f4b7
+Revises: 7e45c36f616b
+Create Date: 2026-10-18 09:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9d2e1f4b7'
+down_revision: Union[str, Sequence[str], None] = '7e45c36f616b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_driver_id_created_at_id', 'orders', ['driver_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_restaurant_id_created_at_id', 'orders', ['restaurant_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_restaurant_id_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_driver_id_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
@@ -0,0 +1,30 @@
+"""add order outbox done index
+
+Revision ID: a6c2e9f4d813
+Revises: c8e3a5d1f247
+Create Date: 2026-10-18 21:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e9f4d813'
+down_revision: Union[str, Sequence[str], None] = 'c8e3a5d1f247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_outbox_done_processed_at', 'order_outbox', ['processed_at'], unique=False,
+                    postgresql_where=sa.text("status = 'done'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_outbox_done_processed_at', table_name='order_outbox',
+                  postgresql_where=sa.text("status = 'done'"))
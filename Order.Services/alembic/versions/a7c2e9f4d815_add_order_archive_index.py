@@ -0,0 +1,38 @@
+"""add order archive index
+
+Revision ID: a7c2e9f4d815
+Revises: f3a8d1c6b702
+Create Date: 2026-10-18 18:14:32.560917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e9f4d815'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d1c6b702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_archive_index',
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('segment', sa.String(length=255), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+    op.create_index('ix_order_archive_index_user_id_created_at_order_id', 'order_archive_index',
+                    ['user_id', 'created_at', 'order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_archive_index_user_id_created_at_order_id', table_name='order_archive_index')
+    op.drop_table('order_archive_index')
@@ -0,0 +1,35 @@
+"""add restaurant daily sales rollup
+
+Revision ID: b4d1f7a2c936
+Revises: a7c2e9f4d815
+Create Date: 2026-10-18 19:03:11.904582
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d1f7a2c936'
+down_revision: Union[str, Sequence[str], None] = 'a7c2e9f4d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('restaurant_daily_sales',
+    sa.Column('restaurant_id', sa.String(length=255), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('gross', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('restaurant_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('restaurant_daily_sales')
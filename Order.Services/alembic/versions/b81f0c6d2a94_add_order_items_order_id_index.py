@@ -0,0 +1,28 @@
+"""add order_items order_id index
+
+Revision ID: b81f0c6d2a94
+Revises: a3c9d2e1f4b7
+Create Date: 2026-10-18 10:04:17.882310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f0c6d2a94'
+down_revision: Union[str, Sequence[str], None] = 'a3c9d2e1f4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
@@ -0,0 +1,41 @@
+"""add order counters
+
+Revision ID: c5e27a9b1d03
+Revises: b81f0c6d2a94
+Create Date: 2026-10-18 11:37:02.114583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e27a9b1d03'
+down_revision: Union[str, Sequence[str], None] = 'b81f0c6d2a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_counters',
+    sa.Column('scope', sa.String(length=300), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    # Seed counters from existing orders
+    op.execute(
+        "INSERT INTO order_counters (scope, count) "
+        "SELECT 'all', count(*) FROM orders"
+    )
+    op.execute(
+        "INSERT INTO order_counters (scope, count) "
+        "SELECT 'user:' || user_id, count(*) FROM orders GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_counters')
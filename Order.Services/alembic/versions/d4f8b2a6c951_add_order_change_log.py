@@ -0,0 +1,118 @@
+"""add order change log
+
+Revision ID: d4f8b2a6c951
+Revises: a6c2e9f4d813
+Create Date: 2026-10-18 21:40:17.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8b2a6c951'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e9f4d813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CURRENT_XID = "pg_current_xact_id()::text::bigint"
+
+# Statement-level triggers with transition tables: one INSERT ... SELECT per statement,
+# however many orders it touched. Every scope an order is in after the statement gets
+# a present row; every scope it left (delete, archive, reassignment) gets a removal row.
+RECORD_CHANGES_FUNCTION = f"""
+CREATE FUNCTION record_order_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO order_changes (scope, order_id, xid, present)
+        SELECT s.scope, n.id, {CURRENT_XID}, true
+        FROM new_orders n
+        CROSS JOIN LATERAL (VALUES ('restaurant:' || n.restaurant_id), ('driver:' || n.driver_id)) AS s(scope)
+        WHERE s.scope IS NOT NULL;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO order_changes (scope, order_id, xid, present)
+        SELECT s.scope, n.id, {CURRENT_XID}, s.present
+        FROM new_orders n
+        JOIN old_orders o ON o.id = n.id
+        CROSS JOIN LATERAL (VALUES
+            ('restaurant:' || n.restaurant_id, true),
+            ('driver:' || n.driver_id, true),
+            (CASE WHEN o.restaurant_id IS DISTINCT FROM n.restaurant_id THEN 'restaurant:' || o.restaurant_id END, false),
+            (CASE WHEN o.driver_id IS DISTINCT FROM n.driver_id THEN 'driver:' || o.driver_id END, false)
+        ) AS s(scope, present)
+        WHERE s.scope IS NOT NULL;
+    ELSE
+        INSERT INTO order_changes (scope, order_id, xid, present)
+        SELECT s.scope, o.id, {CURRENT_XID}, false
+        FROM old_orders o
+        CROSS JOIN LATERAL (VALUES ('restaurant:' || o.restaurant_id), ('driver:' || o.driver_id)) AS s(scope)
+        WHERE s.scope IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Transition tables allow a single event per trigger
+TRIGGERS = [
+    ("orders_record_insert", "INSERT", "REFERENCING NEW TABLE AS new_orders"),
+    ("orders_record_update", "UPDATE", "REFERENCING OLD TABLE AS old_orders NEW TABLE AS new_orders"),
+    ("orders_record_delete", "DELETE", "REFERENCING OLD TABLE AS old_orders"),
+]
+
+# Existing orders enter the log as present in their scopes, so an empty since token still lists them
+BACKFILL = f"""
+INSERT INTO order_changes (scope, order_id, xid, present)
+SELECT s.scope, o.id, {CURRENT_XID}, true
+FROM orders o
+CROSS JOIN LATERAL (VALUES ('restaurant:' || o.restaurant_id), ('driver:' || o.driver_id)) AS s(scope)
+WHERE s.scope IS NOT NULL
+ORDER BY o.updated_at, o.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_changes',
+    sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('scope', sa.String(length=300), nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('xid', sa.BigInteger(), nullable=False),
+    sa.Column('present', sa.Boolean(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_order_changes_scope_xid_seq', 'order_changes', ['scope', 'xid', 'seq'], unique=False)
+    op.create_index('ix_order_changes_xid_seq', 'order_changes', ['xid', 'seq'], unique=False)
+    op.create_index('ix_order_changes_scope_order_id_seq', 'order_changes', ['scope', 'order_id', 'seq'], unique=False)
+    op.create_index('ix_order_changes_removed_recorded_at', 'order_changes', ['recorded_at'], unique=False,
+                    postgresql_where=sa.text('NOT present'))
+
+    op.execute(RECORD_CHANGES_FUNCTION)
+    for name, event, referencing in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON orders {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION record_order_changes()"
+        )
+    op.execute(BACKFILL)
+
+    # The feed no longer reads orders by updated_at
+    op.drop_index('ix_orders_driver_id_updated_at_id', table_name='orders')
+    op.drop_index('ix_orders_restaurant_id_updated_at_id', table_name='orders')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_orders_restaurant_id_updated_at_id', 'orders', ['restaurant_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_orders_driver_id_updated_at_id', 'orders', ['driver_id', 'updated_at', 'id'], unique=False)
+    for name, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON orders")
+    op.execute("DROP FUNCTION record_order_changes()")
+    op.drop_index('ix_order_changes_removed_recorded_at', table_name='order_changes',
+                  postgresql_where=sa.text('NOT present'))
+    op.drop_index('ix_order_changes_scope_order_id_seq', table_name='order_changes')
+    op.drop_index('ix_order_changes_xid_seq', table_name='order_changes')
+    op.drop_index('ix_order_changes_scope_xid_seq', table_name='order_changes')
+    op.drop_table('order_changes')
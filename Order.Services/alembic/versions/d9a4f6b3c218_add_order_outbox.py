@@ -0,0 +1,43 @@
+"""add order outbox
+
+Revision ID: d9a4f6b3c218
+Revises: c5e27a9b1d03
+Create Date: 2026-10-18 13:52:29.640117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4f6b3c218'
+down_revision: Union[str, Sequence[str], None] = 'c5e27a9b1d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_outbox',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('event_type', sa.String(length=30), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_outbox_pending', 'order_outbox', ['available_at'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_outbox_pending', table_name='order_outbox',
+                  postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('order_outbox')
@@ -0,0 +1,30 @@
+"""add order change feed indexes
+
+Revision ID: e2b7c4a9f501
+Revises: d9a4f6b3c218
+Create Date: 2026-10-18 15:21:08.407736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4a9f501'
+down_revision: Union[str, Sequence[str], None] = 'd9a4f6b3c218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_restaurant_id_updated_at_id', 'orders', ['restaurant_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_orders_driver_id_updated_at_id', 'orders', ['driver_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_driver_id_updated_at_id', table_name='orders')
+    op.drop_index('ix_orders_restaurant_id_updated_at_id', table_name='orders')
@@ -0,0 +1,39 @@
+"""shard all orders counter
+
+Revision ID: e7a3c1f9b524
+Revises: d4f8b2a6c951
+Create Date: 2026-10-18 22:31:05.274118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c1f9b524'
+down_revision: Union[str, Sequence[str], None] = 'd4f8b2a6c951'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARDS = 16  # crud.ORDER_COUNTER_SHARDS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The existing total becomes shard 0; every shard row exists so reads never fall back to COUNT(*)
+    op.execute("UPDATE order_counters SET scope = 'all:0' WHERE scope = 'all'")
+    op.execute(
+        "INSERT INTO order_counters (scope, count) "
+        f"SELECT 'all:' || shard, 0 FROM generate_series(0, {SHARDS - 1}) AS shard "
+        "ON CONFLICT (scope) DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "INSERT INTO order_counters (scope, count) "
+        "SELECT 'all', sum(count) FROM order_counters WHERE scope LIKE 'all:%' HAVING count(*) > 0"
+    )
+    op.execute("DELETE FROM order_counters WHERE scope LIKE 'all:%'")
@@ -0,0 +1,156 @@
+"""partition orders and order_items by month
+
+Revision ID: f3a8d1c6b702
+Revises: e2b7c4a9f501
+Create Date: 2026-10-18 17:02:45.118204
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d1c6b702'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c4a9f501'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created past the current one; app.services.partitions keeps extending this
+MONTHS_AHEAD = 3
+
+ORDER_INDEXES = [
+    ('ix_orders_user_id', ['user_id']),
+    ('ix_orders_restaurant_id', ['restaurant_id']),
+    ('ix_orders_driver_id', ['driver_id']),
+    ('ix_orders_created_at_id', ['created_at', 'id']),
+    ('ix_orders_user_id_created_at_id', ['user_id', 'created_at', 'id']),
+    ('ix_orders_driver_id_created_at_id', ['driver_id', 'created_at', 'id']),
+    ('ix_orders_restaurant_id_created_at_id', ['restaurant_id', 'created_at', 'id']),
+    ('ix_orders_restaurant_id_updated_at_id', ['restaurant_id', 'updated_at', 'id']),
+    ('ix_orders_driver_id_updated_at_id', ['driver_id', 'updated_at', 'id']),
+]
+
+ORDER_COLUMNS = (
+    'id, user_id, restaurant_id, driver_id, status, payment_status, payment_method, '
+    'delivery_address, delivery_note, subtotal, delivery_fee, discount, total_amount, created_at, updated_at'
+)
+ITEM_COLUMNS = 'id, order_id, product_id, product_name, quantity, unit_price, note, created_at'
+
+
+def _order_columns(created_at_nullable: bool):
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.String(length=255), nullable=False),
+        sa.Column('restaurant_id', sa.String(length=255), nullable=False),
+        sa.Column('driver_id', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=30), nullable=False),
+        sa.Column('payment_status', sa.String(length=20), nullable=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=True),
+        sa.Column('delivery_address', sa.Text(), nullable=False),
+        sa.Column('delivery_note', sa.Text(), nullable=True),
+        sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('delivery_fee', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('discount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=created_at_nullable),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def _item_columns():
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('order_id', sa.UUID(), nullable=False),
+        sa.Column('product_id', sa.String(length=255), nullable=False),
+        sa.Column('product_name', sa.String(length=255), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    for name, columns in ORDER_INDEXES:
+        op.create_index(name, 'orders', columns, unique=False)
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    first = bind.execute(sa.text("SELECT min(created_at) FROM orders")).scalar() or now
+    first = datetime(min(first, now).year, min(first, now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+
+    op.create_table('orders_partitioned', *_order_columns(False), postgresql_partition_by='RANGE (created_at)')
+    op.create_table(
+        'order_items_partitioned',
+        *_item_columns(),
+        sa.Column('order_created_at', sa.DateTime(), nullable=False),
+        postgresql_partition_by='RANGE (order_created_at)',
+    )
+    for table in ('orders', 'order_items'):
+        month = first
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table}_partitioned "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+            )
+            month = _add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table}_partitioned DEFAULT")
+
+    # created_at was nullable; such rows are filed under the migration time, in UTC like the rest
+    created_at = "COALESCE(created_at, (now() AT TIME ZONE 'utc')),"
+    op.execute(
+        f"INSERT INTO orders_partitioned ({ORDER_COLUMNS}) "
+        f"SELECT {ORDER_COLUMNS.replace('created_at,', created_at)} FROM orders"
+    )
+    op.execute(
+        f"INSERT INTO order_items_partitioned ({ITEM_COLUMNS}, order_created_at) "
+        f"SELECT {', '.join('i.' + c for c in ITEM_COLUMNS.split(', '))}, o.created_at "
+        "FROM order_items i JOIN orders_partitioned o ON o.id = i.order_id"
+    )
+
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    op.rename_table('orders_partitioned', 'orders')
+    op.rename_table('order_items_partitioned', 'order_items')
+
+    op.create_primary_key('orders_pkey', 'orders', ['id', 'created_at'])
+    op.create_primary_key('order_items_pkey', 'order_items', ['id', 'order_created_at'])
+    op.create_foreign_key(
+        'order_items_order_id_fkey', 'order_items', 'orders',
+        ['order_id', 'order_created_at'], ['id', 'created_at'],
+    )
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('orders_unpartitioned', *_order_columns(True))
+    op.create_table('order_items_unpartitioned', *_item_columns())
+    op.execute(f"INSERT INTO orders_unpartitioned ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders")
+    op.execute(
+        f"INSERT INTO order_items_unpartitioned ({ITEM_COLUMNS}) SELECT {ITEM_COLUMNS} FROM order_items"
+    )
+
+    # Dropping the parents drops every partition with them
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    op.rename_table('orders_unpartitioned', 'orders')
+    op.rename_table('order_items_unpartitioned', 'order_items')
+
+    op.create_primary_key('orders_pkey', 'orders', ['id'])
+    op.create_primary_key('order_items_pkey', 'order_items', ['id'])
+    op.create_foreign_key('order_items_order_id_fkey', 'order_items', 'orders', ['order_id'], ['id'])
+    _create_indexes()
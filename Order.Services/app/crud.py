@@ -1,55 +1,459 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Row, func, literal_column, or_, select, tuple_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, Query, selectinload
+from typing import Dict, Optional, List, Tuple
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+import base64
+import json
 import uuid
 
 from . import models, schemas
+from .services.status_handler import COMPLETED_STATUSES
+
+
+# ========== Cursor Pagination ==========
+
+def encode_position(timestamp: datetime, order_id: uuid.UUID) -> str:
+    """Cursor pointing just after the row at (created_at, id)"""
+    raw = f"{timestamp.isoformat()}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_position(token: str) -> Tuple[datetime, uuid.UUID]:
+    padded = token + "=" * (-len(token) % 4)
+    timestamp, order_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+    return datetime.fromisoformat(timestamp), uuid.UUID(order_id)
+
+
+def encode_cursor(order: models.Order) -> str:
+    """Build an opaque cursor pointing just after the given order"""
+    return encode_position(order.created_at, order.id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Parse a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        return _decode_position(cursor)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def next_cursor(orders: List[models.Order], limit: int) -> Optional[str]:
+    """Return the cursor for the following page, or None if this page is the last one"""
+    if len(orders) < limit:
+        return None
+    return encode_cursor(orders[-1])
+
+
+# ========== Partition Pruning ==========
+
+# orders is range-partitioned by month on created_at. Postgres only skips partitions
+# for plain comparisons on created_at itself, so every list query spells its bounds
+# out that way, even where a (created_at, id) row comparison already implies them.
+CreatedRange = Tuple[Optional[datetime], Optional[datetime]]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def created_range(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    recent_days: Optional[int] = None,
+) -> Optional[CreatedRange]:
+    """
+    Resolve created_from (inclusive) / created_to (exclusive) / recent_days into a
+    created_at range, or None for no bound. Raises ValueError on an empty range.
+    """
+    created_from, created_to = _naive_utc(created_from), _naive_utc(created_to)
+    if recent_days is not None:
+        recent_from = datetime.utcnow() - timedelta(days=recent_days)
+        created_from = max(created_from, recent_from) if created_from else recent_from
+    if created_from is None and created_to is None:
+        return None
+    if created_from is not None and created_to is not None and created_from >= created_to:
+        raise ValueError("created_from must be before created_to")
+    return created_from, created_to
+
+
+def _filter_created(query: Query, created: Optional[CreatedRange]) -> Query:
+    if created is None:
+        return query
+    created_from, created_to = created
+    if created_from is not None:
+        query = query.filter(models.Order.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(models.Order.created_at < created_to)
+    return query
+
+
+def _paginate(
+    query: Query, skip: int, limit: int, cursor: Optional[str], created: Optional[CreatedRange] = None
+) -> List[models.Order]:
+    """
+    Order newest first and apply either keyset (cursor) or offset pagination.
+    Keyset mode seeks directly to (created_at, id) so every page costs the same.
+    """
+    query = _filter_created(query, created)
+    query = query.order_by(models.Order.created_at.desc(), models.Order.id.desc())
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        query = query.filter(
+            models.Order.created_at <= created_at,  # Lets the planner skip newer partitions
+            tuple_(models.Order.created_at, models.Order.id) < tuple_(created_at, order_id),
+        )
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+# ========== Change Feed ==========
+
+# Snapshot xmin: every transaction with a lower xid has finished, and no new one can get
+# such an xid. Reading only those changes, ordered by (xid, seq), means a change that
+# commits late can never land behind a token that was already handed out.
+FINISHED_XID_BOUND = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+RESTAURANT_SCOPE_PREFIX = "restaurant:"
+DRIVER_SCOPE_PREFIX = "driver:"
+
+
+def _encode_change_position(xid: int, seq: int) -> str:
+    return base64.urlsafe_b64encode(f"{xid}|{seq}".encode()).decode().rstrip("=")
+
+
+def decode_since_token(since: str) -> Optional[Tuple[int, int]]:
+    """Parse a since token; an empty token means "from the beginning". Raises ValueError if malformed."""
+    if not since:
+        return None
+    try:
+        padded = since + "=" * (-len(since) % 4)
+        xid, seq = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return int(xid), int(seq)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid since token: {since}") from e
+
+
+def _order_changes(
+    db: Session, scope_column, scope_value: str, scope_prefix: str, since: str, limit: int,
+    columns: Optional[Tuple[str, ...]]
+) -> Tuple[list, List[dict], str]:
+    """
+    Changes to the orders of one restaurant or driver after the since token, oldest first, as
+    (orders still in the scope, removals as {"id", "reason"}, next since token).
+    Each order appears once, in its current state; reason is deleted, archived or reassigned.
+    Cost is proportional to the number of changes, not to the size of the history.
+    """
+    Change = models.OrderChange
+    query = db.query(Change.order_id, Change.xid, Change.seq).filter(
+        Change.scope == f"{scope_prefix}{scope_value}", Change.xid < FINISHED_XID_BOUND
+    )
+    position = decode_since_token(since)
+    if position:
+        query = query.filter(tuple_(Change.xid, Change.seq) > tuple_(*position))
+    changes = query.order_by(Change.xid.asc(), Change.seq.asc()).limit(limit).all()
+    if not changes:
+        return [], [], since
+
+    # Rank each order by its latest change in this page
+    rank = {}
+    for index, change in enumerate(changes):
+        rank[change.order_id] = index
+    order_ids = sorted(rank, key=rank.get)
+
+    orders = _order_query(db, columns).filter(models.Order.id.in_(order_ids), scope_column == scope_value).all()
+    orders.sort(key=lambda order: rank[order.id])
+    present = {order.id for order in orders}
+    gone = [order_id for order_id in order_ids if order_id not in present]
+    removed = []
+    if gone:
+        moved = {row.id for row in db.query(models.Order.id).filter(models.Order.id.in_(gone))}
+        archived = {
+            row.order_id for row in
+            db.query(models.OrderArchiveEntry.order_id).filter(models.OrderArchiveEntry.order_id.in_(gone))
+        }
+        removed = [
+            {"id": order_id, "reason": "reassigned" if order_id in moved else "archived" if order_id in archived else "deleted"}
+            for order_id in gone
+        ]
+    return orders, removed, _encode_change_position(changes[-1].xid, changes[-1].seq)
+
+
+def get_order_changes_by_driver(
+    db: Session, driver_id: str, since: str, limit: int = 100, columns: Optional[Tuple[str, ...]] = None
+) -> Tuple[list, List[dict], str]:
+    return _order_changes(db, models.Order.driver_id, driver_id, DRIVER_SCOPE_PREFIX, since, limit, columns)
+
+
+def get_order_changes_by_restaurant(
+    db: Session, restaurant_id: str, since: str, limit: int = 100, columns: Optional[Tuple[str, ...]] = None
+) -> Tuple[list, List[dict], str]:
+    return _order_changes(
+        db, models.Order.restaurant_id, restaurant_id, RESTAURANT_SCOPE_PREFIX, since, limit, columns
+    )
+
+
+# ========== Order Counters ==========
+
+# The global count is spread over this many rows ("all:0".."all:15") so concurrent
+# writers rarely wait on the same row; reads sum them. Changing it needs a migration.
+ORDER_COUNTER_SHARDS = 16
+ALL_ORDERS_SCOPES = tuple(f"all:{shard}" for shard in range(ORDER_COUNTER_SHARDS))
+
+
+def user_scope(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def _read_counter(db: Session, scopes: Tuple[str, ...], fallback) -> int:
+    """Sum of maintained counter rows, falling back to an exact COUNT(*) if they were never seeded"""
+    count = db.query(func.sum(models.OrderCounter.count)).filter(models.OrderCounter.scope.in_(scopes)).scalar()
+    if count is None:
+        return fallback()
+    return int(count)  # sum(bigint) is numeric
+
+
+def order_counters_upsert(user_ids: List[str], delta: int, order_id: uuid.UUID):
+    """
+    Build the upsert adding delta per order to the global and per-user counters.
+    The global delta goes to the shard picked by order_id (the first order of a batch).
+    Rows are upserted in a fixed order so concurrent writers cannot deadlock.
+    """
+    per_scope = {ALL_ORDERS_SCOPES[order_id.int % ORDER_COUNTER_SHARDS]: delta * len(user_ids)}
+    for user_id in user_ids:
+        scope = user_scope(user_id)
+        per_scope[scope] = per_scope.get(scope, 0) + delta
+
+    stmt = pg_insert(models.OrderCounter).values(
+        [{"scope": scope, "count": count} for scope, count in sorted(per_scope.items())]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.OrderCounter.scope],
+        set_={"count": models.OrderCounter.count + stmt.excluded.count},
+    )
+    return stmt
+
+
+def bump_order_counters(db: Session, user_ids: List[str], delta: int, order_id: uuid.UUID) -> None:
+    """Apply order_counters_upsert in the current transaction"""
+    if user_ids:
+        db.execute(order_counters_upsert(user_ids, delta, order_id))
+
+
+# ========== Daily Sales Rollup ==========
+
+# Statuses that complete a sale, from the transition table (today only driver_accepted).
+# They are terminal, so transitions only ever enter them.
+SALES_STATUSES = frozenset(status.value for status in COMPLETED_STATUSES)
+DAILY_SALES_MAX_DAYS = 366
+
+
+def sales_rollup_upsert(order: models.Order, sign: int):
+    """Build the upsert adding (sign=1) or removing (sign=-1) an order from its restaurant's day"""
+    DailySales = models.RestaurantDailySales
+    stmt = pg_insert(DailySales).values(
+        restaurant_id=order.restaurant_id,
+        day=order.created_at.date(),
+        order_count=sign,
+        gross=sign * (order.subtotal or 0),
+        items_sold=sign * sum(item.quantity for item in order.items),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DailySales.restaurant_id, DailySales.day],
+        set_={
+            "order_count": DailySales.order_count + stmt.excluded.order_count,
+            "gross": DailySales.gross + stmt.excluded.gross,
+            "items_sold": DailySales.items_sold + stmt.excluded.items_sold,
+        },
+    )
+
+
+def sales_rollup_change(order: models.Order, old_status: Optional[str]):
+    """Rollup upsert for an order that moved from old_status to order.status, or None if sales are unchanged"""
+    sign = (order.status in SALES_STATUSES) - (old_status in SALES_STATUSES)
+    return sales_rollup_upsert(order, sign) if sign else None
+
+
+def apply_sales_rollup(db: Session, order: models.Order, old_status: Optional[str]) -> None:
+    """Apply sales_rollup_change in the current transaction"""
+    stmt = sales_rollup_change(order, old_status)
+    if stmt is not None:
+        db.execute(stmt)
+
+
+def daily_sales_range(day_from: Optional[date], day_to: Optional[date]) -> Tuple[date, date]:
+    """Inclusive day range for a stats query (default: the last 30 days). Raises ValueError if invalid."""
+    day_to = day_to or datetime.utcnow().date()
+    day_from = day_from or day_to - timedelta(days=29)
+    if day_from > day_to:
+        raise ValueError("from must not be after to")
+    if (day_to - day_from).days >= DAILY_SALES_MAX_DAYS:
+        raise ValueError(f"Range must not exceed {DAILY_SALES_MAX_DAYS} days")
+    return day_from, day_to
+
+
+def get_daily_sales(
+    db: Session, restaurant_id: str, day_from: date, day_to: date
+) -> List[models.RestaurantDailySales]:
+    """Rollup rows for a restaurant between day_from and day_to inclusive; days without sales are absent"""
+    DailySales = models.RestaurantDailySales
+    return (
+        db.query(DailySales)
+        .filter(DailySales.restaurant_id == restaurant_id, DailySales.day >= day_from, DailySales.day <= day_to)
+        .order_by(DailySales.day)
+        .all()
+    )
 
 
 # ========== Order CRUD ==========
 
+# Response fields in OrderResponse order, and the subset a summary list needs
+ORDER_FIELDS = tuple(schemas.OrderResponse.model_fields)
+ORDER_SUMMARY_FIELDS = ("id", "status", "restaurant_id", "total_amount", "created_at")
+ORDER_COLUMNS = tuple(models.Order.__table__.columns.keys())
+
+
+def order_fields(fields: Optional[str], view: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Resolve ?fields=a,b / ?view=summary into response fields (id is always included),
+    or None for the full OrderResponse. Raises ValueError on unknown names.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(ORDER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(name for name in ORDER_FIELDS if name in requested or name == "id")
+    if view in (None, "full"):
+        return None
+    if view == "summary":
+        return ORDER_SUMMARY_FIELDS
+    raise ValueError(f"Unknown view: {view}")
+
+
+def order_columns(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Order columns to select for the given response fields, plus the pagination keys"""
+    wanted = set(fields) | {"id", "created_at", "updated_at"}
+    return tuple(name for name in ORDER_COLUMNS if name in wanted)
+
+
+def _order_query(db: Session, columns: Optional[Tuple[str, ...]] = None) -> Query:
+    """
+    Base order query that batch-loads items in one extra SELECT ... IN per page.
+    With columns the query yields plain tuples of just those columns and items are not
+    loaded (see get_order_item_rows).
+    """
+    if columns is not None:
+        return db.query(*(models.Order.__table__.c[name] for name in columns))
+    return db.query(models.Order).options(selectinload(models.Order.items))
+
+
+def get_order_item_rows(db: Session, orders: List[Row]) -> Dict[uuid.UUID, List[Row]]:
+    """
+    Item rows for a page of order rows, grouped by order_id, in one SELECT ... IN.
+    Bounded by the page's created_at span so only the partitions it covers are read.
+    """
+    items_by_order: Dict[uuid.UUID, List[Row]] = {}
+    if not orders:
+        return items_by_order
+    created = [order.created_at for order in orders]
+    OrderItem = models.OrderItem
+    rows = db.query(*OrderItem.__table__.columns).filter(
+        OrderItem.order_id.in_([order.id for order in orders]),
+        OrderItem.order_created_at.between(min(created), max(created)),
+    )
+    for row in rows:
+        items_by_order.setdefault(row.order_id, []).append(row)
+    return items_by_order
+
+
 def get_order(db: Session, order_id: str) -> Optional[models.Order]:
-    return db.query(models.Order).filter(models.Order.id == uuid.UUID(order_id)).first()
+    return _order_query(db).filter(models.Order.id == uuid.UUID(order_id)).first()
 
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100) -> List[models.Order]:
-    return db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+def get_orders(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    columns: Optional[Tuple[str, ...]] = None, created: Optional[CreatedRange] = None
+) -> List[models.Order]:
+    return _paginate(_order_query(db, columns), skip, limit, cursor, created)
 
 
-def get_orders_count(db: Session) -> int:
-    return db.query(models.Order).count()
+def get_orders_count(db: Session, created: Optional[CreatedRange] = None) -> int:
+    """Maintained total, or an exact (partition-pruned) COUNT(*) within a created_at range"""
+    if created is not None:
+        return _filter_created(db.query(models.Order), created).count()
+    return _read_counter(db, ALL_ORDERS_SCOPES, lambda: db.query(models.Order).count())
 
 
-def get_orders_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 100) -> List[models.Order]:
-    return db.query(models.Order).filter(
-        models.Order.user_id == user_id
-    ).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+def get_orders_count_estimate(db: Session) -> Optional[int]:
+    """Planner row estimate summed over the orders partitions, or None if none has been analyzed"""
+    estimate = db.execute(text(
+        "SELECT sum(c.reltuples)::bigint FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'orders'::regclass AND c.reltuples >= 0"
+    )).scalar()
+    if estimate is None:
+        return None
+    return estimate
 
 
-def get_orders_count_by_user(db: Session, user_id: str) -> int:
-    return db.query(models.Order).filter(models.Order.user_id == user_id).count()
+def get_orders_by_user(
+    db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    columns: Optional[Tuple[str, ...]] = None, created: Optional[CreatedRange] = None
+) -> List[models.Order]:
+    query = _order_query(db, columns).filter(models.Order.user_id == user_id)
+    return _paginate(query, skip, limit, cursor, created)
 
 
-def get_orders_by_driver(db: Session, driver_id: str, skip: int = 0, limit: int = 100) -> List[models.Order]:
-    return db.query(models.Order).filter(
-        models.Order.driver_id == driver_id
-    ).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+def get_orders_count_by_user(db: Session, user_id: str, created: Optional[CreatedRange] = None) -> int:
+    if created is not None:
+        query = db.query(models.Order).filter(models.Order.user_id == user_id)
+        return _filter_created(query, created).count()
+    return _read_counter(
+        db,
+        (user_scope(user_id),),
+        lambda: db.query(models.Order).filter(models.Order.user_id == user_id).count(),
+    )
 
 
-def get_orders_by_restaurant(db: Session, restaurant_id: str, skip: int = 0, limit: int = 100) -> List[models.Order]:
-    return db.query(models.Order).filter(
-        models.Order.restaurant_id == restaurant_id
-    ).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+def get_orders_by_driver(
+    db: Session, driver_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    columns: Optional[Tuple[str, ...]] = None, created: Optional[CreatedRange] = None
+) -> List[models.Order]:
+    query = _order_query(db, columns).filter(models.Order.driver_id == driver_id)
+    return _paginate(query, skip, limit, cursor, created)
 
 
-def create_order(db: Session, order: schemas.OrderCreate) -> models.Order:
-    # Calculate totals
+def get_orders_by_restaurant(
+    db: Session, restaurant_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    columns: Optional[Tuple[str, ...]] = None, created: Optional[CreatedRange] = None
+) -> List[models.Order]:
+    query = _order_query(db, columns).filter(models.Order.restaurant_id == restaurant_id)
+    return _paginate(query, skip, limit, cursor, created)
+
+
+DEFAULT_DELIVERY_FEE = Decimal("15000")
+NEW_ORDER_STATUS = schemas.OrderStatus.PENDING_RESTAURANT.value
+
+
+def _order_totals(order: schemas.OrderCreate) -> Tuple[Decimal, Decimal, Decimal]:
+    """Return (subtotal, delivery_fee, total_amount) for a new order"""
     subtotal = sum(item.quantity * item.unit_price for item in order.items)
-    delivery_fee = Decimal("15000")  # Default delivery fee
-    total_amount = subtotal + delivery_fee
-    
+    delivery_fee = DEFAULT_DELIVERY_FEE
+    return subtotal, delivery_fee, subtotal + delivery_fee
+
+
+def build_order(order: schemas.OrderCreate) -> models.Order:
+    """Build a new Order with its items attached, ready to be added to a session"""
+    # Calculate totals
+    subtotal, delivery_fee, total_amount = _order_totals(order)
+
     # Create order
     db_order = models.Order(
+        id=uuid.uuid4(),  # Set up front: it picks the order counter shard
         user_id=order.user_id,
         restaurant_id=order.restaurant_id,
         driver_id=None,  # Explicitly set to NULL
@@ -60,42 +464,126 @@ def create_order(db: Session, order: schemas.OrderCreate) -> models.Order:
         delivery_fee=delivery_fee,
         total_amount=total_amount
     )
-    db.add(db_order)
-    db.flush()  # Get order ID
-    
-    # Create order items
-    for item in order.items:
-        db_item = models.OrderItem(
-            order_id=db_order.id,
+
+    # Create order items (inserted together with the order on flush)
+    db_order.items = [
+        models.OrderItem(
             product_id=item.product_id,
             product_name=item.product_name,
             quantity=item.quantity,
             unit_price=item.unit_price,
             note=item.note
         )
-        db.add(db_item)
-    
+        for item in order.items
+    ]
+    return db_order
+
+
+def create_order(db: Session, order: schemas.OrderCreate) -> models.Order:
+    db_order = build_order(order)
+    db.add(db_order)
+    db.add(created_outbox_event(db_order.id))
+    bump_order_counters(db, [order.user_id], 1, db_order.id)
     db.commit()
     db.refresh(db_order)
     return db_order
 
 
-def update_order(db: Session, order_id: str, order_update: schemas.OrderUpdate) -> Optional[models.Order]:
-    db_order = get_order(db, order_id)
-    if not db_order:
-        return None
-    
+def build_order_batch(orders: List[schemas.OrderCreate]) -> Tuple[List[dict], List[dict]]:
+    """
+    Rows for many new orders: (order rows in input order, item rows).
+    Ids and timestamps are generated here so orders and their items can each be
+    written with a single multi-row INSERT, without a flush/refresh per order.
+    """
+    now = datetime.utcnow()
+    order_rows = []
+    item_rows = []
+    for order in orders:
+        order_id = uuid.uuid4()
+        subtotal, delivery_fee, total_amount = _order_totals(order)
+        order_rows.append({
+            "id": order_id,
+            "user_id": order.user_id,
+            "restaurant_id": order.restaurant_id,
+            "driver_id": None,
+            "status": NEW_ORDER_STATUS,
+            "payment_status": "unpaid",
+            "payment_method": order.payment_method,
+            "delivery_address": order.delivery_address,
+            "delivery_note": order.delivery_note,
+            "subtotal": subtotal,
+            "delivery_fee": delivery_fee,
+            "discount": Decimal("0"),
+            "total_amount": total_amount,
+            "created_at": now,
+            "updated_at": now,
+        })
+        for item in order.items:
+            item_rows.append({
+                "id": uuid.uuid4(),
+                "order_id": order_id,
+                "order_created_at": now,
+                "product_id": item.product_id,
+                "product_name": item.product_name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "note": item.note,
+                "created_at": now,
+            })
+    return order_rows, item_rows
+
+
+def order_update_values(order_update: schemas.OrderUpdate) -> dict:
+    """Column values to set for an OrderUpdate (only fields the client sent)"""
     update_data = order_update.model_dump(exclude_unset=True)
-    
+
     if "status" in update_data and update_data["status"]:
         update_data["status"] = update_data["status"].value
     if "payment_status" in update_data and update_data["payment_status"]:
         update_data["payment_status"] = update_data["payment_status"].value
-    if "driver_id" in update_data and update_data["driver_id"]:
-        update_data["driver_id"] = update_data["driver_id"]
+    return update_data
+
+
+ORDER_EVENTS_CHANNEL = "order_status"
+
+
+def status_notify(order_id: uuid.UUID, status: str):
+    """
+    pg_notify statement announcing a status change to live subscribers.
+    Postgres delivers it only when the surrounding transaction commits.
+    """
+    payload = json.dumps({"order_id": str(order_id), "status": status, "at": datetime.utcnow().isoformat()})
+    return select(func.pg_notify(ORDER_EVENTS_CHANNEL, payload))
+
+
+def created_outbox_event(order_id: uuid.UUID) -> models.OrderOutbox:
+    """Outbox row for a new order, so side effects of the initial status run like those of any later one"""
+    return models.OrderOutbox(order_id=order_id, event_type=NEW_ORDER_STATUS)
+
+
+def status_outbox_event(db_order: models.Order, update_data: dict) -> Optional[models.OrderOutbox]:
+    """Outbox row for the side effects of a status change, or None if status is unchanged"""
+    if not update_data.get("status"):
+        return None
+    return models.OrderOutbox(order_id=db_order.id, event_type=update_data["status"])
+
+
+def update_order(db: Session, order_id: str, order_update: schemas.OrderUpdate) -> Optional[models.Order]:
+    db_order = get_order(db, order_id)
+    if not db_order:
+        return None
+    
+    update_data = order_update_values(order_update)
+    old_status = db_order.status
     
     for field, value in update_data.items():
         setattr(db_order, field, value)
+
+    outbox_event = status_outbox_event(db_order, update_data)
+    if outbox_event:
+        db.add(outbox_event)
+        db.execute(status_notify(db_order.id, update_data["status"]))
+        apply_sales_rollup(db, db_order, old_status)
     
     db.commit()
     db.refresh(db_order)
@@ -107,6 +595,9 @@ def delete_order(db: Session, order_id: str) -> bool:
     if not db_order:
         return False
     db.delete(db_order)
+    bump_order_counters(db, [db_order.user_id], -1, db_order.id)
+    if db_order.status in SALES_STATUSES:
+        db.execute(sales_rollup_upsert(db_order, -1))
     db.commit()
     return True
 
@@ -118,7 +609,10 @@ def cancel_order(db: Session, order_id: str) -> Optional[models.Order]:
     if db_order.status in ["delivered", "cancelled"]:
         return None  # Cannot cancel delivered or already cancelled orders
     
+    old_status = db_order.status
     db_order.status = "cancelled"
+    db.execute(status_notify(db_order.id, "cancelled"))
+    apply_sales_rollup(db, db_order, old_status)
     db.commit()
     db.refresh(db_order)
     return db_order
@@ -130,8 +624,47 @@ def assign_driver(db: Session, order_id: str, driver_id: str) -> Optional[models
     if not db_order:
         return None
     
+    old_status = db_order.status
     db_order.driver_id = driver_id
     db_order.status = "finding_driver"
+    apply_sales_rollup(db, db_order, old_status)
     db.commit()
     db.refresh(db_order)
     return db_order
+
+
+# ========== Profiles ==========
+
+# Unique profile fields, in the order a conflict is reported
+PROFILE_UNIQUE_FIELDS = ("email", "phone", "user_id")
+
+
+def create_profile(
+    db: Session, profile: schemas.ProfileCreate
+) -> Tuple[Optional[models.Profile], Optional[str]]:
+    """
+    Insert a profile with a single INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    Returns (profile, None), or (None, field) naming the unique field that is already taken.
+    """
+    Profile = models.Profile
+    stmt = (
+        pg_insert(Profile)
+        .values(role="user", **profile.model_dump())
+        .on_conflict_do_nothing()
+        .returning(Profile)
+    )
+    db_profile = db.scalars(stmt).first()
+    if db_profile is not None:
+        db.commit()
+        return db_profile, None
+
+    # Conflict path only: find out which field clashed
+    db.rollback()
+    taken = db.query(Profile.email, Profile.phone, Profile.user_id).filter(or_(
+        Profile.email == profile.email, Profile.phone == profile.phone, Profile.user_id == profile.user_id
+    )).all()
+    for field in PROFILE_UNIQUE_FIELDS:
+        if any(getattr(row, field) == getattr(profile, field) for row in taken):
+            return None, field
+    return None, "user_id"  # The clashing row was deleted in the meantime
+
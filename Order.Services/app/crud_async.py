@@ -0,0 +1,154 @@
+"""
+Async variants of the order write paths in crud.py, for use from `async def` routes.
+
+Statement building (totals, counters, update values, outbox rows, notifications)
+is shared with crud.py so the sync and async paths cannot drift apart.
+"""
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Tuple
+import uuid
+
+from . import crud, models, schemas
+
+
+async def _apply_sales_rollup(db: AsyncSession, order: models.Order, old_status: Optional[str]) -> None:
+    stmt = crud.sales_rollup_change(order, old_status)
+    if stmt is not None:
+        await db.execute(stmt)
+
+
+async def get_order(db: AsyncSession, order_id: str) -> Optional[models.Order]:
+    result = await db.execute(
+        select(models.Order)
+        .options(selectinload(models.Order.items))
+        .where(models.Order.id == uuid.UUID(order_id))
+    )
+    return result.scalars().first()
+
+
+async def get_order_status(db: AsyncSession, order_id: str) -> Optional[str]:
+    result = await db.execute(select(models.Order.status).where(models.Order.id == uuid.UUID(order_id)))
+    return result.scalar()
+
+
+async def create_order(db: AsyncSession, order: schemas.OrderCreate, commit: bool = True) -> models.Order:
+    """Insert an order; with commit=False it is only flushed, for callers that add to the transaction"""
+    db_order = crud.build_order(order)
+    db.add(db_order)
+    db.add(crud.created_outbox_event(db_order.id))
+    await db.execute(crud.order_counters_upsert([order.user_id], 1, db_order.id))
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+    return db_order
+
+
+async def create_orders_batch(
+    db: AsyncSession, orders: List[schemas.OrderCreate], commit: bool = True
+) -> List[dict]:
+    """
+    Insert many orders with one multi-row INSERT each for orders, items and outbox rows.
+    Returns one row dict per order, in input order; commit=False leaves the transaction open.
+    """
+    order_rows, item_rows = crud.build_order_batch(orders)
+    await db.execute(insert(models.Order), order_rows)
+    await db.execute(insert(models.OrderItem), item_rows)
+    await db.execute(insert(models.OrderOutbox), [
+        {"order_id": row["id"], "event_type": row["status"]} for row in order_rows
+    ])
+    await db.execute(crud.order_counters_upsert([order.user_id for order in orders], 1, order_rows[0]["id"]))
+    if commit:
+        await db.commit()
+    return order_rows
+
+
+async def update_order(
+    db: AsyncSession, order_id: str, order_update: schemas.OrderUpdate
+) -> Optional[models.Order]:
+    db_order = await get_order(db, order_id)
+    if not db_order:
+        return None
+
+    update_data = crud.order_update_values(order_update)
+    old_status = db_order.status
+    for field, value in update_data.items():
+        setattr(db_order, field, value)
+
+    # Side effects are recorded atomically with the change and run by the outbox dispatcher
+    outbox_event = crud.status_outbox_event(db_order, update_data)
+    if outbox_event:
+        db.add(outbox_event)
+        await db.execute(crud.status_notify(db_order.id, update_data["status"]))
+        await _apply_sales_rollup(db, db_order, old_status)
+
+    await db.commit()
+    return db_order
+
+
+async def transition_order(
+    db: AsyncSession, order_id: str, order_update: schemas.OrderUpdate, expected_status: str
+) -> Tuple[Optional[models.Order], Optional[str]]:
+    """
+    Apply a status change (plus any other fields) with
+    UPDATE ... WHERE status = expected_status RETURNING, so a concurrent transition
+    that committed after the caller validated against expected_status makes this one fail.
+
+    Returns (order, None) on success, or (None, current_status) if the order is no longer
+    in expected_status; current_status is None if the order no longer exists.
+    """
+    oid = uuid.UUID(order_id)
+    update_data = crud.order_update_values(order_update)
+    stmt = (
+        update(models.Order)
+        .where(models.Order.id == oid, models.Order.status == expected_status)
+        .values(**update_data)
+        .returning(models.Order)
+        .options(selectinload(models.Order.items))
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_order = (await db.execute(stmt)).scalars().first()
+    if db_order is None:
+        # Changed underneath the caller; the re-read only runs on failure
+        current_status = (
+            await db.execute(select(models.Order.status).where(models.Order.id == oid))
+        ).scalar()
+        await db.rollback()
+        return None, current_status
+
+    # Side effects are recorded atomically with the change and run by the outbox dispatcher
+    db.add(crud.status_outbox_event(db_order, update_data))
+    await db.execute(crud.status_notify(db_order.id, db_order.status))
+    # expected_status was validated as a non-terminal status, so it is never a sales status
+    await _apply_sales_rollup(db, db_order, expected_status)
+    await db.commit()
+    return db_order, None
+
+
+async def delete_order(db: AsyncSession, order_id: str) -> bool:
+    db_order = await get_order(db, order_id)
+    if not db_order:
+        return False
+    await db.delete(db_order)
+    await db.execute(crud.order_counters_upsert([db_order.user_id], -1, db_order.id))
+    if db_order.status in crud.SALES_STATUSES:
+        await db.execute(crud.sales_rollup_upsert(db_order, -1))
+    await db.commit()
+    return True
+
+
+async def cancel_order(db: AsyncSession, order_id: str) -> Optional[models.Order]:
+    db_order = await get_order(db, order_id)
+    if not db_order:
+        return None
+    if db_order.status in ["delivered", "cancelled"]:
+        return None  # Cannot cancel delivered or already cancelled orders
+
+    old_status = db_order.status
+    db_order.status = "cancelled"
+    await db.execute(crud.status_notify(db_order.id, "cancelled"))
+    await _apply_sales_rollup(db, db_order, old_status)
+    await db.commit()
+    return db_order
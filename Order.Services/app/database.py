@@ -1,7 +1,18 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from typing import AsyncIterator, Iterator, List, Optional
+import itertools
+import logging
 import os
+import threading
+import time
+
+from . import metrics
 
 # PostgreSQL Database URL
 POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
@@ -12,9 +23,169 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "order_service_db")
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_engine(DATABASE_URL)
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+engine = create_engine(DATABASE_URL, poolclass=metrics.TimedQueuePool, pool_logging_name="primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for `async def` routes so DB round trips don't block the event loop.
+# expire_on_commit=False keeps loaded attributes usable after commit (no implicit lazy IO).
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=int(os.getenv("DB_ASYNC_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "20")),
+    poolclass=metrics.TimedAsyncQueuePool,
+    pool_logging_name="primary-async",
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+metrics.register_pool("primary", engine)
+metrics.register_pool("primary-async", async_engine.sync_engine)
+
+# ========== Read Replicas ==========
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated SQLAlchemy URLs of streaming replicas; empty means every read hits the primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5"))
+# After a client's own successful write, its reads stay on the primary for this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_COOKIE = "order_db_primary_until"
+# Same value as the cookie, for clients without a cookie jar (other services, mobile apps):
+# returned on writes, echoed back on reads
+READ_YOUR_WRITES_HEADER = "X-Primary-Until"
+
+# 0 when the replica has replayed everything it received, otherwise seconds since the last replayed commit
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """One replica engine and its last observed health"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at = 0.0
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # A dropped connection takes the replica out of rotation until the next successful check
+        if context.is_disconnect:
+            self.healthy = False
+            self.last_error = str(context.original_exception)
+
+    def check(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                self.lag_seconds = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            self.healthy = self.lag_seconds <= DB_REPLICA_MAX_LAG_SECONDS
+            self.last_error = None if self.healthy else f"lag {self.lag_seconds:.1f}s"
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)
+        self.checked_at = time.monotonic()
+        if not self.healthy:
+            logger.warning("Replica %s out of rotation: %s", self.name, self.last_error)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """
+    Round-robin over healthy replicas. Health (reachability + replay lag) is re-checked
+    lazily at most every DB_REPLICA_HEALTH_INTERVAL seconds, by one thread at a time.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [
+            Replica(
+                f"replica-{index}",
+                create_engine(
+                    url, pool_pre_ping=True, poolclass=metrics.TimedQueuePool, pool_logging_name=f"replica-{index}"
+                ),
+            )
+            for index, url in enumerate(urls)
+        ]
+        for replica in self.replicas:
+            metrics.register_pool(replica.name, replica.engine)
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+        self.primary_fallbacks = 0
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        due = [replica for replica in self.replicas if now - replica.checked_at >= DB_REPLICA_HEALTH_INTERVAL]
+        if due and self._lock.acquire(blocking=False):
+            try:
+                for replica in due:
+                    replica.check()
+            finally:
+                self._lock.release()
+
+    def pick(self) -> Optional[Engine]:
+        """A healthy replica engine, or None to fall back to the primary"""
+        if not self.replicas:
+            return None
+        self._refresh()
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica.engine
+        self.primary_fallbacks += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica chosen for it (info["replica"]) and sends
+    flushes and INSERT/UPDATE/DELETE statements to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is None or self._flushing or isinstance(clause, UpdateBase):
+            return engine
+        return replica
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+def primary_pinned(request: Request) -> bool:
+    """True while the client is inside the read-your-writes window of its last write (cookie or header)"""
+    now = time.time()
+    for token in (request.headers.get(READ_YOUR_WRITES_HEADER), request.cookies.get(READ_YOUR_WRITES_COOKIE)):
+        try:
+            if token is not None and float(token) > now:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
 Base = declarative_base()
 
 
@@ -25,3 +196,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request) -> Iterator[Session]:
+    """
+    Dependency for read-only GET endpoints: a session pinned to one healthy replica for
+    the whole request, or the primary inside the read-your-writes window / when no replica
+    is available.
+    """
+    db = ReadSessionLocal()
+    if not primary_pinned(request):
+        db.info["replica"] = replicas.pick()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,14 +1,56 @@
+from contextlib import asynccontextmanager
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import engine, Base
-from .routers import orders, profiles
+from .database import engine, async_engine, Base, READ_YOUR_WRITES_HEADER
+from . import metrics
+from . import middleware
+from .routers import orders, profiles, drivers, internal
+from .services import archive, change_feed, driver_index, http_pool, idempotency, outbox, order_events, partitions
+from .services.profile_cache import profile_cache
+
+logger = logging.getLogger(__name__)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks"""
+    await partitions.maintainer.start()
+    await http_pool.start_all()
+    if outbox.OUTBOX_ENABLED:
+        outbox.dispatcher.start()
+        outbox.purger.start()
+    else:
+        logger.warning("Outbox dispatcher disabled: another process must drain order_outbox")
+    order_events.broker.start()
+    if archive.ORDER_ARCHIVE_ENABLED:
+        archive.job.start()
+    idempotency.sweeper.start()
+    change_feed.compactor.start()
+    profile_cache.start()
+    driver_index.sync.start()
+    yield
+    await driver_index.sync.stop()
+    await profile_cache.stop()
+    await change_feed.compactor.stop()
+    await idempotency.sweeper.stop()
+    await archive.job.stop()
+    await order_events.broker.stop()
+    await outbox.purger.stop()
+    await outbox.dispatcher.stop()
+    await http_pool.close_all()
+    await partitions.maintainer.stop()
+    await async_engine.dispose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Order Service API",
     description="API quản lý Profile và Đơn hàng cho hệ thống Giao Hàng Thực Phẩm",
     version="1.0.0",
@@ -23,11 +65,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[READ_YOUR_WRITES_HEADER],
 )
+middleware.install(app)
 
 # Include routers
 app.include_router(profiles.router, prefix="/api/v1")
 app.include_router(orders.router, prefix="/api/v1")
+app.include_router(drivers.router, prefix="/api/v1")
+app.include_router(internal.router)
 
 
 @app.get("/", tags=["Health"])
@@ -44,3 +90,9 @@ def root():
 def health_check():
     """Health check for Docker/Kubernetes"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return metrics.metrics_response()
@@ -0,0 +1,130 @@
+"""
+Prometheus metrics for the Order Service, exposed at GET /metrics.
+
+- HTTP: per-route latency histogram, in-flight gauge, error counter (middleware.PrometheusMiddleware)
+- DB: pool size/checked-out/overflow read at scrape time, checkout wait histogram
+- Outbound: per-downstream latency histogram (PooledServiceClient.send)
+- Caches: hits/misses/entries/memory of the in-process caches, read at scrape time
+
+Hot-path cost is a few lock-protected counter updates per request; pool gauges are
+only computed when Prometheus scrapes. Metrics are per worker process.
+"""
+import time
+from typing import Any, List, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.responses import Response
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_REQUEST_ERRORS = Counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx or an unhandled exception", ["method", "route"]
+)
+HTTP_REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements issued per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 20, 50, 100),
+)
+HTTP_REQUEST_SQL_OVER_BUDGET = Counter(
+    "http_request_sql_over_budget_total", "Requests over the SQL statement or DB time budget", ["route", "budget"]
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_CLIENT_DURATION = Histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP call latency per attempt", ["service", "endpoint", "status"]
+)
+
+
+# ========== HTTP ==========
+
+def metrics_response() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+# ========== DB pools ==========
+
+class _TimedCheckout:
+    """Pool mixin timing how long a checkout waits for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.logging_name or "default").observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+_pools: List[Tuple[str, Engine]] = []
+
+
+def register_pool(name: str, engine: Engine) -> None:
+    """Report this engine's pool gauges under pool=<name>"""
+    _pools.append((name, engine))
+
+
+class _PoolCollector:
+    """Reads QueuePool counters at scrape time, so there is no per-checkout cost"""
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool size", labels=["pool"])
+        for name, engine in _pools:
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+
+REGISTRY.register(_PoolCollector())
+
+
+# ========== In-process caches ==========
+
+_caches: List[Any] = []
+
+
+def register_cache(cache: Any) -> None:
+    """Report a cache's stats() under cache=<its name>"""
+    _caches.append(cache)
+
+
+class _CacheCollector:
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+        memory = GaugeMetricFamily("cache_memory_bytes", "Approximate memory held by entries", labels=["cache"])
+        for cache in _caches:
+            stats = cache.stats()
+            hits.add_metric([stats["cache"]], stats["hits"])
+            misses.add_metric([stats["cache"]], stats["misses"])
+            entries.add_metric([stats["cache"]], stats["size"])
+            if "memory_bytes" in stats:
+                memory.add_metric([stats["cache"]], stats["memory_bytes"])
+        yield hits
+        yield misses
+        yield entries
+        yield memory
+
+
+REGISTRY.register(_CacheCollector())
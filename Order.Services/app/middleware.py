@@ -0,0 +1,155 @@
+"""
+ASGI middleware for the Order Service.
+
+Written as plain ASGI callables (not BaseHTTPMiddleware) so streaming responses
+such as the SSE order feed pass through untouched.
+"""
+import json
+import logging
+import math
+import time
+
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics, sql_accounting
+from .database import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, READ_YOUR_WRITES_SECONDS, replicas
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+sql_logger = logging.getLogger("app.sql_accounting")
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, set a short-lived cookie that keeps the client's reads on
+    the primary (see database.get_read_db), so it never reads a replica that is behind it.
+    The same deadline is returned in the X-Primary-Until header; clients that don't keep
+    cookies get the guarantee by sending it back on their reads.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not replicas.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers[READ_YOUR_WRITES_HEADER] = f"{until:.3f}"
+                headers.append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; Max-Age={math.ceil(READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PrometheusMiddleware:
+    """Record latency, in-flight and errors per route template (not raw path, to bound label cardinality)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            metrics.HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status)).observe(
+                time.perf_counter() - start
+            )
+            if status >= 500:
+                metrics.HTTP_REQUEST_ERRORS.labels(scope["method"], route_path).inc()
+
+
+class SqlAccountingMiddleware:
+    """
+    Count SQL statements, DB time and rows per request (see sql_accounting). Adds a
+    Server-Timing header, logs one JSON line per request at INFO, and logs at WARNING
+    when the request exceeds SQL_BUDGET_STATEMENTS or SQL_BUDGET_DB_MS.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not sql_accounting.SQL_ACCOUNTING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = sql_accounting.begin()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("server-timing", f"{stats.server_timing()}, app;dur={elapsed_ms:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sql_accounting.end(token)
+            self._report(scope, status, stats, time.perf_counter() - start)
+
+    @staticmethod
+    def _report(scope: Scope, status: int, stats: sql_accounting.SqlStats, duration: float) -> None:
+        route = getattr(scope.get("route"), "path", "<unmatched>")
+        over_budget = stats.over_budget()
+        metrics.HTTP_REQUEST_SQL_STATEMENTS.labels(route).observe(stats.statements)
+        for budget in over_budget:
+            metrics.HTTP_REQUEST_SQL_OVER_BUDGET.labels(route, budget).inc()
+
+        level = logging.WARNING if over_budget else logging.INFO
+        if not sql_logger.isEnabledFor(level):
+            return
+        sql_logger.log(level, json.dumps({
+            "event": "request_sql",
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status,
+            "statements": stats.statements,
+            "db_ms": round(stats.db_ms, 2),
+            "rows": stats.rows,
+            "duration_ms": round(duration * 1000, 2),
+            "over_budget": over_budget,
+        }))
+
+
+def install(app: Starlette) -> None:
+    """Add the service middleware to app; Prometheus ends up outermost, read-your-writes innermost"""
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(SqlAccountingMiddleware)
+    app.add_middleware(PrometheusMiddleware)
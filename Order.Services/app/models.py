@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Numeric
+from sqlalchemy import Boolean, Column, String, Date, DateTime, Text, ForeignKeyConstraint, Integer, BigInteger, LargeBinary, Numeric, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -84,7 +84,8 @@ class Order(Base):
     discount = Column(Numeric(12, 2), default=0)
     total_amount = Column(Numeric(12, 2), default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key (monthly ranges), so it is part of the primary key
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -92,6 +93,16 @@ class Order(Base):
     # profile = relationship("Profile", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # Composite indexes backing keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_orders_driver_id_created_at_id", "driver_id", "created_at", "id"),
+        Index("ix_orders_restaurant_id_created_at_id", "restaurant_id", "created_at", "id"),
+        # Monthly partitions are created by app.services.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def __repr__(self):
         return f"<Order(id={self.id}, profile_id={self.profile_id}, status={self.status})>"
 
@@ -101,7 +112,9 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    # Copy of orders.created_at: co-partitions items with their order
+    order_created_at = Column(DateTime, primary_key=True)
     product_id = Column(String(255), nullable=False)  # FK to Restaurant service menu
     
     product_name = Column(String(255), nullable=False)
@@ -114,5 +127,136 @@ class OrderItem(Base):
     # Relationship
     order = relationship("Order", back_populates="items")
 
+    __table_args__ = (
+        ForeignKeyConstraint(["order_id", "order_created_at"], ["orders.id", "orders.created_at"]),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
     def __repr__(self):
         return f"<OrderItem(id={self.id}, product_name={self.product_name}, qty={self.quantity})>"
+
+
+class OrderCounter(Base):
+    """Denormalized order counts per scope ("all:<shard>", "user:<user_id>"), maintained on create/delete"""
+    __tablename__ = "order_counters"
+
+    scope = Column(String(300), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OrderCounter(scope={self.scope}, count={self.count})>"
+
+
+class RestaurantDailySales(Base):
+    """
+    Per-restaurant daily sales of completed orders, maintained incrementally on status
+    changes (see crud.sales_rollup_change) and rebuilt by app.services.sales_rollup.
+    """
+    __tablename__ = "restaurant_daily_sales"
+
+    restaurant_id = Column(String(255), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of the order's created_at
+    order_count = Column(Integer, nullable=False, default=0)
+    gross = Column(Numeric(14, 2), nullable=False, default=0)  # Sum of order subtotals
+    items_sold = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RestaurantDailySales(restaurant_id={self.restaurant_id}, day={self.day}, orders={self.order_count})>"
+
+
+class OrderOutbox(Base):
+    """
+    Side effects of order status changes, written in the same transaction as the change
+    and drained asynchronously by app.services.outbox.OutboxDispatcher.
+    """
+    __tablename__ = "order_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    order_id = Column(UUID(as_uuid=True), nullable=False)
+    event_type = Column(String(30), nullable=False)  # The new order status
+    status = Column(String(20), default="pending", nullable=False)  # pending / done / failed
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Next attempt not before
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_order_outbox_pending",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Retention purge (see app.services.outbox.OutboxPurger)
+        Index(
+            "ix_order_outbox_done_processed_at",
+            "processed_at",
+            postgresql_where=text("status = 'done'"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OrderOutbox(id={self.id}, order_id={self.order_id}, event_type={self.event_type}, status={self.status})>"
+
+
+class OrderChange(Base):
+    """
+    Change feed log, written by triggers on orders (see the add_order_change_log migration):
+    one row per scope ("restaurant:<id>", "driver:<id>") an insert, update or delete touched.
+    present is false when the order left the scope (deleted, archived or reassigned).
+    """
+    __tablename__ = "order_changes"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    scope = Column(String(300), nullable=False)
+    order_id = Column(UUID(as_uuid=True), nullable=False)
+    xid = Column(BigInteger, nullable=False)  # Writing transaction; the feed only reads finished ones
+    present = Column(Boolean, nullable=False)
+    recorded_at = Column(DateTime, server_default=text("timezone('utc', now())"), nullable=False)  # UTC, like the other columns
+
+    __table_args__ = (
+        Index("ix_order_changes_scope_xid_seq", "scope", "xid", "seq"),
+        Index("ix_order_changes_xid_seq", "xid", "seq"),
+        Index("ix_order_changes_scope_order_id_seq", "scope", "order_id", "seq"),
+        Index("ix_order_changes_removed_recorded_at", "recorded_at", postgresql_where=text("NOT present")),
+    )
+
+    def __repr__(self):
+        return f"<OrderChange(seq={self.seq}, scope={self.scope}, order_id={self.order_id}, present={self.present})>"
+
+
+class OrderArchiveEntry(Base):
+    """Where an archived order was written in cold storage (see app.services.archive)"""
+    __tablename__ = "order_archive_index"
+
+    order_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(String(255), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    segment = Column(String(255), nullable=False)  # Archive file, relative to ORDER_ARCHIVE_DIR
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # User history merges archived orders in on the same (created_at, id) keyset
+    __table_args__ = (
+        Index("ix_order_archive_index_user_id_created_at_order_id", "user_id", "created_at", "order_id"),
+    )
+
+    def __repr__(self):
+        return f"<OrderArchiveEntry(order_id={self.order_id}, segment={self.segment})>"
+
+
+class IdempotencyKey(Base):
+    """Stored response of an idempotent POST /orders, replayed to retries until expires_at (see app.services.idempotency)"""
+    __tablename__ = "idempotency_keys"
+
+    key_hash = Column(LargeBinary(32), primary_key=True)  # sha256 of the Idempotency-Key header
+    request_hash = Column(LargeBinary(16), nullable=False)  # Fingerprint of the request body
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)  # zlib-compressed JSON
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key_hash={self.key_hash.hex()}, status_code={self.status_code})>"
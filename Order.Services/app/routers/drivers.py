@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from ..database import get_async_db
+from .. import schemas
+from ..services.driver_index import DRIVER_INDEX_MAX_RADIUS, index, sync
+from ..services.driver_service import DriverLocation
+
+router = APIRouter(
+    prefix="/drivers",
+    tags=["Drivers"],
+    responses={404: {"description": "Not found"}}
+)
+
+MAX_SEARCH_RADIUS = 50000  # meters
+
+
+def _to_location(update: schemas.DriverLocationUpdate) -> DriverLocation:
+    taken_at = update.updated_at or datetime.utcnow()
+    if taken_at.tzinfo is not None:
+        taken_at = taken_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return DriverLocation(
+        driver_id=update.driver_id,
+        latitude=update.latitude,
+        longitude=update.longitude,
+        updated_at=taken_at.isoformat()
+    )
+
+
+def _nearby_response(message: str, found: List[Tuple[DriverLocation, float]]) -> schemas.NearbyDriverListResponse:
+    return schemas.NearbyDriverListResponse(
+        success=True,
+        message=message,
+        data=[
+            schemas.NearbyDriver(
+                driver_id=location.driver_id,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                distance_m=round(distance, 1),
+                updated_at=location.updated_at
+            )
+            for location, distance in found
+        ]
+    )
+
+
+@router.post("/locations", response_model=schemas.DriverLocationBatchResponse)
+async def ingest_locations(batch: schemas.DriverLocationBatch, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cập nhật vị trí tài xế đang online (tối đa 1000 vị trí / request)
+
+    Tài xế không gửi vị trí mới trong DRIVER_LOCATION_TTL giây được coi là offline.
+    Vị trí cũ hơn vị trí đã biết của tài xế đó bị bỏ qua.
+    """
+    accepted = [location for location in map(_to_location, batch.locations) if index.update(location)]
+    await sync.publish(db, accepted)
+
+    return schemas.DriverLocationBatchResponse(
+        success=True,
+        message="Cập nhật vị trí tài xế thành công",
+        accepted=len(accepted),
+        ignored=len(batch.locations) - len(accepted)
+    )
+
+
+@router.delete("/{driver_id}/location", response_model=schemas.MessageResponse)
+async def remove_location(driver_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Tài xế offline: xóa khỏi chỉ mục vị trí"""
+    if not index.remove(driver_id):
+        raise HTTPException(status_code=404, detail="Tài xế không có trong chỉ mục vị trí")
+    await sync.publish_removal(db, driver_id)
+
+    return schemas.MessageResponse(
+        success=True,
+        message="Đã xóa vị trí tài xế"
+    )
+
+
+@router.get("/nearby", response_model=schemas.NearbyDriverListResponse)
+async def nearest_drivers(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100, description="Số tài xế gần nhất cần lấy"),
+    radius_m: float = Query(DRIVER_INDEX_MAX_RADIUS, gt=0, le=MAX_SEARCH_RADIUS, description="Bán kính tìm tối đa (mét)")
+):
+    """Lấy k tài xế online gần điểm nhất, gần nhất trước"""
+    return _nearby_response(
+        "Lấy danh sách tài xế gần nhất thành công",
+        index.nearest(latitude, longitude, k, max_radius_m=radius_m)
+    )
+
+
+@router.get("/within", response_model=schemas.NearbyDriverListResponse)
+async def drivers_within(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(..., gt=0, le=MAX_SEARCH_RADIUS, description="Bán kính (mét)"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Lấy các tài xế online trong bán kính radius_m quanh điểm, gần nhất trước"""
+    return _nearby_response(
+        "Lấy danh sách tài xế trong bán kính thành công",
+        index.within(latitude, longitude, radius_m, limit=limit)
+    )
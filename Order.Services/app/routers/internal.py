@@ -0,0 +1,66 @@
+from fastapi import APIRouter
+
+from .. import schemas
+from ..database import replicas
+from ..services import driver_index, http_pool, menu_service, order_events, resilience, restaurant_service
+from ..services.profile_cache import profile_cache
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+)
+
+
+@router.get("/http-pools")
+async def http_pool_stats():
+    """Connection pool usage of the downstream service clients"""
+    return {"success": True, "data": http_pool.all_pool_stats()}
+
+
+@router.get("/circuit-breakers")
+async def circuit_breaker_stats():
+    """State and trip counts of the downstream circuit breakers"""
+    return {"success": True, "data": resilience.all_breaker_stats()}
+
+
+@router.get("/order-events")
+async def order_event_stats():
+    """Live status subscribers and delivered/dropped event counts for this worker"""
+    return {"success": True, "data": order_events.broker.stats()}
+
+
+@router.get("/driver-index")
+async def driver_index_stats():
+    """Drivers and grid cells in this worker's location index"""
+    return {"success": True, "data": driver_index.sync.stats()}
+
+
+@router.get("/db-replicas")
+async def db_replica_stats():
+    """Health and replay lag of the read replicas, and how often reads fell back to the primary"""
+    return {"success": True, "data": replicas.stats()}
+
+
+@router.get("/caches")
+async def cache_stats():
+    """Hit ratio and memory use of the in-process caches"""
+    return {"success": True, "data": [
+        restaurant_service.restaurant_cache.stats(), menu_service.dish_cache.stats(), profile_cache.stats()
+    ]}
+
+
+@router.delete("/caches/restaurants/{restaurant_id}", response_model=schemas.MessageResponse)
+async def invalidate_restaurant(restaurant_id: str):
+    """Drop a cached restaurant (call after its details change in Restaurants.Services)"""
+    removed = restaurant_service.invalidate_restaurant(restaurant_id)
+    return schemas.MessageResponse(
+        success=True,
+        message="Đã xóa cache nhà hàng" if removed else "Nhà hàng không có trong cache"
+    )
+
+
+@router.delete("/caches/profiles", response_model=schemas.MessageResponse)
+async def clear_profile_cache():
+    """Drop every cached profile in this worker"""
+    profile_cache.invalidate()
+    return schemas.MessageResponse(success=True, message="Đã xóa cache profile")
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import json
 
-from ..database import get_db
-from .. import crud, schemas
-from ..services import driver_service, restaurant_service
+from ..database import get_db, get_read_db, get_async_db, AsyncSessionLocal
+from .. import crud, crud_async, schemas, serialization
+from ..services import archive, driver_service, idempotency, menu_service, restaurant_service, outbox, order_events
+from ..services.status_handler import StatusHandler
 
 router = APIRouter(
     prefix="/orders",
@@ -12,9 +21,134 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+CURSOR_DESCRIPTION = "Opaque cursor from a previous page's next_cursor (takes precedence over skip)"
+INCLUDE_TOTAL_DESCRIPTION = "Set to false to skip computing total"
+SINCE_DESCRIPTION = (
+    "Change feed token from a previous next_since; pass an empty value to start from the beginning. "
+    "Returns only orders created or updated after the token, oldest first, and in removed those that were "
+    "deleted, archived or reassigned (skip and cursor are ignored)"
+)
+
+
+def _order_projection(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated OrderResponse fields to return, e.g. id,status,total_amount"
+    ),
+    view: Optional[str] = Query(
+        None, description="full (default) or summary: id, status, restaurant_id, total_amount, created_at"
+    ),
+) -> Optional[Tuple[str, ...]]:
+    """Sparse fieldset for list endpoints; None means the full OrderResponse"""
+    try:
+        return crud.order_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _created_range(
+    created_from: Optional[datetime] = Query(None, description="Only orders created at or after this time (UTC)"),
+    created_to: Optional[datetime] = Query(None, description="Only orders created before this time (UTC)"),
+    recent_days: Optional[int] = Query(
+        None, ge=1, le=366, description="Only orders created in the last N days; reads only the recent monthly partitions"
+    ),
+) -> Optional[crud.CreatedRange]:
+    """created_at bounds for list endpoints, so Postgres reads only the matching partitions"""
+    try:
+        return crud.created_range(created_from, created_to, recent_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _row_columns(projection: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    """Columns to select as plain rows, or None to load Order objects"""
+    if projection is not None:
+        return crud.order_columns(projection)
+    if serialization.FAST_JSON_RESPONSES:
+        return crud.ORDER_COLUMNS
+    return None
+
+
+def _order_list_response(
+    db: Session, message: str, orders: list, projection: Optional[Tuple[str, ...]], **meta
+):
+    """OrderListResponse, or its orjson-encoded equivalent when orders are plain rows"""
+    if projection is None and not serialization.FAST_JSON_RESPONSES:
+        return schemas.OrderListResponse(success=True, message=message, data=orders, **meta)
+    fields = projection or crud.ORDER_FIELDS
+    items_by_order = {}
+    if "items" in fields:
+        # Archived orders carry their items; hot rows get theirs in one query
+        hot = [order for order in orders if not isinstance(order, archive.ArchivedOrder)]
+        items_by_order = crud.get_order_item_rows(db, hot)
+        items_by_order.update(
+            (order.id, order.items) for order in orders if isinstance(order, archive.ArchivedOrder)
+        )
+    return serialization.order_list_response(message, orders, items_by_order, fields, **meta)
+
+
+async def _verified_items(order: schemas.OrderCreate) -> schemas.OrderCreate:
+    try:
+        return await menu_service.verify_order_items(order)
+    except menu_service.OrderItemsRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def _verified_batch(batch: schemas.OrderBatchCreate) -> List[schemas.OrderCreate]:
+    try:
+        return await menu_service.verify_orders(batch.orders)
+    except menu_service.OrderItemsRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Đơn hàng thứ {e.index}: {e.detail}")
+
+
+async def _create_once(
+    db: AsyncSession,
+    idempotency_key: Optional[str],
+    body: BaseModel,
+    verify: Callable[[], Awaitable[Any]],
+    create: Callable[[Any], Awaitable[BaseModel]],
+) -> Response:
+    """
+    Run verify() then create(verified) and return its response with status 201.
+    create() must not commit: with an Idempotency-Key its writes commit together
+    with the stored response, and a retry replays that response.
+    """
+    if idempotency_key is None:
+        response = await create(await verify())
+        await db.commit()
+        outbox.dispatcher.wake()
+        return Response(response.model_dump_json(), status_code=201, media_type="application/json")
+
+    key = idempotency.key_hash(idempotency_key)
+    fingerprint = idempotency.request_hash(body)
+    try:
+        # A retry replays its response even if the menu changed since
+        stored = await idempotency.lookup(db, key, fingerprint)
+        if stored is not None:
+            return stored
+        # Checked with no transaction open, so no lock is held across the call to Restaurants.Services
+        verified = await verify()
+        stored = await idempotency.claim(db, key, fingerprint)
+    except idempotency.IdempotencyKeyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key đã được dùng cho một yêu cầu khác")
+    if stored is not None:
+        return stored
+
+    # The orders, the counters, the outbox rows and the stored response commit together
+    content = (await create(verified)).model_dump_json().encode()
+    await idempotency.complete(db, key, 201, content)
+    await db.commit()
+    outbox.dispatcher.wake()
+    return Response(content, status_code=201, media_type="application/json")
+
 
 @router.post("/", response_model=schemas.OrderSingleResponse, status_code=201)
-async def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
+async def create_order(
+    order: schemas.OrderCreate,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Client-generated key; retries with the same key return the first response"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Tạo đơn hàng mới
 
@@ -22,33 +156,91 @@ async def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)
     - **restaurant_id**: ID của nhà hàng
     - **items**: Danh sách món ăn
     - **delivery_address**: Địa chỉ giao hàng
+    - **Idempotency-Key** (header): gửi lại cùng key sẽ nhận lại response cũ, không tạo đơn trùng
+
+    Món, giá (sau giảm giá) và tình trạng còn hàng được kiểm tra với Restaurants.Services
+    (400 món không thuộc nhà hàng, 409 hết hàng / giá đã đổi, 503 không kiểm tra được).
     """
-    created_order = crud.create_order(db=db, order=order)
+    async def create(verified: schemas.OrderCreate) -> schemas.OrderSingleResponse:
+        created_order = await crud_async.create_order(db=db, order=verified, commit=False)
+        return schemas.OrderSingleResponse(
+            success=True,
+            message="Tạo đơn hàng thành công",
+            data=created_order
+        )
 
-    return schemas.OrderSingleResponse(
-        success=True,
-        message="Tạo đơn hàng thành công",
-        data=created_order
-    )
+    return await _create_once(db, idempotency_key, order, lambda: _verified_items(order), create)
+
+
+@router.post("/batch", response_model=schemas.OrderBatchResponse, status_code=201)
+async def create_orders_batch(
+    batch: schemas.OrderBatchCreate,
+    idempotency_key: Optional[str] = Header(
+        None, max_length=255, description="Client-generated key; retries with the same key return the first response"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Tạo nhiều đơn hàng cùng lúc (tối đa 1000 đơn / request)
+
+    Toàn bộ payload được kiểm tra trước, kể cả món và giá với Restaurants.Services như khi tạo
+    một đơn (lỗi ghi rõ đơn hàng thứ mấy); tất cả đơn được tạo trong một transaction
+    (hoặc không đơn nào được tạo nếu có lỗi). Hỗ trợ header **Idempotency-Key** như POST /orders.
+    """
+    async def create(verified: List[schemas.OrderCreate]) -> schemas.OrderBatchResponse:
+        rows = await crud_async.create_orders_batch(db=db, orders=verified, commit=False)
+        return schemas.OrderBatchResponse(
+            success=True,
+            message="Tạo đơn hàng hàng loạt thành công",
+            data=[
+                schemas.OrderBatchResult(
+                    index=index, id=row["id"], status=row["status"], total_amount=row["total_amount"]
+                )
+                for index, row in enumerate(rows)
+            ],
+            total=len(rows)
+        )
+
+    return await _create_once(db, idempotency_key, batch, lambda: _verified_batch(batch), create)
 
 
 @router.get("/", response_model=schemas.OrderListResponse)
 def read_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(True, description=INCLUDE_TOTAL_DESCRIPTION),
+    estimate: bool = Query(False, description="Return an approximate total from planner statistics"),
+    projection: Optional[Tuple[str, ...]] = Depends(_order_projection),
+    created: Optional[crud.CreatedRange] = Depends(_created_range),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lấy danh sách tất cả đơn hàng
     """
-    orders = crud.get_orders(db, skip=skip, limit=limit)
-    total = crud.get_orders_count(db)
+    try:
+        orders = crud.get_orders(
+            db, skip=skip, limit=limit, cursor=cursor, columns=_row_columns(projection), created=created
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = None
+    total_estimated = False
+    if include_total and estimate and created is None:
+        total = crud.get_orders_count_estimate(db)
+        total_estimated = total is not None
+    if include_total and total is None:
+        total = crud.get_orders_count(db, created=created)
     
-    return schemas.OrderListResponse(
-        success=True,
-        message="Lấy danh sách đơn hàng thành công",
-        data=orders,
-        total=total
+    return _order_list_response(
+        db,
+        "Lấy danh sách đơn hàng thành công",
+        orders,
+        projection,
+        total=total,
+        total_estimated=total_estimated,
+        next_cursor=crud.next_cursor(orders, limit)
     )
 
 
@@ -58,6 +250,9 @@ def read_order(order_id: str, db: Session = Depends(get_db)):
     Lấy chi tiết đơn hàng
     """
     db_order = crud.get_order(db, order_id=order_id)
+    if db_order is None:
+        # Not in the hot tables: try the (slower) archive read-through
+        db_order = archive.get_archived_order(db, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
     
@@ -68,42 +263,136 @@ def read_order(order_id: str, db: Session = Depends(get_db)):
     )
 
 
+async def _current_status_event(order_id: str) -> Optional[str]:
+    """Initial event for a new subscriber, so it never waits for the next change"""
+    async with AsyncSessionLocal() as db:
+        status = await crud_async.get_order_status(db, order_id)
+    if status is None:
+        return None
+    return json.dumps({"order_id": order_id, "status": status})
+
+
+@router.get("/{order_id}/events")
+async def stream_order_status(order_id: str):
+    """
+    Theo dõi trạng thái đơn hàng theo thời gian thực (Server-Sent Events)
+
+    Gửi trạng thái hiện tại ngay khi kết nối, sau đó mỗi lần trạng thái thay đổi.
+    Gửi `: ping` định kỳ để giữ kết nối.
+    """
+    # Subscribe before reading the status so a change committed in between is queued, not lost
+    # (at worst the client sees the same status twice)
+    subscription = order_events.broker.subscribe(order_id)
+    try:
+        initial = await _current_status_event(order_id)
+    except Exception:
+        order_events.broker.unsubscribe(subscription)
+        raise
+    if initial is None:
+        order_events.broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
+
+    async def events():
+        try:
+            yield f"event: status\ndata: {initial}\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=order_events.ORDER_EVENTS_HEARTBEAT
+                    )
+                    yield f"event: status\ndata: {payload}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            order_events.broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also covers a client that disconnects before the generator starts
+        background=BackgroundTask(order_events.broker.unsubscribe, subscription),
+    )
+
+
+@router.websocket("/{order_id}/ws")
+async def order_status_websocket(websocket: WebSocket, order_id: str):
+    """Theo dõi trạng thái đơn hàng qua WebSocket (cùng nội dung với /events)"""
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    # Subscribe before reading the status so a change committed in between is queued, not lost
+    subscription = order_events.broker.subscribe(order_id)
+    disconnected = None
+    try:
+        initial = await _current_status_event(order_id)
+        if initial is None:
+            await websocket.close(code=4404)
+            return
+
+        await websocket.accept()
+        disconnected = asyncio.ensure_future(wait_for_disconnect())
+        await websocket.send_text(initial)
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=order_events.ORDER_EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_event in done:
+                await websocket.send_text(next_event.result())
+                continue
+            next_event.cancel()
+            if not disconnected.done():
+                await websocket.send_json({"type": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if disconnected is not None:
+            disconnected.cancel()
+        order_events.broker.unsubscribe(subscription)
+
+
 @router.put("/{order_id}", response_model=schemas.OrderSingleResponse)
 async def update_order(
-    order_id: str, order_update: schemas.OrderUpdate, db: Session = Depends(get_db)
+    order_id: str, order_update: schemas.OrderUpdate, db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cập nhật đơn hàng (trạng thái, driver, địa chỉ...)
     Status-driven endpoint that applies business logic based on status transitions.
     """
-    db_order = crud.get_order(db, order_id=order_id)
-    if db_order is None:
-        raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
-
-    # Import here to avoid circular import issues
-    try:
-        from ..services.status_handler import StatusHandler
-    except ImportError:
-        # Fallback if import fails
-        StatusHandler = None
-
-    # Validate status transition if status is being updated
-    if order_update.status and StatusHandler:
-        handler = StatusHandler(db)
-        if not handler.validate_status_transition(db_order.status, order_update.status):
+    if order_update.status:
+        current_status = await crud_async.get_order_status(db, order_id)
+        if current_status is None:
+            raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
+        if not StatusHandler(db).validate_status_transition(current_status, order_update.status):
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid status transition from {db_order.status} to {order_update.status.value}",
+                detail=f"Invalid status transition from {current_status} to {order_update.status.value}",
+            )
+        # Compare-and-set on the validated status, so concurrent transitions can't both win
+        updated_order, changed_to = await crud_async.transition_order(
+            db=db, order_id=order_id, order_update=order_update, expected_status=current_status
+        )
+        if updated_order is None and changed_to is None:
+            raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
+        if updated_order is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Order status changed from {current_status} to {changed_to} during the update; retry",
             )
 
-    updated_order = crud.update_order(
-        db=db, order_id=order_id, order_update=order_update
-    )
-
-    # Apply status-driven logic if status was updated
-    if order_update.status and StatusHandler:
-        handler = StatusHandler(db)
-        await handler.handle_status_update(updated_order, order_update.status)
+        # Status-driven side effects were written to the outbox with the update;
+        # nudge the dispatcher instead of calling downstream services inline
+        outbox.dispatcher.wake()
+    else:
+        updated_order = await crud_async.update_order(
+            db=db, order_id=order_id, order_update=order_update
+        )
+        if updated_order is None:
+            raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
 
     return schemas.OrderSingleResponse(
         success=True,
@@ -113,11 +402,11 @@ async def update_order(
 
 
 @router.delete("/{order_id}", response_model=schemas.MessageResponse)
-def delete_order(order_id: str, db: Session = Depends(get_db)):
+async def delete_order(order_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Xóa đơn hàng
     """
-    success = crud.delete_order(db=db, order_id=order_id)
+    success = await crud_async.delete_order(db=db, order_id=order_id)
     if not success:
         raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại")
     
@@ -128,11 +417,11 @@ def delete_order(order_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{order_id}/cancel", response_model=schemas.OrderSingleResponse)
-def cancel_order(order_id: str, db: Session = Depends(get_db)):
+async def cancel_order(order_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Hủy đơn hàng
     """
-    db_order = crud.cancel_order(db=db, order_id=order_id)
+    db_order = await crud_async.cancel_order(db=db, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=400, detail="Không thể hủy đơn hàng này")
     
@@ -149,19 +438,31 @@ def read_user_orders(
     user_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(True, description=INCLUDE_TOTAL_DESCRIPTION),
+    projection: Optional[Tuple[str, ...]] = Depends(_order_projection),
+    created: Optional[crud.CreatedRange] = Depends(_created_range),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lấy lịch sử mua hàng của user
     """
-    orders = crud.get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit)
-    total = crud.get_orders_count_by_user(db, user_id=user_id)
+    try:
+        orders, next_cursor = archive.get_orders_by_user(
+            db, user_id=user_id, skip=skip, limit=limit, cursor=cursor,
+            columns=_row_columns(projection), created=created
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = archive.get_orders_count_by_user(db, user_id=user_id, created=created) if include_total else None
     
-    return schemas.OrderListResponse(
-        success=True,
-        message="Lấy lịch sử đơn hàng thành công",
-        data=orders,
-        total=total
+    return _order_list_response(
+        db,
+        "Lấy lịch sử đơn hàng thành công",
+        orders,
+        projection,
+        total=total,
+        next_cursor=next_cursor
     )
 
 
@@ -171,18 +472,77 @@ def read_driver_orders(
     driver_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    since: Optional[str] = Query(None, description=SINCE_DESCRIPTION),
+    projection: Optional[Tuple[str, ...]] = Depends(_order_projection),
+    created: Optional[crud.CreatedRange] = Depends(_created_range),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách đơn hàng của driver
     """
-    orders = crud.get_orders_by_driver(db, driver_id=driver_id, skip=skip, limit=limit)
+    if since is not None:
+        try:
+            changes, removed, next_since = crud.get_order_changes_by_driver(
+                db, driver_id=driver_id, since=since, limit=limit, columns=_row_columns(projection)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _order_list_response(
+            db,
+            "Lấy danh sách đơn hàng driver thành công",
+            changes,
+            projection,
+            total=len(changes),
+            next_since=next_since,
+            removed=removed
+        )
+
+    try:
+        orders = crud.get_orders_by_driver(
+            db, driver_id=driver_id, skip=skip, limit=limit, cursor=cursor,
+            columns=_row_columns(projection), created=created
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return schemas.OrderListResponse(
+    return _order_list_response(
+        db,
+        "Lấy danh sách đơn hàng driver thành công",
+        orders,
+        projection,
+        total=len(orders),
+        next_cursor=crud.next_cursor(orders, limit)
+    )
+
+
+# Daily sales of a restaurant
+@router.get("/restaurant/{restaurant_id}/stats", response_model=schemas.RestaurantStatsResponse)
+def read_restaurant_stats(
+    restaurant_id: str,
+    date_from: Optional[date] = Query(None, alias="from", description="First day, inclusive (default: 29 days before to)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last day, inclusive (default: today, UTC)"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Thống kê doanh thu theo ngày của nhà hàng (đơn đã hoàn thành)
+    """
+    try:
+        date_from, date_to = crud.daily_sales_range(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    days = crud.get_daily_sales(db, restaurant_id=restaurant_id, day_from=date_from, day_to=date_to)
+
+    return schemas.RestaurantStatsResponse(
         success=True,
-        message="Lấy danh sách đơn hàng driver thành công",
-        data=orders,
-        total=len(orders)
+        message="Lấy thống kê doanh thu thành công",
+        restaurant_id=restaurant_id,
+        date_from=date_from,
+        date_to=date_to,
+        data=days,
+        order_count=sum(day.order_count for day in days),
+        gross=sum((day.gross for day in days), Decimal("0")),
+        items_sold=sum(day.items_sold for day in days),
     )
 
 
@@ -192,16 +552,45 @@ def read_restaurant_orders(
     restaurant_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    since: Optional[str] = Query(None, description=SINCE_DESCRIPTION),
+    projection: Optional[Tuple[str, ...]] = Depends(_order_projection),
+    created: Optional[crud.CreatedRange] = Depends(_created_range),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách đơn hàng của nhà hàng
     """
-    orders = crud.get_orders_by_restaurant(db, restaurant_id=restaurant_id, skip=skip, limit=limit)
+    if since is not None:
+        try:
+            changes, removed, next_since = crud.get_order_changes_by_restaurant(
+                db, restaurant_id=restaurant_id, since=since, limit=limit, columns=_row_columns(projection)
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _order_list_response(
+            db,
+            "Lấy danh sách đơn hàng nhà hàng thành công",
+            changes,
+            projection,
+            total=len(changes),
+            next_since=next_since,
+            removed=removed
+        )
+
+    try:
+        orders = crud.get_orders_by_restaurant(
+            db, restaurant_id=restaurant_id, skip=skip, limit=limit, cursor=cursor,
+            columns=_row_columns(projection), created=created
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return schemas.OrderListResponse(
-        success=True,
-        message="Lấy danh sách đơn hàng nhà hàng thành công",
-        data=orders,
-        total=len(orders)
+    return _order_list_response(
+        db,
+        "Lấy danh sách đơn hàng nhà hàng thành công",
+        orders,
+        projection,
+        total=len(orders),
+        next_cursor=crud.next_cursor(orders, limit)
     )
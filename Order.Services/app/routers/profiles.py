@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from ..database import get_db
-from .. import schemas
+from ..database import get_db, get_read_db
+from .. import crud, schemas
 from ..models import Profile
+from ..services import profile_import
+from ..services.profile_cache import profile_cache
 
 router = APIRouter(
     prefix="/profiles",
@@ -13,35 +16,19 @@ router = APIRouter(
 )
 
 
+PROFILE_CONFLICT_MESSAGES = {
+    "email": "Email đã tồn tại",
+    "phone": "Số điện thoại đã tồn tại",
+    "user_id": "User ID đã tồn tại",
+}
+
+
 @router.post("/", response_model=schemas.ProfileSingleResponse, status_code=201)
 def create_profile(profile: schemas.ProfileCreate, db: Session = Depends(get_db)):
     """Tạo profile mới"""
-    # Check email exists
-    existing = db.query(Profile).filter(Profile.email == profile.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email đã tồn tại")
-    
-    # Check phone exists
-    existing = db.query(Profile).filter(Profile.phone == profile.phone).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Số điện thoại đã tồn tại")
-    # Check user_id exists
-    existing = db.query(Profile).filter(Profile.user_id == profile.user_id).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="User ID đã tồn tại")
-    
-    db_profile = Profile(
-        user_id=profile.user_id,
-        name=profile.name,
-        email=profile.email,
-        phone=profile.phone,
-        role="user",  # Default role
-        avatar=profile.avatar,
-        address=profile.address
-    )
-    db.add(db_profile)
-    db.commit()
-    db.refresh(db_profile)
+    db_profile, conflict = crud.create_profile(db, profile)
+    if conflict:
+        raise HTTPException(status_code=400, detail=PROFILE_CONFLICT_MESSAGES[conflict])
     
     return schemas.ProfileSingleResponse(
         success=True,
@@ -50,11 +37,33 @@ def create_profile(profile: schemas.ProfileCreate, db: Session = Depends(get_db)
     )
 
 
+@router.post("/import", response_model=schemas.ProfileImportResponse)
+def import_profiles(payload: schemas.ProfileBulkCreate, db: Session = Depends(get_db)):
+    """
+    Nhập profile hàng loạt (tối đa 10000 / request): tạo mới hoặc cập nhật theo user_id
+
+    Dữ liệu được COPY vào bảng tạm rồi merge bằng một câu INSERT ... ON CONFLICT.
+    Các dòng trùng email / số điện thoại / user_id bị bỏ qua và trả về trong `conflicts`.
+    """
+    try:
+        result = profile_import.merge_batch(db, list(enumerate(payload.profiles)))
+    except IntegrityError:
+        # A concurrent write took an email/phone between the conflict check and the merge
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Dữ liệu profile vừa thay đổi, vui lòng thử lại")
+
+    return schemas.ProfileImportResponse(
+        success=True,
+        message="Nhập profile hàng loạt thành công",
+        **result.as_dict()
+    )
+
+
 @router.get("/", response_model=schemas.ProfileListResponse)
 def read_profiles(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Lấy danh sách profiles"""
     profiles = db.query(Profile).offset(skip).limit(limit).all()
@@ -70,15 +79,15 @@ def read_profiles(
 
 @router.get("/{user_id}", response_model=schemas.ProfileSingleResponse)
 def read_profile(user_id: str, db: Session = Depends(get_db)):
-    """Lấy thông tin profile theo user_id"""
-    db_profile = db.query(Profile).filter(Profile.user_id == user_id).first()
-    if not db_profile:
+    """Lấy thông tin profile theo user_id (có cache trong tiến trình, xem services.profile_cache)"""
+    profile = profile_cache.get_profile(db, user_id)
+    if not profile:
         raise HTTPException(status_code=404, detail="Profile không tồn tại")
     
     return schemas.ProfileSingleResponse(
         success=True,
         message="Lấy thông tin profile thành công",
-        data=db_profile
+        data=profile
     )
 
 
@@ -99,7 +108,9 @@ def update_profile(user_id: str, profile_update: schemas.ProfileUpdate, db: Sess
     for field, value in update_data.items():
         setattr(db_profile, field, value)
     
+    profile_cache.notify(db, user_id)
     db.commit()
+    profile_cache.invalidate(user_id)
     db.refresh(db_profile)
     
     return schemas.ProfileSingleResponse(
@@ -117,7 +128,9 @@ def delete_profile(user_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Profile không tồn tại")
     
     db.delete(db_profile)
+    profile_cache.notify(db, user_id)
     db.commit()
+    profile_cache.invalidate(user_id)
     
     return schemas.MessageResponse(
         success=True,
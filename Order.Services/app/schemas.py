@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, field_serializer
 from typing import Optional, List, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from decimal import Decimal
 from uuid import UUID
@@ -24,6 +24,10 @@ class ProfileCreate(BaseModel):
     address: Optional[str] = None
 
 
+class ProfileBulkCreate(BaseModel):
+    profiles: List[ProfileCreate] = Field(..., min_length=1, max_length=10000)
+
+
 class ProfileUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     email: Optional[EmailStr] = None
@@ -108,6 +112,10 @@ class OrderCreate(BaseModel):
     items: List[OrderItemCreate] = Field(..., min_length=1)
 
 
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class OrderUpdate(BaseModel):
     status: Optional[OrderStatus] = None
     payment_status: Optional[PaymentStatus] = None
@@ -142,6 +150,37 @@ class OrderResponse(BaseModel):
         return str(v) if v else None
 
 
+class DailySalesResponse(BaseModel):
+    day: date
+    order_count: int
+    gross: Decimal
+    items_sold: int
+
+    class Config:
+        from_attributes = True
+
+
+# ========== Driver Location Schemas ==========
+
+class DriverLocationUpdate(BaseModel):
+    driver_id: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    updated_at: Optional[datetime] = None  # When the device took the fix; defaults to when it was received
+
+
+class DriverLocationBatch(BaseModel):
+    locations: List[DriverLocationUpdate] = Field(..., min_length=1, max_length=1000)
+
+
+class NearbyDriver(BaseModel):
+    driver_id: str
+    latitude: float
+    longitude: float
+    distance_m: float
+    updated_at: Optional[str]
+
+
 # ========== Response Wrappers ==========
 
 class ProfileListResponse(BaseModel):
@@ -157,11 +196,37 @@ class ProfileSingleResponse(BaseModel):
     data: ProfileResponse
 
 
+class ProfileImportConflict(BaseModel):
+    index: int  # Position in the request payload (line number for file imports)
+    user_id: Optional[str]
+    field: str  # user_id / email / phone, or "row" for a row that failed validation
+    reason: str
+
+
+class ProfileImportResponse(BaseModel):
+    success: bool = True
+    message: str = "Success"
+    inserted: int
+    updated: int
+    unchanged: int
+    conflicts: List[ProfileImportConflict]  # Rows that were skipped
+
+
+class OrderRemoval(BaseModel):
+    """Change feed tombstone: the order left the restaurant's or driver's list"""
+    id: Any
+    reason: str  # deleted / archived / reassigned
+
+
 class OrderListResponse(BaseModel):
     success: bool = True
     message: str = "Success"
     data: List[OrderResponse]
-    total: int
+    total: Optional[int]  # None when requested with include_total=false
+    total_estimated: bool = False  # True when total comes from planner statistics
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    next_since: Optional[str] = None  # Change feed only: pass as ?since= on the next poll
+    removed: Optional[List[OrderRemoval]] = None  # Change feed only: orders that left the list
 
 
 class OrderSingleResponse(BaseModel):
@@ -170,6 +235,49 @@ class OrderSingleResponse(BaseModel):
     data: OrderResponse
 
 
+class OrderBatchResult(BaseModel):
+    index: int  # Position in the request payload
+    id: Any
+    status: str
+    total_amount: Decimal
+
+    @field_serializer('id')
+    def serialize_uuid(self, v):
+        return str(v) if v else None
+
+
+class OrderBatchResponse(BaseModel):
+    success: bool = True
+    message: str = "Success"
+    data: List[OrderBatchResult]
+    total: int
+
+
+class RestaurantStatsResponse(BaseModel):
+    success: bool = True
+    message: str = "Success"
+    restaurant_id: str
+    date_from: date
+    date_to: date  # Inclusive
+    data: List[DailySalesResponse]  # Days without completed orders are omitted
+    order_count: int
+    gross: Decimal
+    items_sold: int
+
+
+class DriverLocationBatchResponse(BaseModel):
+    success: bool = True
+    message: str = "Success"
+    accepted: int
+    ignored: int  # Older than the location already known for that driver
+
+
+class NearbyDriverListResponse(BaseModel):
+    success: bool = True
+    message: str = "Success"
+    data: List[NearbyDriver]  # Closest first
+
+
 class MessageResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,86 @@
+"""
+Fast JSON path for order list endpoints.
+
+List responses normally go through OrderListResponse: ORM objects are validated
+with from_attributes and every UUID runs through a Python field_serializer.
+With FAST_JSON_RESPONSES enabled, crud returns plain row tuples instead and the
+payload is encoded by orjson straight from those rows. The output has the same
+shape and value formatting as the pydantic responses.
+
+Sparse lists (?fields= / ?view=summary) always take this path, since they select
+only the requested columns and have no full OrderResponse to validate.
+"""
+import os
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+def _default(value: Any) -> Any:
+    # pydantic emits Decimal as a JSON string; orjson has no native Decimal support
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return str(value) if value else None
+
+
+def _item_dict(item) -> Dict[str, Any]:
+    return {
+        "id": _str_or_none(item.id),
+        "product_id": _str_or_none(item.product_id),
+        "product_name": item.product_name,
+        "quantity": item.quantity,
+        "unit_price": item.unit_price,
+        "note": item.note,
+        "created_at": item.created_at,
+    }
+
+
+_UUID_FIELDS = {"id", "restaurant_id", "driver_id"}
+
+
+def _order_dict(order, items: Sequence, fields: Sequence[str]) -> Dict[str, Any]:
+    data = {}
+    for field in fields:
+        if field == "items":
+            data["items"] = [_item_dict(item) for item in items]
+        elif field in _UUID_FIELDS:
+            data[field] = _str_or_none(getattr(order, field))
+        else:
+            data[field] = getattr(order, field)
+    return data
+
+
+def order_list_response(
+    message: str,
+    orders: Sequence,
+    items_by_order: Dict[Any, List],
+    fields: Sequence[str],
+    total: Optional[int],
+    total_estimated: bool = False,
+    next_cursor: Optional[str] = None,
+    next_since: Optional[str] = None,
+    removed: Optional[List[dict]] = None,
+) -> Response:
+    """
+    Encode an OrderListResponse-shaped payload from order rows and their item rows.
+    Each order carries only `fields` (OrderResponse names), so this also serves sparse lists.
+    """
+    payload = {
+        "success": True,
+        "message": message,
+        "data": [_order_dict(order, items_by_order.get(order.id, ()), fields) for order in orders],
+        "total": total,
+        "total_estimated": total_estimated,
+        "next_cursor": next_cursor,
+        "next_since": next_since,
+        "removed": removed,
+    }
+    return Response(orjson.dumps(payload, default=_default), media_type="application/json")
@@ -0,0 +1,399 @@
+"""
+Archival of old terminal orders to compressed, append-only files.
+
+Delivered and cancelled orders created more than ORDER_ARCHIVE_RETENTION_DAYS ago
+(and not touched since) are moved out of orders/order_items in batches of
+ORDER_ARCHIVE_BATCH_SIZE, each in its own short transaction:
+
+1. Lock a batch with FOR UPDATE SKIP LOCKED. The created_at bound keeps the scan
+   on the old monthly partitions.
+2. Write the orders with their items to a new gzip JSON-lines segment and fsync it.
+3. Record each order's segment in order_archive_index and delete the hot rows.
+
+Segments are never modified once written. If step 3 fails the rows stay hot and a
+later batch archives them again into a new segment, so the orphaned copy is never
+referenced. ORDER_ARCHIVE_DIR must be storage shared by every worker.
+
+Reads go through order_archive_index: get_archived_order and get_orders_by_user
+return ArchivedOrder records, which serialize exactly like Order. Archived orders
+are read-only and still count in the order counters (get_orders_count_by_user adds
+them for a created range). An order whose segment can't be read (storage
+unavailable, file missing or corrupt) is logged and left out, as if it did not
+exist, instead of failing the request.
+
+Run it in-process (ORDER_ARCHIVE_ENABLED=true) or from cron:
+    python -m app.services.archive --retention-days 120
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Numeric, delete, insert, tuple_
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session, selectinload
+
+from .. import crud, models
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ORDER_ARCHIVE_ENABLED = os.getenv("ORDER_ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes")
+ORDER_ARCHIVE_DIR = os.getenv("ORDER_ARCHIVE_DIR", "archive")
+ORDER_ARCHIVE_RETENTION_DAYS = int(os.getenv("ORDER_ARCHIVE_RETENTION_DAYS", "120"))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "500"))
+ORDER_ARCHIVE_BATCH_PAUSE = float(os.getenv("ORDER_ARCHIVE_BATCH_PAUSE", "0.5"))  # seconds between batches
+ORDER_ARCHIVE_INTERVAL = float(os.getenv("ORDER_ARCHIVE_INTERVAL", "3600"))  # seconds between runs
+ORDER_ARCHIVE_CACHE_SEGMENTS = int(os.getenv("ORDER_ARCHIVE_CACHE_SEGMENTS", "64"))
+
+ARCHIVE_STATUSES = ("delivered", "cancelled")
+
+
+@dataclass
+class ArchivedItem:
+    id: uuid.UUID
+    order_id: uuid.UUID
+    order_created_at: datetime
+    product_id: str
+    product_name: str
+    quantity: int
+    unit_price: Decimal
+    note: Optional[str]
+    created_at: datetime
+
+
+@dataclass
+class ArchivedOrder:
+    """An order read back from cold storage; has the attributes of models.Order"""
+    id: uuid.UUID
+    user_id: str
+    restaurant_id: str
+    driver_id: Optional[str]
+    status: str
+    payment_status: str
+    payment_method: Optional[str]
+    delivery_address: str
+    delivery_note: Optional[str]
+    subtotal: Decimal
+    delivery_fee: Decimal
+    discount: Decimal
+    total_amount: Decimal
+    created_at: datetime
+    updated_at: datetime
+    items: List[ArchivedItem] = field(default_factory=list)
+
+
+# ========== Records ==========
+
+def _decoders(table) -> Dict[str, Any]:
+    """Per-column parser for the JSON form written by _encode"""
+    decoders = {}
+    for column in table.columns:
+        if isinstance(column.type, UUID):
+            decoders[column.name] = uuid.UUID
+        elif isinstance(column.type, Numeric):
+            decoders[column.name] = Decimal
+        elif isinstance(column.type, DateTime):
+            decoders[column.name] = datetime.fromisoformat
+    return decoders
+
+
+_ORDER_DECODERS = _decoders(models.Order.__table__)
+_ITEM_DECODERS = _decoders(models.OrderItem.__table__)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _row_dict(obj, table) -> Dict[str, Any]:
+    return {column.name: _encode(getattr(obj, column.name)) for column in table.columns}
+
+
+def _decode(record: Dict[str, Any], decoders: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: decoders[name](value) if value is not None and name in decoders else value
+        for name, value in record.items()
+    }
+
+
+def order_record(order: models.Order) -> Dict[str, Any]:
+    record = _row_dict(order, models.Order.__table__)
+    record["items"] = [_row_dict(item, models.OrderItem.__table__) for item in order.items]
+    return record
+
+
+def archived_order(record: Dict[str, Any]) -> ArchivedOrder:
+    items = [ArchivedItem(**_decode(item, _ITEM_DECODERS)) for item in record["items"]]
+    order = {name: value for name, value in record.items() if name != "items"}
+    return ArchivedOrder(**_decode(order, _ORDER_DECODERS), items=items)
+
+
+# ========== Segments ==========
+
+def write_segment(records: List[Dict[str, Any]], archive_dir: Optional[str] = None) -> str:
+    """Write a new segment durably (temp file, fsync, rename); returns its relative name"""
+    archive_dir = archive_dir or ORDER_ARCHIVE_DIR
+    now = datetime.utcnow()
+    segment = f"{now:%Y-%m}/orders-{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    path = os.path.join(archive_dir, segment)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False).encode())
+                out.write(b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return segment
+
+
+@lru_cache(maxsize=ORDER_ARCHIVE_CACHE_SEGMENTS)
+def _read_segment(archive_dir: str, segment: str) -> Dict[str, Dict[str, Any]]:
+    # Segments are immutable, so the parsed form can be cached indefinitely
+    with gzip.open(os.path.join(archive_dir, segment), "rb") as lines:
+        records = (json.loads(line) for line in lines if line.strip())
+        return {record["id"]: record for record in records}
+
+
+def _load(entries: List[models.OrderArchiveEntry], archive_dir: str) -> Dict[uuid.UUID, ArchivedOrder]:
+    """Archived orders by id; entries whose segment or record can't be read are left out"""
+    orders = {}
+    unreadable = set()
+    for entry in entries:
+        if entry.segment in unreadable:
+            continue
+        try:
+            segment = _read_segment(archive_dir, entry.segment)
+        except (OSError, EOFError, ValueError) as e:
+            # Missing, truncated or corrupt file, or the archive storage is unavailable.
+            # Not cached, so the segment is tried again on the next read.
+            logger.error("Cannot read archive segment %s: %s", entry.segment, e)
+            unreadable.add(entry.segment)
+            continue
+        record = segment.get(str(entry.order_id))
+        if record is None:
+            logger.error("Archived order %s missing from segment %s", entry.order_id, entry.segment)
+            continue
+        orders[entry.order_id] = archived_order(record)
+    return orders
+
+
+# ========== Archival ==========
+
+def archive_batch(
+    db: Session, cutoff: datetime, batch_size: Optional[int] = None, archive_dir: Optional[str] = None
+) -> int:
+    """Move one batch of terminal orders created and last updated before cutoff; returns how many"""
+    batch_size = batch_size or ORDER_ARCHIVE_BATCH_SIZE
+    Order = models.Order
+    orders = (
+        db.query(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.status.in_(ARCHIVE_STATUSES), Order.created_at < cutoff, Order.updated_at < cutoff)
+        .order_by(Order.created_at, Order.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, of=Order)
+        .all()
+    )
+    if not orders:
+        db.rollback()
+        return 0
+
+    segment = write_segment([order_record(order) for order in orders], archive_dir)
+    keys = [(order.id, order.created_at) for order in orders]
+    db.execute(insert(models.OrderArchiveEntry), [
+        {"order_id": order.id, "user_id": order.user_id, "created_at": order.created_at, "segment": segment}
+        for order in orders
+    ])
+    OrderItem = models.OrderItem
+    db.execute(
+        delete(OrderItem).where(tuple_(OrderItem.order_id, OrderItem.order_created_at).in_(keys)),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        delete(Order).where(tuple_(Order.id, Order.created_at).in_(keys)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    db.expunge_all()
+    return len(orders)
+
+
+def archive_due(
+    session_factory=SessionLocal, retention_days: Optional[int] = None, batch_size: Optional[int] = None,
+    pause: Optional[float] = None, archive_dir: Optional[str] = None
+) -> int:
+    """Archive batches until no due order is left; returns the total archived"""
+    retention_days = retention_days if retention_days is not None else ORDER_ARCHIVE_RETENTION_DAYS
+    batch_size = batch_size or ORDER_ARCHIVE_BATCH_SIZE
+    pause = pause if pause is not None else ORDER_ARCHIVE_BATCH_PAUSE
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+    with session_factory() as db:
+        while True:
+            archived = archive_batch(db, cutoff, batch_size, archive_dir)
+            total += archived
+            if archived < batch_size:
+                break
+            time.sleep(pause)  # Let other writers in between batches
+    if total:
+        logger.info("Archived %d orders created before %s", total, cutoff.isoformat())
+    return total
+
+
+class ArchiveJob:
+    """Runs archive_due every ORDER_ARCHIVE_INTERVAL seconds in a worker thread"""
+
+    def __init__(self, interval: float = ORDER_ARCHIVE_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(archive_due)
+            except Exception:
+                logger.exception("Order archival failed")
+            await asyncio.sleep(self.interval)
+
+
+job = ArchiveJob()
+
+
+# ========== Read-through ==========
+
+def get_archived_order(db: Session, order_id: str, archive_dir: Optional[str] = None) -> Optional[ArchivedOrder]:
+    entry = db.query(models.OrderArchiveEntry).filter(
+        models.OrderArchiveEntry.order_id == uuid.UUID(order_id)
+    ).first()
+    if entry is None:
+        return None
+    return _load([entry], archive_dir or ORDER_ARCHIVE_DIR).get(entry.order_id)
+
+
+def _user_entries(
+    db: Session, user_id: str, limit: int, cursor: Optional[str], created: Optional[crud.CreatedRange]
+) -> List[models.OrderArchiveEntry]:
+    Entry = models.OrderArchiveEntry
+    query = db.query(Entry).filter(Entry.user_id == user_id)
+    if created is not None:
+        created_from, created_to = created
+        if created_from is not None:
+            query = query.filter(Entry.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(Entry.created_at < created_to)
+    if cursor:
+        query = query.filter(tuple_(Entry.created_at, Entry.order_id) < tuple_(*crud.decode_cursor(cursor)))
+    return query.order_by(Entry.created_at.desc(), Entry.order_id.desc()).limit(limit).all()
+
+
+def get_orders_by_user(
+    db: Session, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    columns: Optional[Tuple[str, ...]] = None, created: Optional[crud.CreatedRange] = None,
+    archive_dir: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """
+    crud.get_orders_by_user with the user's archived orders merged in, newest first,
+    and the cursor of the following page. Users with nothing archived cost one extra
+    index probe. Unreadable archived orders are left out of the page, but the cursor
+    still points past them, so a short page does not end the pagination.
+    """
+    window = limit if cursor else skip + limit
+    entries = _user_entries(db, user_id, window, cursor, created)
+    if not entries:
+        orders = crud.get_orders_by_user(db, user_id, skip, limit, cursor, columns, created)
+        return orders, crud.next_cursor(orders, limit)
+
+    # Both sides are sorted on (created_at, id); take the page from their merge
+    hot = crud.get_orders_by_user(db, user_id, 0, window, cursor, columns, created)
+    merged = sorted(
+        [(order.created_at, order.id, order) for order in hot]
+        + [(entry.created_at, entry.order_id, entry) for entry in entries],
+        key=lambda position: position[:2],
+        reverse=True,
+    )
+    start = 0 if cursor else skip
+    positions = merged[start:start + limit]
+    page = [obj for _, _, obj in positions]
+    next_cursor = crud.encode_position(*positions[-1][:2]) if len(positions) == limit else None
+
+    archived = _load(
+        [obj for obj in page if isinstance(obj, models.OrderArchiveEntry)], archive_dir or ORDER_ARCHIVE_DIR
+    )
+    orders = [
+        archived.get(obj.order_id) if isinstance(obj, models.OrderArchiveEntry) else obj
+        for obj in page
+        if not isinstance(obj, models.OrderArchiveEntry) or obj.order_id in archived
+    ]
+    return orders, next_cursor
+
+
+def get_orders_count_by_user(db: Session, user_id: str, created: Optional[crud.CreatedRange] = None) -> int:
+    """
+    crud.get_orders_count_by_user including archived orders, to match get_orders_by_user.
+    The counters already include them; a created range counts both tables.
+    """
+    total = crud.get_orders_count_by_user(db, user_id, created)
+    if created is None:
+        return total
+    Entry = models.OrderArchiveEntry
+    query = db.query(Entry).filter(Entry.user_id == user_id)
+    created_from, created_to = created
+    if created_from is not None:
+        query = query.filter(Entry.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Entry.created_at < created_to)
+    return total + query.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old delivered/cancelled orders")
+    parser.add_argument("--retention-days", type=int, default=ORDER_ARCHIVE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ORDER_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--archive-dir", default=ORDER_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    total = archive_due(retention_days=args.retention_days, batch_size=args.batch_size, archive_dir=args.archive_dir)
+    print(f"Archived {total} orders")
+
+
+if __name__ == "__main__":
+    main()
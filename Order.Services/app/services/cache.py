@@ -0,0 +1,220 @@
+"""
+In-process TTL + LRU caches.
+
+AsyncTTLCache, for async lookups against downstream services:
+- Bounded: least recently used entries are evicted past `maxsize`.
+- Single-flight: concurrent misses for the same key share one in-flight load.
+- Negative caching: a loader result of None is cached for `negative_ttl` only.
+- Invalidation-safe: invalidate() and clear() detach in-flight loads, whose results
+  are then returned to the callers already waiting but not stored.
+
+TTLCache, for sync routes running in the threadpool:
+- Bounded and thread-safe; `ttl` is the longest an entry is served after it was loaded.
+- Invalidation-safe: a load that overlaps an invalidation is not stored, so a
+  stale read can't be cached after the write that replaced it.
+- Tracks an estimate of the memory held by its entries.
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class AsyncTTLCache:
+    """TTL + LRU cache with single-flight loading, for use on the event loop"""
+
+    def __init__(self, name: str, maxsize: int = 10000, ttl: float = 300.0, negative_ttl: float = 10.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._epoch = 0  # Bumped by every invalidation
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader() at most once per miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if value is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shield so one cancelled caller doesn't cancel the load for everyone else
+        return await asyncio.shield(task)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value for key without loading it, or default; counts as a hit or miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic() and entry[1] is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return default
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        epoch = self._epoch
+        value = await loader()
+        if self._epoch == epoch:
+            self.set(key, value)
+        return value
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        # An invalidation may already have replaced this load with a newer one
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one key; returns True if it was cached"""
+        self._epoch += 1
+        self.invalidations += 1
+        self._inflight.pop(key, None)  # Later callers start a fresh load
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self.invalidations += 1
+        self._inflight.clear()
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        return {
+            "cache": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+            "hit_ratio": (self.hits + self.negative_hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+def _approx_size(value: Any) -> int:
+    """Shallow size of value plus its attribute / item values (enough for flat records)"""
+    size = sys.getsizeof(value)
+    fields = getattr(value, "__dict__", None)
+    if isinstance(value, dict):
+        fields = value
+    if fields:
+        size += sys.getsizeof(fields) + sum(sys.getsizeof(item) for item in fields.values())
+    return size
+
+
+class TTLCache:
+    """Thread-safe TTL + LRU cache; None results are never cached"""
+
+    def __init__(self, name: str, maxsize: int = 10000, ttl: float = 30.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0  # Bumped by every invalidation
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, or call loader() (outside the lock) and cache its result"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            epoch = self._epoch
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if self._epoch == epoch:
+                    self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._discard(key)
+        size = _approx_size(key) + _approx_size(value)
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self._bytes += size
+        while len(self._entries) > self.maxsize:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one key; returns True if it was cached"""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            return self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "memory_bytes": self._bytes,
+            }
@@ -0,0 +1,134 @@
+"""
+Compaction of the order change log (order_changes) behind the since-token feeds.
+
+Feeds return each order's current state, so for a given scope and order only its
+latest change matters. The compactor follows the log the same way a feed does,
+over finished transactions in (xid, seq) order, and for every change it reads it
+deletes the older rows of the same scope and order. Removal rows (the order left
+the scope) that are the latest for their order are kept for
+ORDER_CHANGES_RETENTION_DAYS and then deleted, so a client whose token is older
+than that may miss removals and should resync with an empty token.
+
+The log then holds about one row per order and scope, plus recent removals.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select, text
+
+from .. import models
+from ..database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+ORDER_CHANGES_RETENTION_DAYS = float(os.getenv("ORDER_CHANGES_RETENTION_DAYS", "7"))
+ORDER_CHANGES_COMPACT_INTERVAL = float(os.getenv("ORDER_CHANGES_COMPACT_INTERVAL", "300"))  # seconds
+ORDER_CHANGES_COMPACT_BATCH_SIZE = int(os.getenv("ORDER_CHANGES_COMPACT_BATCH_SIZE", "1000"))
+
+# Only one worker compacts at a time; the others skip the round
+_COMPACT_LOCK_KEY = 0x6F726463  # "ordc"
+
+# One batch of the log after the watermark, and the older rows it supersedes
+COMPACT_BATCH_SQL = text("""
+WITH batch AS (
+    SELECT scope, order_id, xid, seq FROM order_changes
+    WHERE (xid, seq) > (:xid, :seq) AND xid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+    ORDER BY xid, seq
+    LIMIT :batch_size
+), superseded AS (
+    DELETE FROM order_changes c USING batch b
+    WHERE c.scope = b.scope AND c.order_id = b.order_id AND c.seq < b.seq
+    RETURNING c.seq
+)
+SELECT
+    (SELECT count(*) FROM batch) AS read,
+    (SELECT count(*) FROM superseded) AS deleted,
+    last.xid, last.seq
+FROM (SELECT 1) AS one
+LEFT JOIN (SELECT xid, seq FROM batch ORDER BY xid DESC, seq DESC LIMIT 1) AS last ON true
+""")
+
+
+class ChangeLogCompactor:
+    """Compacts order_changes every ORDER_CHANGES_COMPACT_INTERVAL seconds"""
+
+    def __init__(
+        self, session_factory=AsyncSessionLocal, interval: float = ORDER_CHANGES_COMPACT_INTERVAL,
+        retention_days: float = ORDER_CHANGES_RETENTION_DAYS, batch_size: int = ORDER_CHANGES_COMPACT_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.retention = timedelta(days=retention_days)
+        self.batch_size = batch_size
+        # (xid, seq) of the last change compacted against; rows before it have no older duplicates
+        self.watermark: Tuple[int, int] = (0, 0)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def compact(self) -> int:
+        """Delete superseded and expired rows until caught up; returns how many were deleted"""
+        total = 0
+        while True:
+            async with self.session_factory() as db:
+                if not (await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _COMPACT_LOCK_KEY})).scalar():
+                    return total
+                result = (await db.execute(COMPACT_BATCH_SQL, {
+                    "xid": self.watermark[0], "seq": self.watermark[1], "batch_size": self.batch_size,
+                })).one()
+                await db.commit()
+            total += result.deleted
+            if result.read:
+                self.watermark = (result.xid, result.seq)
+            if result.read < self.batch_size:
+                break
+        return total + await self._expire_removals()
+
+    async def _expire_removals(self) -> int:
+        Change = models.OrderChange
+        cutoff = datetime.utcnow() - self.retention
+        total = 0
+        while True:
+            expired = (
+                select(Change.seq)
+                .where(Change.present.is_(False), Change.recorded_at < cutoff)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    delete(Change).where(Change.seq.in_(expired)).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await self.compact()
+                if deleted:
+                    logger.info("Compacted %d order change log rows", deleted)
+            except Exception:
+                logger.exception("Order change log compaction failed")
+            await asyncio.sleep(self.interval)
+
+
+compactor = ChangeLogCompactor()
@@ -0,0 +1,382 @@
+"""
+In-memory spatial index of online driver locations.
+
+Drivers are bucketed into a uniform grid of DRIVER_INDEX_CELL_METERS square cells
+(in degrees of latitude, so cells narrow towards the poles; irrelevant at city
+scale). Longitude columns wrap around at ±180°. A query only looks at the cells
+around the point:
+
+- within(): every cell overlapping the circle's bounding box, filtered by distance
+- nearest(): rings of cells around the point, stopping once the k-th best driver is
+  closer than anything an unvisited ring could hold, or at max_radius_m
+
+When the bounding box holds more cells than are occupied (near the poles, where
+cells are narrow, or with a large radius over a sparse index) the query scans the
+occupied cells of its latitude band instead, so its cost never exceeds a full scan.
+
+Distances use the equirectangular approximation around the query point, which is
+well under 0.1% off the great-circle distance for the tens of kilometers involved.
+
+A driver counts as online while their last update is younger than DRIVER_LOCATION_TTL
+seconds; queries skip older entries and IndexSync drops them. Updates carrying an
+updated_at older than the one already indexed are ignored.
+
+The index lives on the event loop of one worker. With several workers, set
+DRIVER_INDEX_CHANNEL_ENABLED so every ingested batch is also sent with
+pg_notify('driver_locations') and applied by the other workers' listeners.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+import uuid
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import DATABASE_URL
+from .driver_service import DriverLocation
+
+logger = logging.getLogger(__name__)
+
+DRIVER_INDEX_CELL_METERS = float(os.getenv("DRIVER_INDEX_CELL_METERS", "250"))
+DRIVER_LOCATION_TTL = float(os.getenv("DRIVER_LOCATION_TTL", "60"))  # seconds
+DRIVER_INDEX_MAX_RADIUS = float(os.getenv("DRIVER_INDEX_MAX_RADIUS", "20000"))  # meters, for nearest()
+DRIVER_INDEX_CHANNEL_ENABLED = os.getenv("DRIVER_INDEX_CHANNEL_ENABLED", "false").lower() == "true"
+DRIVER_INDEX_RECONNECT_DELAY = float(os.getenv("DRIVER_INDEX_RECONNECT_DELAY", "2"))
+
+DRIVER_LOCATIONS_CHANNEL = "driver_locations"
+NOTIFY_PAYLOAD_LIMIT = 7000  # bytes; Postgres caps a notification payload at 8000
+
+METERS_PER_DEGREE = 111_320.0  # Of latitude, and of longitude at the equator
+
+Cell = Tuple[int, int]
+# Per indexed driver: (latitude, longitude, monotonic time of the update, location)
+Entry = Tuple[float, float, float, DriverLocation]
+
+
+class DriverIndex:
+    """Uniform-grid index of driver locations; event loop only"""
+
+    def __init__(self, cell_meters: float = DRIVER_INDEX_CELL_METERS, ttl: float = DRIVER_LOCATION_TTL):
+        self.cell_meters = cell_meters
+        self.ttl = ttl
+        self._cell_degrees = cell_meters / METERS_PER_DEGREE
+        # Columns split 360° evenly, so the last one is not a sliver at the antimeridian
+        self._columns = math.ceil(360 / self._cell_degrees)
+        self._column_degrees = 360 / self._columns
+        self._cells: Dict[Cell, Dict[str, Entry]] = {}
+        self._driver_cells: Dict[str, Cell] = {}
+        self.updates = 0
+        self.ignored = 0
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self._driver_cells)
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        column = math.floor((longitude + 180) / self._column_degrees) % self._columns
+        return math.floor(latitude / self._cell_degrees), column
+
+    def update(self, location: DriverLocation) -> bool:
+        """Index a driver's position; returns False if it is older than the one indexed"""
+        old_cell = self._driver_cells.get(location.driver_id)
+        if old_cell is not None:
+            current = self._cells[old_cell][location.driver_id][3]
+            if location.updated_at and current.updated_at and location.updated_at < current.updated_at:
+                self.ignored += 1
+                return False
+
+        cell = self._cell(location.latitude, location.longitude)
+        if old_cell is not None and old_cell != cell:
+            self._discard(location.driver_id, old_cell)
+        self._cells.setdefault(cell, {})[location.driver_id] = (
+            location.latitude, location.longitude, time.monotonic(), location
+        )
+        self._driver_cells[location.driver_id] = cell
+        self.updates += 1
+        return True
+
+    def _discard(self, driver_id: str, cell: Cell) -> None:
+        drivers = self._cells[cell]
+        del drivers[driver_id]
+        if not drivers:
+            del self._cells[cell]
+
+    def remove(self, driver_id: str) -> bool:
+        """Take a driver out of the index (went offline); returns True if they were in it"""
+        cell = self._driver_cells.pop(driver_id, None)
+        if cell is None:
+            return False
+        self._discard(driver_id, cell)
+        return True
+
+    def get(self, driver_id: str) -> Optional[DriverLocation]:
+        cell = self._driver_cells.get(driver_id)
+        return self._cells[cell][driver_id][3] if cell is not None else None
+
+    def sweep(self) -> int:
+        """Drop drivers whose last update is older than ttl; returns how many"""
+        stale_before = time.monotonic() - self.ttl
+        stale = [
+            driver_id
+            for drivers in self._cells.values()
+            for driver_id, entry in drivers.items()
+            if entry[2] < stale_before
+        ]
+        for driver_id in stale:
+            self.remove(driver_id)
+        return len(stale)
+
+    @staticmethod
+    def _scales(latitude: float) -> Tuple[float, float]:
+        """Meters per degree of (latitude, longitude) around latitude"""
+        return METERS_PER_DEGREE, METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-9)
+
+    def _box_exceeds_index(self, rows: int, cols: int) -> bool:
+        """Whether the (2 rows + 1) x (2 cols + 1) cells around a point are better scanned as occupied cells"""
+        return 2 * cols + 1 >= self._columns or (2 * rows + 1) * (2 * cols + 1) > len(self._cells)
+
+    def _scan_band(
+        self, latitude: float, longitude: float, ky: float, kx: float, bound_sq: float, row: int, rows: int
+    ) -> List[Tuple[float, DriverLocation]]:
+        """(squared distance, location) of online drivers within bound_sq, from the occupied cells of rows row +- rows"""
+        stale_before = time.monotonic() - self.ttl
+        return [
+            (distance_sq, location)
+            for (r, _), drivers in self._cells.items()
+            if abs(r - row) <= rows
+            for lat, lng, seen_at, location in drivers.values()
+            if (distance_sq := ((lat - latitude) * ky) ** 2 + (((lng - longitude + 180) % 360 - 180) * kx) ** 2)
+            <= bound_sq
+            and seen_at >= stale_before
+        ]
+
+    def within(
+        self, latitude: float, longitude: float, radius_m: float, limit: Optional[int] = None
+    ) -> List[Tuple[DriverLocation, float]]:
+        """Online drivers within radius_m meters, closest first, as (location, distance in meters)"""
+        if limit is not None:
+            # Same as the closest `limit`; the ring search can stop before covering the whole circle
+            return self.nearest(latitude, longitude, limit, max_radius_m=radius_m)
+        self.queries += 1
+        ky, kx = self._scales(latitude)
+        row, col = self._cell(latitude, longitude)
+        rows = math.ceil(radius_m / (ky * self._cell_degrees))
+        cols = math.ceil(radius_m / (kx * self._column_degrees))
+        limit_sq = radius_m * radius_m
+        if self._box_exceeds_index(rows, cols):
+            found = self._scan_band(latitude, longitude, ky, kx, limit_sq, row, rows)
+            found.sort(key=itemgetter(0))
+            return [(location, math.sqrt(distance_sq)) for distance_sq, location in found]
+
+        stale_before = time.monotonic() - self.ttl
+        cells = self._cells
+        columns = self._columns
+        found = []
+        for r in range(row - rows, row + rows + 1):
+            for c in range(col - cols, col + cols + 1):
+                drivers = cells.get((r, c % columns))
+                if drivers:
+                    found += [
+                        (distance_sq, location)
+                        for lat, lng, seen_at, location in drivers.values()
+                        if (distance_sq := ((lat - latitude) * ky) ** 2
+                            + (((lng - longitude + 180) % 360 - 180) * kx) ** 2) <= limit_sq
+                        and seen_at >= stale_before
+                    ]
+
+        found.sort(key=itemgetter(0))
+        return [(location, math.sqrt(distance_sq)) for distance_sq, location in found]
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int, max_radius_m: float = DRIVER_INDEX_MAX_RADIUS
+    ) -> List[Tuple[DriverLocation, float]]:
+        """Up to k online drivers closest to the point within max_radius_m, closest first"""
+        self.queries += 1
+        ky, kx = self._scales(latitude)
+        row, col = self._cell(latitude, longitude)
+        cell_y, cell_x = self._cell_degrees * ky, self._column_degrees * kx
+        bound_sq = max_radius_m * max_radius_m
+        rows, cols = math.ceil(max_radius_m / cell_y), math.ceil(max_radius_m / cell_x)
+        # Rings are square in cells, so they may go out to the larger of the two along both axes
+        span = max(rows, cols)
+        if self._box_exceeds_index(span, span):
+            found = self._scan_band(latitude, longitude, ky, kx, bound_sq, row, rows)
+            found.sort(key=itemgetter(0))
+            return [(location, math.sqrt(distance_sq)) for distance_sq, location in found[:k]]
+
+        # Anything outside ring n is more than n cells plus the way to the nearest edge of
+        # the point's own cell away, along one axis
+        fy = latitude / self._cell_degrees - row
+        fx = (longitude + 180) / self._column_degrees % 1
+        edge_y, edge_x = min(fy, 1 - fy) * cell_y, min(fx, 1 - fx) * cell_x
+        stale_before = time.monotonic() - self.ttl
+        cells = self._cells
+        columns = self._columns
+        total = len(self._driver_cells)
+
+        found: List[Tuple[float, DriverLocation]] = []  # Candidates within bound_sq; the k closest once full
+        seen = 0
+        ring = 0
+        while True:
+            # Rings stay within span cells, fewer than the grid's columns, so no cell comes up twice
+            for r, c in self._ring(row, col, ring):
+                drivers = cells.get((r, c % columns))
+                if drivers:
+                    seen += len(drivers)
+                    found += [
+                        (distance_sq, location)
+                        for lat, lng, seen_at, location in drivers.values()
+                        if (distance_sq := ((lat - latitude) * ky) ** 2
+                            + (((lng - longitude + 180) % 360 - 180) * kx) ** 2) <= bound_sq
+                        and seen_at >= stale_before
+                    ]
+            if len(found) >= k:
+                found.sort(key=itemgetter(0))
+                del found[k:]
+                bound_sq = found[-1][0]
+
+            reach = min(ring * cell_y + edge_y, ring * cell_x + edge_x)
+            if reach >= max_radius_m or seen >= total or reach * reach >= bound_sq:
+                break
+            ring += 1
+
+        found.sort(key=itemgetter(0))
+        return [(location, math.sqrt(distance_sq)) for distance_sq, location in found]
+
+    @staticmethod
+    def _ring(row: int, col: int, ring: int) -> Iterable[Cell]:
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
+
+    def stats(self) -> dict:
+        return {
+            "drivers": len(self._driver_cells),
+            "cells": len(self._cells),
+            "cell_meters": self.cell_meters,
+            "ttl": self.ttl,
+            "updates": self.updates,
+            "ignored": self.ignored,
+            "queries": self.queries,
+        }
+
+
+class IndexSync:
+    """Drops stale drivers every ttl and, with the channel enabled, shares updates between workers"""
+
+    def __init__(self, index: DriverIndex, channel_enabled: bool = DRIVER_INDEX_CHANNEL_ENABLED,
+                 dsn: str = DATABASE_URL):
+        self.index = index
+        self.channel_enabled = channel_enabled
+        self.dsn = dsn
+        self._token = uuid.uuid4().hex  # Tells this worker's own notifications apart
+        self._tasks: List[asyncio.Task] = []
+        self.received = 0
+
+    async def publish(self, db: AsyncSession, locations: List[DriverLocation]) -> None:
+        """Send locations to the other workers in as few notifications as fit; commits db"""
+        if not self.channel_enabled or not locations:
+            return
+        chunk, size = [], 0
+        for location in locations:
+            row = [location.driver_id, location.latitude, location.longitude, location.updated_at]
+            row_size = len(json.dumps(row)) + 1
+            if chunk and size + row_size > NOTIFY_PAYLOAD_LIMIT:
+                await self._notify(db, chunk)
+                chunk, size = [], 0
+            chunk.append(row)
+            size += row_size
+        await self._notify(db, chunk)
+        await db.commit()
+
+    async def publish_removal(self, db: AsyncSession, driver_id: str) -> None:
+        """Tell the other workers a driver went offline; commits db"""
+        if not self.channel_enabled:
+            return
+        await self._notify(db, [[driver_id, None, None, None]])
+        await db.commit()
+
+    async def _notify(self, db: AsyncSession, rows: list) -> None:
+        payload = json.dumps({"from": self._token, "locations": rows}, separators=(",", ":"))
+        await db.execute(select(func.pg_notify(DRIVER_LOCATIONS_CHANNEL, payload)))
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message["from"] == self._token:
+                return
+            for driver_id, latitude, longitude, updated_at in message["locations"]:
+                if latitude is None:
+                    self.index.remove(driver_id)
+                else:
+                    self.index.update(DriverLocation(driver_id, latitude, longitude, updated_at))
+            self.received += 1
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed driver location notification")
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks.append(asyncio.create_task(self._sweep()))
+            if self.channel_enabled:
+                self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.index.ttl)
+            removed = self.index.sweep()
+            if removed:
+                logger.info("Dropped %d drivers without recent location updates", removed)
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection, reconnecting whenever it drops"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(DRIVER_LOCATIONS_CHANNEL, self._on_notify)
+                await closed.wait()
+                logger.warning("Driver locations connection closed; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Driver locations listener failed: %s", e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(DRIVER_INDEX_RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        stats = self.index.stats()
+        stats["channel_enabled"] = self.channel_enabled
+        if self.channel_enabled:
+            stats["received"] = self.received
+        return stats
+
+
+index = DriverIndex()
+sync = IndexSync(index)
@@ -1,12 +1,17 @@
 import httpx
+import logging
 import os
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
+from .http_pool import HttpClientConfig, PooledServiceClient
+from .resilience import CircuitOpenError, RetryPolicy
+
+
+logger = logging.getLogger(__name__)
 
 # Config
 DRIVER_SERVICE_URL = os.getenv("DRIVER_SERVICE_URL", "http://driver-service:8081")
-TIMEOUT = 10.0  # seconds
 
 
 @dataclass
@@ -30,11 +35,17 @@ class DriverLocation:
     updated_at: Optional[str] = None
 
 
-class DriverServiceClient:
+class DriverServiceClient(PooledServiceClient):
     """Client để gọi Driver Service API"""
 
-    def __init__(self, base_url: str = None):
-        self.base_url = base_url or DRIVER_SERVICE_URL
+    def __init__(self, base_url: str = None, config: HttpClientConfig = None, retry_policy: RetryPolicy = None):
+        super().__init__(
+            "driver-service",
+            base_url or DRIVER_SERVICE_URL,
+            config or HttpClientConfig.from_env("DRIVER_SERVICE"),
+            retry_policy=retry_policy or RetryPolicy.from_env("DRIVER_SERVICE"),
+            breaker_env_prefix="DRIVER_SERVICE",
+        )
 
     async def create_trip(
         self,
@@ -60,27 +71,26 @@ class DriverServiceClient:
             Thông tin trip hoặc None nếu thất bại
         """
         try:
-            async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-                payload = {
-                    "driverId": driver_id,
-                    "orderId": order_id,
-                    "pickupAddress": pickup_address,
-                    "deliveryAddress": delivery_address,
-                }
-
-                if pickup_latitude and pickup_longitude:
-                    payload["pickupLatitude"] = pickup_latitude
-                    payload["pickupLongitude"] = pickup_longitude
-
-                if delivery_latitude and delivery_longitude:
-                    payload["deliveryLatitude"] = delivery_latitude
-                    payload["deliveryLongitude"] = delivery_longitude
-
-                response = await client.post(f"{self.base_url}/api/Trips", json=payload)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPError as e:
-            print(f"Error creating trip: {e}")
+            payload = {
+                "driverId": driver_id,
+                "orderId": order_id,
+                "pickupAddress": pickup_address,
+                "deliveryAddress": delivery_address,
+            }
+
+            if pickup_latitude and pickup_longitude:
+                payload["pickupLatitude"] = pickup_latitude
+                payload["pickupLongitude"] = pickup_longitude
+
+            if delivery_latitude and delivery_longitude:
+                payload["deliveryLatitude"] = delivery_latitude
+                payload["deliveryLongitude"] = delivery_longitude
+
+            response = await self.send("POST", "/api/Trips", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.warning("Error creating trip: %s", e)
             return None
 
     async def initiate_driver_assignment(
@@ -114,29 +124,28 @@ class DriverServiceClient:
             True if request was sent successfully, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-                payload = {
-                    "orderId": order_id,
-                    "pickupAddress": pickup_address,
-                    "deliveryAddress": delivery_address,
-                    "fare": fare,
-                    "customerNotes": customer_notes or "",
-                }
-
-                # Add coordinates if available
-                if pickup_lat is not None and pickup_lng is not None:
-                    payload["pickupLatitude"] = float(pickup_lat)
-                    payload["pickupLongitude"] = float(pickup_lng)
-
-                if delivery_lat is not None and delivery_lng is not None:
-                    payload["deliveryLatitude"] = float(delivery_lat)
-                    payload["deliveryLongitude"] = float(delivery_lng)
-
-                response = await client.post(f"{self.base_url}/api/Trips", json=payload)
-                response.raise_for_status()
-                return True
-        except httpx.HTTPError as e:
-            print(f"Error initiating driver assignment: {e}")
+            payload = {
+                "orderId": order_id,
+                "pickupAddress": pickup_address,
+                "deliveryAddress": delivery_address,
+                "fare": fare,
+                "customerNotes": customer_notes or "",
+            }
+
+            # Add coordinates if available
+            if pickup_lat is not None and pickup_lng is not None:
+                payload["pickupLatitude"] = float(pickup_lat)
+                payload["pickupLongitude"] = float(pickup_lng)
+
+            if delivery_lat is not None and delivery_lng is not None:
+                payload["deliveryLatitude"] = float(delivery_lat)
+                payload["deliveryLongitude"] = float(delivery_lng)
+
+            response = await self.send("POST", "/api/Trips", json=payload)
+            response.raise_for_status()
+            return True
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.warning("Error initiating driver assignment: %s", e)
             return False
 
 
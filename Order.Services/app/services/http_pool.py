@@ -0,0 +1,209 @@
+"""
+Shared, long-lived HTTP clients for downstream services.
+
+Each service client owns one httpx.AsyncClient whose connection pool is reused
+across requests (keep-alive instead of a new TCP/TLS handshake per call). The
+clients are opened and closed by the FastAPI lifespan in app.main.
+
+Configuration is read from environment variables with a per-service prefix,
+e.g. DRIVER_SERVICE_HTTP_MAX_CONNECTIONS or RESTAURANT_SERVICE_HTTP_TIMEOUT.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .. import metrics
+from .resilience import CircuitBreaker, RetryPolicy
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+@dataclass
+class HttpClientConfig:
+    """Connection pool and timeout settings for one downstream service"""
+    timeout: float = 10.0  # read/write timeout per call (seconds)
+    connect_timeout: float = 5.0
+    pool_timeout: float = 5.0  # max wait for a free pooled connection
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False  # requires the `h2` package
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "HttpClientConfig":
+        defaults = cls()
+        return cls(
+            timeout=_env_float(f"{prefix}_HTTP_TIMEOUT", defaults.timeout),
+            connect_timeout=_env_float(f"{prefix}_HTTP_CONNECT_TIMEOUT", defaults.connect_timeout),
+            pool_timeout=_env_float(f"{prefix}_HTTP_POOL_TIMEOUT", defaults.pool_timeout),
+            max_connections=_env_int(f"{prefix}_HTTP_MAX_CONNECTIONS", defaults.max_connections),
+            max_keepalive_connections=_env_int(
+                f"{prefix}_HTTP_MAX_KEEPALIVE", defaults.max_keepalive_connections
+            ),
+            keepalive_expiry=_env_float(f"{prefix}_HTTP_KEEPALIVE_EXPIRY", defaults.keepalive_expiry),
+            http2=_env_bool(f"{prefix}_HTTP2", defaults.http2),
+        )
+
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.pool_timeout)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+# All pooled clients, so the lifespan and stats endpoint can reach them
+_registry: List["PooledServiceClient"] = []
+
+
+class PooledServiceClient:
+    """Base class for service clients that share one pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        config: HttpClientConfig,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_env_prefix: Optional[str] = None,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.config = config
+        self.retry_policy = retry_policy
+        self.breaker_env_prefix = breaker_env_prefix
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        _registry.append(self)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client; created lazily if used outside the app lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.config.timeouts(),
+                limits=self.config.limits(),
+                http2=self.config.http2,
+            )
+        return self._client
+
+    def breaker(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """Circuit breaker for one endpoint (e.g. "POST /api/Trips"), if breakers are enabled"""
+        if self.breaker_env_prefix is None:
+            return None
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker.from_env(
+                f"{self.name} {endpoint}", self.breaker_env_prefix
+            )
+        return self._breakers[endpoint]
+
+    async def send(self, method: str, path: str, endpoint: Optional[str] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request through the endpoint's circuit breaker, retrying safe failures
+        per retry_policy. Raises CircuitOpenError while the breaker is open.
+
+        `endpoint` names the call for breakers and metrics (e.g. "GET /api/Restaurants/{id}");
+        it defaults to the method and path, which is only right for paths without ids.
+        """
+        endpoint = endpoint or f"{method} {path.split('?')[0]}"
+        latency = metrics.HTTP_CLIENT_DURATION
+        breaker = self.breaker(endpoint)
+        max_attempts = self.retry_policy.max_attempts if self.retry_policy else 1
+        attempt = 0
+        while True:
+            attempt += 1
+            if breaker:
+                breaker.before_call()
+            recorded = False
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, f"{self.base_url}{path}", **kwargs)
+                latency.labels(self.name, endpoint, str(response.status_code)).observe(time.perf_counter() - start)
+                failed = response.status_code >= 500
+                if breaker:
+                    if failed:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    recorded = True
+                retry = failed and RetryPolicy.is_retryable(response=response, method=method)
+                if not retry or attempt >= max_attempts:
+                    return response
+            except httpx.HTTPError as e:
+                latency.labels(self.name, endpoint, type(e).__name__).observe(time.perf_counter() - start)
+                if breaker:
+                    breaker.record_failure()
+                    recorded = True
+                if not RetryPolicy.is_retryable(error=e) or attempt >= max_attempts:
+                    raise
+            finally:
+                if breaker and not recorded:
+                    breaker.release()
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+
+    async def start(self) -> None:
+        self.client  # noqa: B018 - open the pool eagerly
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of connection pool usage, for sizing max_connections/keepalive"""
+        stats: Dict[str, Any] = {
+            "service": self.name,
+            "base_url": self.base_url,
+            "config": asdict(self.config),
+            "open": self._client is not None and not self._client.is_closed,
+            "connections": 0,
+            "idle_connections": 0,
+            "active_requests": 0,
+            "queued_requests": 0,
+        }
+        if not stats["open"]:
+            return stats
+
+        # httpx does not expose pool internals publicly; read them defensively
+        pool = getattr(self._client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        requests = list(getattr(pool, "_requests", []))
+        queued = sum(1 for request in requests if getattr(request, "is_queued", lambda: False)())
+        stats.update(
+            connections=len(connections),
+            idle_connections=sum(1 for connection in connections if connection.is_idle()),
+            active_requests=len(requests) - queued,
+            queued_requests=queued,
+        )
+        return stats
+
+
+async def start_all() -> None:
+    for service_client in _registry:
+        await service_client.start()
+
+
+async def close_all() -> None:
+    for service_client in _registry:
+        await service_client.aclose()
+
+
+def all_pool_stats() -> List[Dict[str, Any]]:
+    return [service_client.pool_stats() for service_client in _registry]
@@ -0,0 +1,192 @@
+"""
+Idempotency-Key support for order creation.
+
+The key is claimed with an INSERT into idempotency_keys in the same transaction that
+creates the order, and the rendered response is stored on that row before commit:
+
+- First request: the claim succeeds, the order is created and the response stored,
+  all in one commit. If anything fails the claim rolls back with the order.
+- Concurrent duplicate: its INSERT waits on the primary key until the first
+  transaction finishes, so duplicates are serialized on that one key only.
+- Retry: lookup() finds the committed row before any other work and the stored
+  response is replayed without touching `orders`. A key reused with a different
+  body is rejected.
+
+Slow checks (the menu lookup) run between lookup() and claim(), outside any
+transaction, so no lock is held while they wait on other services.
+
+Rows are compact (hashed key, 16-byte request fingerprint, zlib-compressed body) and
+are removed by KeySweeper once they pass IDEMPOTENCY_KEY_TTL_SECONDS. An expired row
+that has not been swept yet is taken over by the next claim.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_SWEEP_INTERVAL = float(os.getenv("IDEMPOTENCY_SWEEP_INTERVAL", "300"))  # seconds
+IDEMPOTENCY_SWEEP_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_SWEEP_BATCH_SIZE", "1000"))
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a request with a different body"""
+
+
+def key_hash(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+def request_hash(body: BaseModel) -> bytes:
+    """Fingerprint of a validated request body, independent of key order and whitespace"""
+    canonical = orjson.dumps(body.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
+async def claim(db: AsyncSession, key: bytes, fingerprint: bytes) -> Optional[Response]:
+    """
+    Claim key in the current transaction. Returns None if the caller now owns it and must
+    call complete() before committing, or the stored response if the key was already used.
+    Raises IdempotencyKeyMismatch if it was used for a different request.
+    """
+    Key = models.IdempotencyKey
+    for _ in range(2):
+        now = datetime.utcnow()
+        stmt = pg_insert(Key).values(
+            key_hash=key, request_hash=fingerprint, expires_at=now + timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Key.key_hash],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "expires_at": stmt.excluded.expires_at,
+                "status_code": None,
+                "response_body": None,
+            },
+            where=Key.expires_at < now,  # Only an expired key can be taken over
+        ).returning(Key.key_hash)
+        if (await db.execute(stmt)).first() is not None:
+            return None
+
+        stored = (await db.execute(
+            select(Key.request_hash, Key.status_code, Key.response_body).where(Key.key_hash == key)
+        )).first()
+        if stored is not None:
+            await db.rollback()
+            return _replay(stored, fingerprint)
+        # The row expired and was swept between the two statements: claim it again
+    raise RuntimeError("Idempotency key could not be claimed")
+
+
+async def lookup(db: AsyncSession, key: bytes, fingerprint: bytes) -> Optional[Response]:
+    """
+    Stored response of a completed, unexpired key, or None; takes no lock and ends the
+    transaction, so slow work can run before claim(). Raises IdempotencyKeyMismatch like claim().
+    """
+    Key = models.IdempotencyKey
+    stored = (await db.execute(
+        select(Key.request_hash, Key.status_code, Key.response_body)
+        .where(Key.key_hash == key, Key.expires_at >= datetime.utcnow(), Key.status_code.isnot(None))
+    )).first()
+    await db.rollback()
+    if stored is None:
+        return None
+    return _replay(stored, fingerprint)
+
+
+def _replay(stored, fingerprint: bytes) -> Response:
+    if stored.request_hash != fingerprint:
+        raise IdempotencyKeyMismatch()
+    return Response(
+        zlib.decompress(stored.response_body),
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+async def complete(db: AsyncSession, key: bytes, status_code: int, body: bytes) -> None:
+    """Store the response for a claimed key; commits together with the caller's writes"""
+    await db.execute(
+        update(models.IdempotencyKey)
+        .where(models.IdempotencyKey.key_hash == key)
+        .values(status_code=status_code, response_body=zlib.compress(body))
+    )
+
+
+class KeySweeper:
+    """Deletes expired idempotency keys in batches every IDEMPOTENCY_SWEEP_INTERVAL seconds"""
+
+    def __init__(
+        self, session_factory=AsyncSessionLocal, interval: float = IDEMPOTENCY_SWEEP_INTERVAL,
+        batch_size: int = IDEMPOTENCY_SWEEP_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep(self) -> int:
+        """Delete expired keys until none are left; returns how many were deleted"""
+        Key = models.IdempotencyKey
+        total = 0
+        while True:
+            expired = (
+                select(Key.key_hash)
+                .where(Key.expires_at < datetime.utcnow())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    delete(Key).where(Key.key_hash.in_(expired)).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await self.sweep()
+                if deleted:
+                    logger.info("Swept %d expired idempotency keys", deleted)
+            except Exception:
+                logger.exception("Idempotency key sweep failed")
+            await asyncio.sleep(self.interval)
+
+
+sweeper = KeySweeper()
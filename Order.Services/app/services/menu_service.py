@@ -0,0 +1,124 @@
+"""
+Menu checks for order creation.
+
+Order items are checked against Restaurants.Services instead of trusting the
+client: each product_id must be a dish of the order's restaurant, available and
+in stock, and unit_price must match its current (discounted) price. product_name
+is replaced by the dish's name.
+
+Dishes are cached for DISH_CACHE_TTL seconds, and an order costs at most one
+downstream call: items that pass against their cached dish are not fetched again;
+every other dish (not cached, or failing against a possibly outdated entry) is
+fetched in one GET /api/v1/menu/dishes?ids=... and the order is judged on that.
+A batch of orders is checked the same way, with its dishes fetched together.
+An outdated entry can therefore never reject an order, but a price change can
+take up to DISH_CACHE_TTL to be enforced. The lookup goes through the
+restaurant client's circuit breaker, so while Restaurants.Services is failing
+orders get 503 at once instead of waiting on it.
+"""
+import asyncio
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .. import metrics, schemas
+from .cache import AsyncTTLCache
+from .restaurant_service import DishInfo, restaurant_client
+
+# Off until Restaurants.Services with GET /api/v1/menu/dishes is deployed; turn it on after that,
+# otherwise every order is refused with 503
+MENU_VALIDATION_ENABLED = os.getenv("MENU_VALIDATION_ENABLED", "false").lower() == "true"
+DISH_CACHE_TTL = float(os.getenv("DISH_CACHE_TTL", "30"))  # seconds
+DISH_CACHE_MAXSIZE = int(os.getenv("DISH_CACHE_MAXSIZE", "50000"))
+
+MAX_DISHES_PER_REQUEST = 100  # Batch limit of GET /api/v1/menu/dishes?ids=
+MAX_DISHES_PER_ORDER = MAX_DISHES_PER_REQUEST
+
+dish_cache = AsyncTTLCache("dishes", maxsize=DISH_CACHE_MAXSIZE, ttl=DISH_CACHE_TTL)
+metrics.register_cache(dish_cache)
+
+
+class OrderItemsRejected(Exception):
+    """An order item does not match the restaurant's menu, or the menu could not be checked"""
+
+    def __init__(self, status_code: int, detail: str, index: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.index = index  # Position of the rejected order in a batch
+
+
+def _problem(
+    order: schemas.OrderCreate, item: schemas.OrderItemCreate, dish: Optional[DishInfo], quantities: Counter
+) -> Optional[Tuple[int, str]]:
+    """(status code, message) if item can't be ordered as given, else None"""
+    if dish is None or dish.restaurant_id != order.restaurant_id:
+        return 400, f"Món {item.product_id} không có trong thực đơn của nhà hàng"
+    if not dish.is_available or (dish.stock_quantity is not None and dish.stock_quantity < quantities[dish.id]):
+        return 409, f"Món {dish.name} đã hết hàng"
+    if item.unit_price != dish.current_price:
+        return 409, f"Giá món {dish.name} đã thay đổi: {dish.current_price}"
+    return None
+
+
+async def _fetch_dishes(dish_ids: List[int]) -> Dict[int, DishInfo]:
+    """Fetch dishes in calls of at most MAX_DISHES_PER_REQUEST ids, run concurrently"""
+    chunks = [dish_ids[i:i + MAX_DISHES_PER_REQUEST] for i in range(0, len(dish_ids), MAX_DISHES_PER_REQUEST)]
+    fetched: Dict[int, DishInfo] = {}
+    for part in await asyncio.gather(*(restaurant_client.get_dishes(chunk) for chunk in chunks)):
+        if part is None:
+            raise OrderItemsRejected(503, "Không kiểm tra được thực đơn, vui lòng thử lại")
+        fetched.update(part)
+    return fetched
+
+
+async def verify_orders(orders: List[schemas.OrderCreate]) -> List[schemas.OrderCreate]:
+    """
+    Check every item of every order against the menu; returns the orders with the dishes'
+    names. Stock is checked against the quantity ordered across all of them.
+    Raises OrderItemsRejected with the index of the first rejected order.
+    """
+    if not MENU_VALIDATION_ENABLED:
+        return list(orders)
+
+    quantities = Counter()
+    for index, order in enumerate(orders):
+        for item in order.items:
+            if not item.product_id.isdigit():
+                raise OrderItemsRejected(400, f"Món {item.product_id} không có trong thực đơn của nhà hàng", index)
+        dish_ids = {int(item.product_id) for item in order.items}
+        if len(dish_ids) > MAX_DISHES_PER_ORDER:
+            raise OrderItemsRejected(400, f"Đơn hàng có tối đa {MAX_DISHES_PER_ORDER} món khác nhau", index)
+        for item in order.items:
+            quantities[int(item.product_id)] += item.quantity
+
+    dishes: Dict[int, Optional[DishInfo]] = {dish_id: dish_cache.get(dish_id) for dish_id in quantities}
+    refetch = sorted({
+        int(item.product_id) for order in orders for item in order.items
+        if _problem(order, item, dishes[int(item.product_id)], quantities)
+    })
+    if refetch:
+        fetched = await _fetch_dishes(refetch)
+        for dish_id in refetch:
+            dishes[dish_id] = fetched.get(dish_id)
+            if dishes[dish_id] is None:
+                dish_cache.invalidate(dish_id)
+            else:
+                dish_cache.set(dish_id, dishes[dish_id])
+        for index, order in enumerate(orders):
+            for item in order.items:
+                problem = _problem(order, item, dishes[int(item.product_id)], quantities)
+                if problem:
+                    raise OrderItemsRejected(*problem, index)
+
+    return [
+        order.model_copy(update={"items": [
+            item.model_copy(update={"product_name": dishes[int(item.product_id)].name}) for item in order.items
+        ]})
+        for order in orders
+    ]
+
+
+async def verify_order_items(order: schemas.OrderCreate) -> schemas.OrderCreate:
+    """Check every item against the menu; returns the order with the dishes' names. Raises OrderItemsRejected."""
+    return (await verify_orders([order]))[0]
@@ -0,0 +1,138 @@
+"""
+Live order status events: Postgres LISTEN/NOTIFY fanned out to in-process subscribers.
+
+Writers emit `pg_notify('order_status', ...)` in the same transaction as a status
+change (see crud.status_notify). Each worker holds one asyncpg connection that
+LISTENs on the channel and hands every event to the subscribers of that order.
+
+Each subscriber has a bounded queue. Status events are latest-wins, so when a slow
+consumer's queue is full the oldest pending event is dropped rather than letting
+the queue (and memory) grow without bound.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+import asyncpg
+
+from ..crud import ORDER_EVENTS_CHANNEL
+from ..database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_QUEUE_SIZE = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "16"))
+ORDER_EVENTS_HEARTBEAT = float(os.getenv("ORDER_EVENTS_HEARTBEAT", "15"))  # seconds
+ORDER_EVENTS_RECONNECT_DELAY = float(os.getenv("ORDER_EVENTS_RECONNECT_DELAY", "2"))
+
+
+class Subscription:
+    """One subscriber's bounded queue of raw JSON event payloads"""
+
+    def __init__(self, order_id: str, queue_size: int):
+        self.order_id = order_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, payload: str) -> bool:
+        """Enqueue without blocking; drops the oldest event if full. Returns False if one was dropped."""
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(payload)
+        return not dropped
+
+
+class OrderEventBroker:
+    """Per-worker LISTEN connection plus in-process fan-out by order id"""
+
+    def __init__(self, dsn: str = DATABASE_URL, channel: str = ORDER_EVENTS_CHANNEL,
+                 queue_size: int = ORDER_EVENTS_QUEUE_SIZE):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, order_id: str) -> Subscription:
+        subscription = Subscription(order_id, self.queue_size)
+        self._subscribers[order_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.order_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.order_id]
+
+    def publish(self, order_id: str, payload: str) -> None:
+        """Deliver an event to every subscriber of order_id"""
+        for subscription in self._subscribers.get(order_id, ()):
+            if subscription.offer(payload):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.received += 1
+        try:
+            order_id = json.loads(payload)["order_id"]
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed order event: %s", payload)
+            return
+        self.publish(order_id, payload)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection, reconnecting whenever it drops"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                await closed.wait()
+                logger.warning("Order events connection closed; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Order events listener failed: %s", e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(ORDER_EVENTS_RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._task is not None and not self._task.done(),
+            "orders_watched": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+broker = OrderEventBroker()
@@ -0,0 +1,233 @@
+"""
+Transactional outbox dispatcher for order status side effects.
+
+Status changes insert an OrderOutbox row in the same transaction as the update, so
+the API responds as soon as the commit lands. This dispatcher drains pending rows
+in the background:
+
+1. Claim a batch by pushing `available_at` forward by a lease, using
+   `FOR UPDATE SKIP LOCKED` so several workers never claim the same row.
+2. Run StatusHandler for each event, at most `concurrency` at a time.
+3. Mark the row done, or reschedule it with exponential backoff until
+   `max_attempts` is reached, after which it is marked failed.
+
+Side effects run at least once: an attempt that timed out or lost its response
+is retried. Each attempt is cut off at half the lease, so a row is not claimed
+again while an attempt is still running. Driver.Services returns the existing
+trip when POST /api/Trips is repeated for an order, so a retry never creates a
+second trip.
+
+OutboxPurger deletes done rows once they are older than OUTBOX_RETENTION_HOURS;
+failed rows are kept for inspection.
+
+OUTBOX_ENABLED only decides whether this process runs the dispatcher and purger.
+Status changes write outbox rows either way, so with OUTBOX_ENABLED=false another
+process (e.g. a dedicated worker with OUTBOX_ENABLED=true) must drain them, or the
+side effects never run and the table keeps growing.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+
+from .. import crud_async, models, schemas
+from ..database import AsyncSessionLocal
+from .status_handler import StatusHandler
+
+logger = logging.getLogger(__name__)
+
+# Run the dispatcher in this process; rows are written regardless (see module docstring)
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() in ("1", "true", "yes")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "10"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))  # seconds
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", "300"))
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "72"))
+OUTBOX_PURGE_INTERVAL = float(os.getenv("OUTBOX_PURGE_INTERVAL", "300"))  # seconds
+OUTBOX_PURGE_BATCH_SIZE = int(os.getenv("OUTBOX_PURGE_BATCH_SIZE", "1000"))
+
+
+class OutboxDispatcher:
+    """Background task that drains order_outbox in batches"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        concurrency: int = OUTBOX_CONCURRENCY,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def wake(self) -> None:
+        """Skip the poll delay, e.g. right after committing a new outbox row"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await self.dispatch_batch()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue  # Backlog: keep draining without waiting
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def dispatch_batch(self) -> int:
+        """Claim and process one batch; returns the number of events claimed"""
+        events = await self._claim()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(event) -> None:
+            async with semaphore:
+                await self._process(event)
+
+        await asyncio.gather(*(run(event) for event in events))
+        return len(events)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        Outbox = models.OrderOutbox
+        due = (
+            select(Outbox.id)
+            .where(Outbox.status == "pending", Outbox.available_at <= now)
+            .order_by(Outbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Outbox)
+            .where(Outbox.id.in_(due))
+            .values(available_at=now + timedelta(seconds=self.lease_seconds))
+            .returning(Outbox.id, Outbox.order_id, Outbox.event_type, Outbox.attempts)
+        )
+        async with self.session_factory() as db:
+            events = (await db.execute(stmt)).all()
+            await db.commit()
+        return events
+
+    async def _process(self, event) -> None:
+        Outbox = models.OrderOutbox
+        async with self.session_factory() as db:
+            try:
+                order = await crud_async.get_order(db, str(event.order_id))
+                if order is not None:
+                    handler = StatusHandler(db)
+                    # Give up well before the lease expires, so no other worker claims the
+                    # row while this attempt may still be talking to a downstream service
+                    await asyncio.wait_for(
+                        handler.handle_status_update(order, schemas.OrderStatus(event.event_type)),
+                        timeout=self.lease_seconds / 2,
+                    )
+                values = {"status": "done", "processed_at": datetime.utcnow(), "last_error": None}
+            except Exception as e:
+                await db.rollback()
+                attempts = event.attempts + 1
+                logger.warning("Outbox event %s (attempt %s) failed: %s", event.id, attempts, e)
+                values = {"attempts": attempts, "last_error": str(e)}
+                if attempts >= self.max_attempts:
+                    values.update(status="failed", processed_at=datetime.utcnow())
+                else:
+                    backoff = min(OUTBOX_MAX_BACKOFF, 2 ** attempts)
+                    values["available_at"] = datetime.utcnow() + timedelta(seconds=backoff)
+
+            await db.execute(update(Outbox).where(Outbox.id == event.id).values(**values))
+            await db.commit()
+
+
+class OutboxPurger:
+    """Deletes done outbox rows older than the retention in batches every OUTBOX_PURGE_INTERVAL seconds"""
+
+    def __init__(
+        self, session_factory=AsyncSessionLocal, interval: float = OUTBOX_PURGE_INTERVAL,
+        retention_hours: float = OUTBOX_RETENTION_HOURS, batch_size: int = OUTBOX_PURGE_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.retention = timedelta(hours=retention_hours)
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def purge(self) -> int:
+        """Delete done rows past the retention until none are left; returns how many were deleted"""
+        Outbox = models.OrderOutbox
+        cutoff = datetime.utcnow() - self.retention
+        total = 0
+        while True:
+            expired = (
+                select(Outbox.id)
+                .where(Outbox.status == "done", Outbox.processed_at < cutoff)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    delete(Outbox).where(Outbox.id.in_(expired)).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await self.purge()
+                if deleted:
+                    logger.info("Purged %d processed outbox rows", deleted)
+            except Exception:
+                logger.exception("Outbox purge failed")
+            await asyncio.sleep(self.interval)
+
+
+dispatcher = OutboxDispatcher()
+purger = OutboxPurger()
@@ -0,0 +1,169 @@
+"""
+Monthly range partitions for `orders` and `order_items`.
+
+Both tables are partitioned on the order's creation time (`orders.created_at`,
+`order_items.order_created_at`) with one partition per calendar month, named
+`<table>_YYYY_MM`. The maintainer creates the partitions for the current month and
+ORDER_PARTITION_MONTHS_AHEAD months after it at startup and then periodically, so
+inserts never depend on a partition being created in time. A DEFAULT partition
+catches anything outside the created ranges. When a month is created whose rows
+already sit in DEFAULT, they are moved into a standalone table that is then
+attached as the month's partition, in the same transaction.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..database import async_engine
+
+logger = logging.getLogger(__name__)
+
+ORDER_PARTITION_MONTHS_AHEAD = int(os.getenv("ORDER_PARTITION_MONTHS_AHEAD", "3"))
+ORDER_PARTITION_CHECK_INTERVAL = float(os.getenv("ORDER_PARTITION_CHECK_INTERVAL", "21600"))  # seconds
+
+PARTITIONED_TABLES = ("orders", "order_items")
+PARTITION_KEYS = {"orders": "created_at", "order_items": "order_created_at"}
+
+# Serializes partition DDL across workers starting at the same time
+_PARTITION_LOCK_KEY = 0x6F726470  # "ordp"
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def partition_bounds(month: datetime) -> str:
+    return f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+def partition_ddl(table: str, month: datetime) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES {partition_bounds(month)}"
+    )
+
+
+def _month_filter(table: str, month: datetime) -> str:
+    key = PARTITION_KEYS[table]
+    return f"{key} >= '{month:%Y-%m-%d}' AND {key} < '{add_months(month, 1):%Y-%m-%d}'"
+
+
+def _default_has_rows(conn: Connection, table: str, month: datetime) -> bool:
+    return conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {_month_filter(table, month)})"
+    )).scalar()
+
+
+def _move_out_of_default(conn: Connection, tables: List[str], month: datetime) -> None:
+    """
+    Create the month's partitions of tables from the rows sitting in their DEFAULT
+    partitions. The rows are written straight to the partitions, so the change-log
+    statement triggers on orders do not see the move.
+    """
+    # Items first: their foreign key would block deleting the orders they reference
+    for table in reversed(tables):
+        name = partition_name(table, month)
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = conn.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {_month_filter(table, month)} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )).rowcount
+        logger.warning("Moved %d rows of %s from the DEFAULT partition to %s", moved, table, name)
+    # Orders first: attaching items validates their foreign key against orders
+    for table in tables:
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, month)} FOR VALUES {partition_bounds(month)}"
+        ))
+
+
+def ensure_partitions(
+    conn: Connection, now: Optional[datetime] = None, months_ahead: int = ORDER_PARTITION_MONTHS_AHEAD
+) -> List[str]:
+    """
+    Create the monthly partitions from the current month through months_ahead, plus the
+    DEFAULT partitions, for every partitioned table. Returns the partitions that were missing.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+    parents = ", ".join(f"'{table}'::regclass" for table in PARTITIONED_TABLES)
+    existing = set(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        f"WHERE i.inhparent IN ({parents})"
+    )).scalars())
+
+    first = month_start(now or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        missing = [table for table in PARTITIONED_TABLES if partition_name(table, month) not in existing]
+        if any(f"{table}_default" in existing and _default_has_rows(conn, table, month) for table in missing):
+            _move_out_of_default(conn, missing, month)
+        else:
+            for table in missing:
+                conn.execute(text(partition_ddl(table, month)))
+        created += [partition_name(table, month) for table in missing]
+    for table in PARTITIONED_TABLES:
+        if f"{table}_default" not in existing:
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+            created.append(f"{table}_default")
+    return created
+
+
+class PartitionMaintainer:
+    """Runs ensure_partitions at startup and then every ORDER_PARTITION_CHECK_INTERVAL seconds"""
+
+    def __init__(self, engine=async_engine, interval: float = ORDER_PARTITION_CHECK_INTERVAL):
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> List[str]:
+        async with self.engine.begin() as conn:
+            created = await conn.run_sync(ensure_partitions)
+        if created:
+            logger.info("Created order partitions: %s", ", ".join(created))
+        return created
+
+    async def start(self) -> None:
+        # The first run is awaited so the current month exists before any insert. If it
+        # fails, inserts land in DEFAULT until a later run creates the month.
+        try:
+            await self.run_once()
+        except Exception:
+            logger.exception("Order partition maintenance failed")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Order partition maintenance failed")
+
+
+maintainer = PartitionMaintainer()
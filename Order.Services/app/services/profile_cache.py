@@ -0,0 +1,159 @@
+"""
+Read-through cache for GET /profiles/{user_id}.
+
+Profiles are cached per worker as ProfileResponse objects in a bounded TTLCache.
+Writes in this worker (update, delete, import) invalidate it after they commit.
+PROFILE_CACHE_MAX_STALENESS bounds how old a served profile can be after another
+worker changed it:
+
+- Without the channel, entries simply expire after PROFILE_CACHE_MAX_STALENESS.
+- With PROFILE_CACHE_CHANNEL_ENABLED, writers also `pg_notify('profile_cache', user_id)`
+  in their transaction and every worker LISTENs and drops that key, so entries can
+  live for PROFILE_CACHE_TTL. The listener pings itself over the same channel;
+  Postgres delivers notifications in commit order, so once a ping comes back every
+  invalidation committed before it was sent has been applied. The cache is only
+  used while the last ping that came back is younger than the bound. Otherwise
+  (listener down, notifications backed up) it is cleared and reads go to the database.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import metrics, schemas
+from ..database import DATABASE_URL
+from ..models import Profile
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_ENABLED = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() == "true"
+PROFILE_CACHE_MAXSIZE = int(os.getenv("PROFILE_CACHE_MAXSIZE", "50000"))
+PROFILE_CACHE_MAX_STALENESS = float(os.getenv("PROFILE_CACHE_MAX_STALENESS", "5"))  # seconds
+PROFILE_CACHE_CHANNEL_ENABLED = os.getenv("PROFILE_CACHE_CHANNEL_ENABLED", "false").lower() == "true"
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))  # seconds, used with the channel
+PROFILE_CACHE_RECONNECT_DELAY = float(os.getenv("PROFILE_CACHE_RECONNECT_DELAY", "2"))
+
+PROFILE_CACHE_CHANNEL = "profile_cache"
+CLEAR_ALL = "*"  # Payload that clears every entry, e.g. after a bulk import
+PING_PREFIX = "ping:"
+
+
+class ProfileCache:
+    """Per-worker profile cache plus the optional LISTEN connection that keeps it fresh"""
+
+    def __init__(
+        self, enabled: bool = PROFILE_CACHE_ENABLED, channel_enabled: bool = PROFILE_CACHE_CHANNEL_ENABLED,
+        max_staleness: float = PROFILE_CACHE_MAX_STALENESS, maxsize: int = PROFILE_CACHE_MAXSIZE,
+        ttl: float = PROFILE_CACHE_TTL, dsn: str = DATABASE_URL
+    ):
+        self.enabled = enabled
+        self.channel_enabled = channel_enabled
+        self.max_staleness = max_staleness
+        self.dsn = dsn
+        self.cache = TTLCache("profiles", maxsize=maxsize, ttl=ttl if channel_enabled else max_staleness)
+        self._task: Optional[asyncio.Task] = None
+        self._ping_token = uuid.uuid4().hex
+        self._confirmed_at = float("-inf")  # Send time of the newest ping that came back
+        self._fresh = False
+        self.bypassed = 0
+        self.notifications = 0
+
+    def _usable(self) -> bool:
+        if not self.channel_enabled:
+            return True
+        fresh = time.monotonic() - self._confirmed_at < self.max_staleness
+        if self._fresh and not fresh:
+            # Invalidations may have been missed; nothing cached so far can be trusted
+            self.cache.clear()
+        self._fresh = fresh
+        return fresh
+
+    def _load(self, db: Session, user_id: str) -> Optional[schemas.ProfileResponse]:
+        db_profile = db.query(Profile).filter(Profile.user_id == user_id).first()
+        return schemas.ProfileResponse.model_validate(db_profile) if db_profile else None
+
+    def get_profile(self, db: Session, user_id: str) -> Optional[schemas.ProfileResponse]:
+        """Profile for user_id from the cache, or from db on a miss; None if it does not exist"""
+        if not self.enabled or not self._usable():
+            self.bypassed += 1
+            return self._load(db, user_id)
+        return self.cache.get_or_load(user_id, lambda: self._load(db, user_id))
+
+    def notify(self, db: Session, user_id: str = CLEAR_ALL) -> None:
+        """Announce a profile change to the other workers; sent when db's transaction commits"""
+        if self.enabled and self.channel_enabled:
+            db.execute(select(func.pg_notify(PROFILE_CACHE_CHANNEL, user_id)))
+
+    def invalidate(self, user_id: str = CLEAR_ALL) -> None:
+        """Drop user_id (or everything) from this worker's cache; call after the write committed"""
+        if user_id == CLEAR_ALL:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(user_id)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        if payload.startswith(PING_PREFIX):
+            token, _, sent_at = payload[len(PING_PREFIX):].partition(":")
+            if token == self._ping_token:
+                self._confirmed_at = max(self._confirmed_at, float(sent_at))
+            return
+        self.notifications += 1
+        self.invalidate(payload)
+
+    def start(self) -> None:
+        if self.enabled and self.channel_enabled and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection and ping through it, reconnecting whenever it drops"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(PROFILE_CACHE_CHANNEL, self._on_notify)
+                while True:
+                    payload = f"{PING_PREFIX}{self._ping_token}:{time.monotonic()}"
+                    await connection.execute("SELECT pg_notify($1, $2)", PROFILE_CACHE_CHANNEL, payload)
+                    await asyncio.sleep(self.max_staleness / 3)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Profile cache listener failed: %s", e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(PROFILE_CACHE_RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        stats.update({
+            "enabled": self.enabled,
+            "max_staleness": self.max_staleness,
+            "channel_enabled": self.channel_enabled,
+            "bypassed": self.bypassed,
+        })
+        if self.channel_enabled:
+            stats["listening"] = self._task is not None and not self._task.done()
+            stats["channel_lag"] = time.monotonic() - self._confirmed_at if self._fresh else None
+            stats["notifications"] = self.notifications
+        return stats
+
+
+profile_cache = ProfileCache()
+metrics.register_cache(profile_cache.cache)
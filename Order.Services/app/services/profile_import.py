@@ -0,0 +1,242 @@
+"""
+Bulk profile import: COPY into a staging table, then one ON CONFLICT merge.
+
+Each batch is validated as ProfileCreate, streamed with COPY into a temporary
+staging table and merged into profiles with a single INSERT ... ON CONFLICT
+(user_id) DO UPDATE, in one transaction:
+
+- a new user_id is inserted with role "user"
+- an existing user_id gets name/email/phone/avatar/address updated; rows that
+  would not change anything are left alone and counted as unchanged
+
+Rows that would break a unique constraint are skipped and reported, instead of
+failing the batch: a user_id, email or phone repeated within the batch (the first
+occurrence wins), or an email/phone that already belongs to another profile.
+import_rows retries a batch once if a concurrent write takes an email/phone
+between the check and the merge; if it fails again, the whole batch is reported
+with the key the database rejected.
+
+Used by POST /profiles/import and from the command line:
+    python -m app.services.profile_import profiles.csv --batch-size 50000
+The CSV needs a header with user_id,name,email,phone and optionally avatar,address.
+"""
+import argparse
+import csv
+import io
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..database import SessionLocal
+from .profile_cache import profile_cache
+
+IMPORT_COLUMNS = ("user_id", "name", "email", "phone", "avatar", "address")
+PROFILE_IMPORT_BATCH_SIZE = 50000
+
+STAGING_DDL = """
+CREATE TEMP TABLE profile_import_staging (
+    row_index integer PRIMARY KEY,
+    user_id text NOT NULL,
+    name text NOT NULL,
+    email text NOT NULL,
+    phone text NOT NULL,
+    avatar text,
+    address text
+) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY profile_import_staging (row_index, {', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Every staged row that would violate a unique constraint, with the reason
+CONFLICTS_SQL = """
+CREATE TEMP TABLE profile_import_conflicts ON COMMIT DROP AS
+SELECT row_index, user_id, field, reason FROM (
+    SELECT row_index, user_id, 'user_id' AS field, 'duplicate user_id in import' AS reason,
+           row_number() OVER (PARTITION BY user_id ORDER BY row_index) AS occurrence
+    FROM profile_import_staging
+    UNION ALL
+    SELECT row_index, user_id, 'email', 'duplicate email in import',
+           row_number() OVER (PARTITION BY email ORDER BY row_index)
+    FROM profile_import_staging
+    UNION ALL
+    SELECT row_index, user_id, 'phone', 'duplicate phone in import',
+           row_number() OVER (PARTITION BY phone ORDER BY row_index)
+    FROM profile_import_staging
+) repeated
+WHERE occurrence > 1
+UNION ALL
+SELECT s.row_index, s.user_id, 'email', 'email belongs to another profile'
+FROM profile_import_staging s JOIN profiles p ON p.email = s.email AND p.user_id <> s.user_id
+UNION ALL
+SELECT s.row_index, s.user_id, 'phone', 'phone belongs to another profile'
+FROM profile_import_staging s JOIN profiles p ON p.phone = s.phone AND p.user_id <> s.user_id
+"""
+
+MERGE_SQL = """
+INSERT INTO profiles (user_id, name, email, phone, role, avatar, address, created_at, updated_at)
+SELECT s.user_id, s.name, s.email, s.phone, 'user', s.avatar, s.address, :now, :now
+FROM profile_import_staging s
+WHERE NOT EXISTS (SELECT 1 FROM profile_import_conflicts c WHERE c.row_index = s.row_index)
+ON CONFLICT (user_id) DO UPDATE SET
+    name = EXCLUDED.name,
+    email = EXCLUDED.email,
+    phone = EXCLUDED.phone,
+    avatar = EXCLUDED.avatar,
+    address = EXCLUDED.address,
+    updated_at = EXCLUDED.updated_at
+WHERE (profiles.name, profiles.email, profiles.phone, profiles.avatar, profiles.address)
+    IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.email, EXCLUDED.phone, EXCLUDED.avatar, EXCLUDED.address)
+RETURNING xmax = 0 AS inserted
+"""
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    conflicts: List[Dict[str, Any]] = field(default_factory=list)  # ProfileImportConflict fields
+
+    def merge(self, other: "ImportResult") -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.conflicts.extend(other.conflicts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _csv_buffer(profiles: List[Tuple[int, schemas.ProfileCreate]]) -> io.StringIO:
+    # Unquoted empty fields are NULL for COPY ... csv, which is what None is written as
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, profile in profiles:
+        writer.writerow([index] + [getattr(profile, column) for column in IMPORT_COLUMNS])
+    buffer.seek(0)
+    return buffer
+
+
+def merge_batch(db: Session, profiles: List[Tuple[int, schemas.ProfileCreate]]) -> ImportResult:
+    """Stage (index, profile) pairs with COPY and merge them into profiles; commits"""
+    result = ImportResult()
+    if not profiles:
+        return result
+
+    db.execute(text(STAGING_DDL))
+    raw = db.connection().connection.driver_connection  # psycopg2, same transaction
+    with raw.cursor() as cursor:
+        cursor.copy_expert(COPY_SQL, _csv_buffer(profiles))
+
+    db.execute(text(CONFLICTS_SQL))
+    conflicts = db.execute(text(
+        "SELECT row_index, user_id, field, reason FROM profile_import_conflicts ORDER BY row_index, field"
+    )).all()
+    merged = db.execute(text(MERGE_SQL), {"now": datetime.utcnow()}).scalars().all()
+    if not all(merged):
+        profile_cache.notify(db)  # Updated rows: other workers drop their whole cache
+    db.commit()
+
+    result.conflicts = [
+        {"index": row.row_index, "user_id": row.user_id, "field": row.field, "reason": row.reason}
+        for row in conflicts
+    ]
+    result.inserted = sum(1 for inserted in merged if inserted)
+    result.updated = len(merged) - result.inserted
+    result.unchanged = len(profiles) - len({row.row_index for row in conflicts}) - len(merged)
+    if result.updated:
+        profile_cache.invalidate()
+    return result
+
+
+def validate_rows(rows: Iterable[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Any]]:
+    """Yield (index, ProfileCreate) for valid rows and (index, conflict dict) for invalid ones"""
+    for index, row in rows:
+        values = {column: (row.get(column) or None) for column in IMPORT_COLUMNS}
+        try:
+            if not values["user_id"]:
+                raise ValueError("user_id is required")
+            yield index, schemas.ProfileCreate(**values)
+        except (ValidationError, ValueError) as e:
+            reason = "; ".join(error["msg"] for error in e.errors()) if isinstance(e, ValidationError) else str(e)
+            yield index, {"index": index, "user_id": values["user_id"], "field": "row", "reason": reason}
+
+
+def _integrity_detail(error: IntegrityError) -> str:
+    """The DETAIL line Postgres gives for the violated key, e.g. Key (email)=(...) already exists."""
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "message_detail", None) or str(error.orig).strip()
+
+
+def import_rows(
+    rows: Iterable[Tuple[int, Dict[str, Any]]], session_factory=SessionLocal,
+    batch_size: int = PROFILE_IMPORT_BATCH_SIZE
+) -> ImportResult:
+    """Validate and merge rows in batches of batch_size, one transaction per batch"""
+    result = ImportResult()
+    batch: List[Tuple[int, schemas.ProfileCreate]] = []
+
+    def flush() -> None:
+        for attempt in range(2):
+            with session_factory() as db:
+                try:
+                    result.merge(merge_batch(db, batch))
+                    break
+                except IntegrityError as e:
+                    # A concurrent write took an email/phone between the conflict check and
+                    # the merge; the retry's check skips that row
+                    db.rollback()
+                    if attempt == 1:
+                        reason = f"batch not imported: {_integrity_detail(e)}"
+                        result.conflicts.extend(
+                            {"index": index, "user_id": profile.user_id, "field": "row", "reason": reason}
+                            for index, profile in batch
+                        )
+        batch.clear()
+
+    for index, item in validate_rows(rows):
+        if isinstance(item, dict):
+            result.conflicts.append(item)
+            continue
+        batch.append((index, item))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import profiles from a CSV file")
+    parser.add_argument("path", help="CSV with a header: user_id,name,email,phone[,avatar,address]")
+    parser.add_argument("--batch-size", type=int, default=PROFILE_IMPORT_BATCH_SIZE)
+    parser.add_argument("--conflicts", help="Write skipped rows to this CSV file")
+    args = parser.parse_args()
+
+    with open(args.path, newline="", encoding="utf-8") as source:
+        reader = csv.DictReader(source)
+        result = import_rows(((reader.line_num, row) for row in reader), batch_size=args.batch_size)
+
+    print(
+        f"Inserted {result.inserted}, updated {result.updated}, unchanged {result.unchanged}, "
+        f"skipped {len({conflict['index'] for conflict in result.conflicts})} rows"
+    )
+    if args.conflicts:
+        with open(args.conflicts, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=["index", "user_id", "field", "reason"])
+            writer.writeheader()
+            writer.writerows(result.conflicts)
+    elif result.conflicts:
+        for conflict in result.conflicts[:20]:
+            print(f"  line {conflict['index']}: {conflict['field']}: {conflict['reason']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
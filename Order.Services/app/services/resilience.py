@@ -0,0 +1,141 @@
+"""
+Retry and circuit-breaker policies for downstream service calls.
+
+- RetryPolicy: jittered exponential backoff. Connection errors and pool/connect
+  timeouts are retried for every method, since the request never left. 502/503/504
+  are retried only for idempotent methods: a gateway error does not prove the
+  upstream skipped the request, so non-idempotent POSTs are never duplicated.
+- CircuitBreaker: per-endpoint breaker. After `failure_threshold` consecutive
+  failures it opens and calls fail fast with CircuitOpenError; after
+  `reset_timeout` one trial call is let through (half-open) to probe recovery.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        super().__init__(f"Circuit breaker '{breaker.name}' is open")
+        self.breaker = breaker
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3  # Including the first attempt
+    base_delay: float = 0.1  # seconds
+    max_delay: float = 2.0
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "RetryPolicy":
+        defaults = cls()
+        return cls(
+            max_attempts=int(os.getenv(f"{prefix}_RETRY_MAX_ATTEMPTS", str(defaults.max_attempts))),
+            base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", str(defaults.base_delay))),
+            max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", str(defaults.max_delay))),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def is_retryable(
+        error: Optional[BaseException] = None, response: Optional[httpx.Response] = None, method: str = "GET"
+    ) -> bool:
+        if error is not None:
+            return isinstance(error, RETRYABLE_EXCEPTIONS)
+        return (
+            response is not None
+            and response.status_code in RETRYABLE_STATUS_CODES
+            and method.upper() in IDEMPOTENT_METHODS
+        )
+
+
+# All breakers, for the instrumentation endpoint
+_registry: List["CircuitBreaker"] = []
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        _registry.append(self)
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            failure_threshold=int(os.getenv(f"{prefix}_BREAKER_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET_TIMEOUT", "30")),
+        )
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not be attempted"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self)
+            self._trial_in_flight = True
+
+    def release(self) -> None:
+        """Forget an in-flight trial whose outcome was never recorded (e.g. cancelled)"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "open_for": round(time.monotonic() - self.opened_at, 3) if self.state == self.OPEN else None,
+        }
+
+
+def all_breaker_stats() -> List[Dict[str, Any]]:
+    return [breaker.stats() for breaker in _registry]
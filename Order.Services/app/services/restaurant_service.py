@@ -1,12 +1,23 @@
 
 import httpx
+import logging
 import os
-from typing import Optional, Dict, Any
+from decimal import Decimal
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 
+from .. import metrics
+from .cache import AsyncTTLCache
+from .http_pool import HttpClientConfig, PooledServiceClient
+from .resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
 # Config
 RESTAURANT_SERVICE_URL = os.getenv("RESTAURANT_SERVICE_URL", "http://restaurants-service:8080")
-TIMEOUT = 10.0
+RESTAURANT_CACHE_TTL = float(os.getenv("RESTAURANT_CACHE_TTL", "300"))  # seconds
+RESTAURANT_CACHE_NEGATIVE_TTL = float(os.getenv("RESTAURANT_CACHE_NEGATIVE_TTL", "10"))
+RESTAURANT_CACHE_MAXSIZE = int(os.getenv("RESTAURANT_CACHE_MAXSIZE", "10000"))
 
 @dataclass
 class RestaurantInfo:
@@ -15,29 +26,89 @@ class RestaurantInfo:
     address: str
     phone: Optional[str] = None
 
-class RestaurantServiceClient:
-    def __init__(self, base_url: str = None):
-        self.base_url = base_url or RESTAURANT_SERVICE_URL
+@dataclass
+class DishInfo:
+    id: int
+    restaurant_id: str
+    name: str
+    price: Decimal
+    discounted_price: Optional[Decimal]
+    is_available: bool
+    stock_quantity: Optional[int] = None
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "DishInfo":
+        discounted = data.get("discounted_price")
+        return cls(
+            id=int(data["id"]),
+            restaurant_id=str(data["restaurant_id"]),
+            name=data["name"],
+            price=Decimal(str(data["price"])),
+            discounted_price=Decimal(str(discounted)) if discounted is not None else None,
+            is_available=bool(data.get("is_available", True)),
+            stock_quantity=data.get("stock_quantity"),
+        )
+
+    @property
+    def current_price(self) -> Decimal:
+        """What the dish sells for now: the discounted price if there is one"""
+        return self.discounted_price if self.discounted_price is not None else self.price
+
+class RestaurantServiceClient(PooledServiceClient):
+    def __init__(self, base_url: str = None, config: HttpClientConfig = None):
+        super().__init__(
+            "restaurant-service",
+            base_url or RESTAURANT_SERVICE_URL,
+            config or HttpClientConfig.from_env("RESTAURANT_SERVICE"),
+            breaker_env_prefix="RESTAURANT_SERVICE",
+        )
 
     async def get_restaurant_info(self, restaurant_id: str) -> Optional[RestaurantInfo]:
         try:
-            async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-                response = await client.get(f"{self.base_url}/api/Restaurants/{restaurant_id}")
-                response.raise_for_status()
-                data = response.json()
-                return RestaurantInfo(
-                    id=str(data.get("id")),
-                    name=data.get("name"),
-                    address=data.get("address"),
-                    phone=data.get("phone")
-                )
-        except httpx.HTTPError as e:
-            print(f"Error getting restaurant info: {e}")
+            response = await self.send(
+                "GET", f"/api/Restaurants/{restaurant_id}", endpoint="GET /api/Restaurants/{id}"
+            )
+            response.raise_for_status()
+            data = response.json()
+            return RestaurantInfo(
+                id=str(data.get("id")),
+                name=data.get("name"),
+                address=data.get("address"),
+                phone=data.get("phone")
+            )
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.warning("Error getting restaurant info: %s", e)
+            return None
+
+    async def get_dishes(self, dish_ids: List[int]) -> Optional[Dict[int, DishInfo]]:
+        """Look up several dishes in one call; unknown ids are missing from the result. None if the call failed."""
+        try:
+            response = await self.send(
+                "GET", "/api/v1/menu/dishes", params={"ids": ",".join(map(str, dish_ids))}
+            )
+            response.raise_for_status()
+            return {dish.id: dish for dish in map(DishInfo.from_json, response.json())}
+        except (httpx.HTTPError, CircuitOpenError, KeyError, ValueError) as e:
+            logger.warning("Error getting dishes: %s", e)
             return None
 
 
 
 restaurant_client = RestaurantServiceClient()
+restaurant_cache = AsyncTTLCache(
+    "restaurants",
+    maxsize=RESTAURANT_CACHE_MAXSIZE,
+    ttl=RESTAURANT_CACHE_TTL,
+    negative_ttl=RESTAURANT_CACHE_NEGATIVE_TTL,
+)
+metrics.register_cache(restaurant_cache)
 
 async def get_restaurant_details(restaurant_id: str) -> Optional[RestaurantInfo]:
-    return await restaurant_client.get_restaurant_info(restaurant_id)
+    return await restaurant_cache.get_or_load(
+        restaurant_id, lambda: restaurant_client.get_restaurant_info(restaurant_id)
+    )
+
+
+def invalidate_restaurant(restaurant_id: str) -> bool:
+    """Drop a cached restaurant, e.g. after its address changed"""
+    return restaurant_cache.invalidate(restaurant_id)
@@ -0,0 +1,118 @@
+"""
+Backfill for the restaurant_daily_sales rollup.
+
+The rollup is maintained incrementally by the order write paths (see
+crud.sales_rollup_change). This rebuilds it from orders/order_items one UTC day per
+transaction, e.g. after the table is first created or to repair drift:
+    python -m app.services.sales_rollup --from 2026-01-01 --to 2026-10-18
+
+Each day is recomputed under a SHARE ROW EXCLUSIVE lock on the rollup, so status
+changes running at the same time wait for the rebuild and then apply their delta on
+top of it. Days with archived orders (see app.services.archive) are skipped: those
+orders are no longer in the hot tables, and their rollup rows are kept as they are.
+"""
+import argparse
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Date, and_, cast, delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def rebuild_day(db: Session, day: date) -> None:
+    """Recompute every restaurant's rollup row for one day and commit"""
+    Order, OrderItem, DailySales = models.Order, models.OrderItem, models.RestaurantDailySales
+    start, end = _day_bounds(day)
+
+    # Bounds on both partition keys keep the scan on a single monthly partition
+    quantities = (
+        select(OrderItem.order_id, OrderItem.order_created_at, func.sum(OrderItem.quantity).label("quantity"))
+        .where(OrderItem.order_created_at >= start, OrderItem.order_created_at < end)
+        .group_by(OrderItem.order_id, OrderItem.order_created_at)
+        .subquery()
+    )
+    sales = (
+        select(
+            Order.restaurant_id,
+            literal(day, Date),
+            func.count(),
+            func.coalesce(func.sum(Order.subtotal), 0),
+            func.coalesce(func.sum(quantities.c.quantity), 0),
+        )
+        .select_from(Order)
+        .outerjoin(quantities, and_(
+            quantities.c.order_id == Order.id, quantities.c.order_created_at == Order.created_at
+        ))
+        .where(Order.status.in_(crud.SALES_STATUSES), Order.created_at >= start, Order.created_at < end)
+        .group_by(Order.restaurant_id)
+    )
+
+    db.execute(text("LOCK TABLE restaurant_daily_sales IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(delete(DailySales).where(DailySales.day == day))
+    db.execute(insert(DailySales).from_select(
+        ["restaurant_id", "day", "order_count", "gross", "items_sold"], sales
+    ))
+    db.commit()
+
+
+def _archived_days(db: Session, day_from: date, day_to: date) -> set:
+    Entry = models.OrderArchiveEntry
+    start, _ = _day_bounds(day_from)
+    _, end = _day_bounds(day_to)
+    return set(db.execute(
+        select(cast(Entry.created_at, Date)).where(Entry.created_at >= start, Entry.created_at < end).distinct()
+    ).scalars())
+
+
+def backfill(
+    session_factory=SessionLocal, day_from: Optional[date] = None, day_to: Optional[date] = None
+) -> Tuple[List[date], List[date]]:
+    """
+    Rebuild the rollup for day_from..day_to inclusive (default: first order through today).
+    Returns (rebuilt days, days skipped because they have archived orders).
+    """
+    rebuilt, skipped = [], []
+    with session_factory() as db:
+        day_to = day_to or datetime.utcnow().date()
+        if day_from is None:
+            first = db.query(func.min(models.Order.created_at)).scalar()
+            day_from = first.date() if first else day_to
+        archived = _archived_days(db, day_from, day_to)
+
+        day = day_from
+        while day <= day_to:
+            if day in archived:
+                skipped.append(day)
+            else:
+                rebuild_day(db, day)
+                rebuilt.append(day)
+            day += timedelta(days=1)
+    if skipped:
+        logger.warning("Skipped %d days with archived orders", len(skipped))
+    return rebuilt, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the restaurant daily sales rollup")
+    parser.add_argument("--from", dest="day_from", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="day_to", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rebuilt, skipped = backfill(day_from=args.day_from, day_to=args.day_to)
+    print(f"Rebuilt {len(rebuilt)} days, skipped {len(skipped)} days with archived orders")
+
+
+if __name__ == "__main__":
+    main()
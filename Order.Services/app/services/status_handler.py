@@ -6,15 +6,53 @@ in a source-agnostic manner.
 """
 
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
 from . import driver_service
 
 
+# Valid status transitions: current status -> allowed next statuses
+VALID_TRANSITIONS = {
+    schemas.OrderStatus.PENDING_RESTAURANT: {
+        schemas.OrderStatus.RESTAURANT_ACCEPTED,
+        schemas.OrderStatus.RESTAURANT_REJECTED,
+    },
+    schemas.OrderStatus.RESTAURANT_ACCEPTED: {
+        schemas.OrderStatus.DRIVER_ACCEPTED,
+        schemas.OrderStatus.DRIVER_REJECTED,
+    },
+}
+
+# Statuses that end the order lifecycle: no transition leaves them
+TERMINAL_STATUSES = frozenset({
+    schemas.OrderStatus.RESTAURANT_REJECTED,
+    schemas.OrderStatus.DRIVER_ACCEPTED,
+    schemas.OrderStatus.DRIVER_REJECTED,
+})
+
+# Terminal statuses in which the order ends unfulfilled
+REJECTED_STATUSES = frozenset({
+    schemas.OrderStatus.RESTAURANT_REJECTED,
+    schemas.OrderStatus.DRIVER_REJECTED,
+})
+
+# Terminal statuses a transition can enter in which the order is sold (crud.SALES_STATUSES)
+COMPLETED_STATUSES = frozenset(
+    status
+    for targets in VALID_TRANSITIONS.values()
+    for status in targets
+    if status in TERMINAL_STATUSES - REJECTED_STATUSES
+)
+
+
+class SideEffectError(Exception):
+    """A status side effect failed and should be retried"""
+
+
 class StatusHandler:
     """Handles status-specific logic for order updates"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def handle_status_update(
@@ -22,7 +60,8 @@ class StatusHandler:
     ) -> None:
         """
         Apply status-specific logic based on the new status value.
-        This method is called after the status has been updated in the database.
+        This method is called by the outbox dispatcher after the status change
+        has been committed. Raises SideEffectError if the work should be retried.
         """
         if new_status == schemas.OrderStatus.RESTAURANT_REJECTED:
             await self._handle_restaurant_rejected(order)
@@ -40,40 +79,37 @@ class StatusHandler:
 
     async def _handle_restaurant_accepted(self, order: models.Order) -> None:
         """Handle restaurant acceptance - initiate driver assignment"""
-        # Send request to Driver Services to initiate driver assignment
-        # This is a fire-and-forget operation
-        try:
-            # Get restaurant information for pickup details
-            from . import restaurant_service
-
-            restaurant_id = str(order.restaurant_id)
-            restaurant = await restaurant_service.get_restaurant_details(restaurant_id)
-            if not restaurant:
-                print(f"Failed to get restaurant details for order {order.id}")
-                return
-
-            # Calculate fare (simple calculation based on subtotal + delivery fee)
-            fare = float(order.subtotal + order.delivery_fee)  # type: ignore
-
-            # For now, we'll skip coordinates as they would require geocoding
-            # In a real implementation, you'd geocode the addresses
-            delivery_address = str(order.delivery_address)  # type: ignore
-            customer_notes = str(order.delivery_note) if order.delivery_note else None  # type: ignore
-
-            await driver_service.initiate_driver_assignment(
-                order_id=str(order.id),
-                pickup_address=restaurant.address,
-                pickup_lat=None,  # Would need geocoding
-                pickup_lng=None,  # Would need geocoding
-                delivery_address=delivery_address,
-                delivery_lat=None,  # Would need geocoding
-                delivery_lng=None,  # Would need geocoding
-                fare=fare,
-                customer_notes=customer_notes,
-            )
-        except Exception as e:
-            # Log error but don't fail the status update
-            print(f"Failed to initiate driver assignment for order {order.id}: {e}")
+        # Send request to Driver Services to initiate driver assignment.
+        # Runs from the outbox dispatcher; raising makes it retry later.
+        # Get restaurant information for pickup details
+        from . import restaurant_service
+
+        restaurant_id = str(order.restaurant_id)
+        restaurant = await restaurant_service.get_restaurant_details(restaurant_id)
+        if not restaurant:
+            raise SideEffectError(f"Failed to get restaurant details for order {order.id}")
+
+        # Calculate fare (simple calculation based on subtotal + delivery fee)
+        fare = float(order.subtotal + order.delivery_fee)  # type: ignore
+
+        # For now, we'll skip coordinates as they would require geocoding
+        # In a real implementation, you'd geocode the addresses
+        delivery_address = str(order.delivery_address)  # type: ignore
+        customer_notes = str(order.delivery_note) if order.delivery_note else None  # type: ignore
+
+        assigned = await driver_service.initiate_driver_assignment(
+            order_id=str(order.id),
+            pickup_address=restaurant.address,
+            pickup_lat=None,  # Would need geocoding
+            pickup_lng=None,  # Would need geocoding
+            delivery_address=delivery_address,
+            delivery_lat=None,  # Would need geocoding
+            delivery_lng=None,  # Would need geocoding
+            fare=fare,
+            customer_notes=customer_notes,
+        )
+        if not assigned:
+            raise SideEffectError(f"Failed to initiate driver assignment for order {order.id}")
 
     async def _handle_driver_accepted(self, order: models.Order) -> None:
         """Handle driver acceptance - complete the order lifecycle"""
@@ -87,12 +123,7 @@ class StatusHandler:
 
     def is_terminal_status(self, status: schemas.OrderStatus) -> bool:
         """Check if a status is terminal (no further transitions allowed)"""
-        terminal_statuses = {
-            schemas.OrderStatus.RESTAURANT_REJECTED,
-            schemas.OrderStatus.DRIVER_ACCEPTED,
-            schemas.OrderStatus.DRIVER_REJECTED,
-        }
-        return status in terminal_statuses
+        return status in TERMINAL_STATUSES
 
     def validate_status_transition(
         self, current_status: str, new_status: schemas.OrderStatus
@@ -111,16 +142,4 @@ class StatusHandler:
         if self.is_terminal_status(current):
             return False
 
-        # Define valid transitions
-        valid_transitions = {
-            schemas.OrderStatus.PENDING_RESTAURANT: {
-                schemas.OrderStatus.RESTAURANT_ACCEPTED,
-                schemas.OrderStatus.RESTAURANT_REJECTED,
-            },
-            schemas.OrderStatus.RESTAURANT_ACCEPTED: {
-                schemas.OrderStatus.DRIVER_ACCEPTED,
-                schemas.OrderStatus.DRIVER_REJECTED,
-            },
-        }
-
-        return new_status in valid_transitions.get(current, set())
+        return new_status in VALID_TRANSITIONS.get(current, set())
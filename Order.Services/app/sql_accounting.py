@@ -0,0 +1,86 @@
+"""
+Per-request SQL accounting.
+
+Engine events add every statement's count, duration and rowcount to the stats of the
+request currently running (a ContextVar set by middleware.SqlAccountingMiddleware).
+The context follows the request into threadpool routes and into the greenlets of
+the async engine; statements issued outside a request (outbox dispatcher, event
+broker) are not counted.
+
+Budgets flag requests that issue too many statements or spend too long in the DB,
+which is how N+1 loops and repeated fetches show up.
+"""
+import os
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_ACCOUNTING_ENABLED = os.getenv("SQL_ACCOUNTING_ENABLED", "true").lower() == "true"
+SQL_BUDGET_STATEMENTS = int(os.getenv("SQL_BUDGET_STATEMENTS", "20"))
+SQL_BUDGET_DB_MS = float(os.getenv("SQL_BUDGET_DB_MS", "200"))
+
+
+@dataclass
+class SqlStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0  # as reported by the driver's rowcount; -1 (unknown) is not counted
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_seconds * 1000
+
+    def over_budget(self) -> List[str]:
+        """Names of the budgets this request exceeded"""
+        exceeded = []
+        if self.statements > SQL_BUDGET_STATEMENTS:
+            exceeded.append("statements")
+        if self.db_ms > SQL_BUDGET_DB_MS:
+            exceeded.append("db_time")
+        return exceeded
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_ms:.1f};desc="{self.statements} statements, {self.rows} rows"'
+
+
+_current: ContextVar[Optional[SqlStats]] = ContextVar("sql_stats", default=None)
+
+
+def begin() -> Tuple[SqlStats, Token]:
+    """Start accounting for the current request; pass the token to end()"""
+    stats = SqlStats()
+    return stats, _current.set(stats)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[SqlStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._sql_accounting_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_sql_accounting_start", None)
+    if stats is None or started is None:
+        return
+    stats.db_seconds += time.perf_counter() - started
+    stats.statements += 1
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+if SQL_ACCOUNTING_ENABLED:
+    # On the Engine class, so the primary, async and replica engines are all covered
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
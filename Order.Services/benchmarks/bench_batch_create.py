@@ -0,0 +1,61 @@
+"""
+Benchmark: POST /api/v1/orders (one by one) vs POST /api/v1/orders/batch.
+
+Usage (service must be running, with MENU_VALIDATION_ENABLED=false: the dishes are made up):
+    python benchmarks/bench_batch_create.py --orders 500 --batch-size 250
+"""
+import argparse
+import os
+import time
+import uuid
+
+import httpx
+
+BASE_URL = os.getenv("ORDER_SERVICE_URL", "http://localhost:8002")
+
+
+def make_order(i: int) -> dict:
+    return {
+        "user_id": f"bench-user-{i % 50}",
+        "restaurant_id": "bench-restaurant",
+        "delivery_address": f"{i} Bench Street",
+        "payment_method": "cash",
+        "items": [
+            {"product_id": str(uuid.uuid4()), "product_name": "Cơm tấm", "quantity": 2, "unit_price": "45000"},
+            {"product_id": str(uuid.uuid4()), "product_name": "Trà đá", "quantity": 1, "unit_price": "5000"},
+        ],
+    }
+
+
+def bench_single(client: httpx.Client, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        client.post("/api/v1/orders/", json=make_order(i)).raise_for_status()
+    return time.perf_counter() - start
+
+
+def bench_batch(client: httpx.Client, n: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, n, batch_size):
+        payload = {"orders": [make_order(i) for i in range(offset, min(n, offset + batch_size))]}
+        client.post("/api/v1/orders/batch", json=payload).raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=250)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=BASE_URL, timeout=60.0) as client:
+        single = bench_single(client, args.orders)
+        batch = bench_batch(client, args.orders, args.batch_size)
+
+    print(f"single: {args.orders} orders in {single:.2f}s ({args.orders / single:.0f} orders/s)")
+    print(f"batch:  {args.orders} orders in {batch:.2f}s ({args.orders / batch:.0f} orders/s)")
+    print(f"speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
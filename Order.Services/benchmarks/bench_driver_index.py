@@ -0,0 +1,131 @@
+"""
+Benchmark: k-nearest and radius queries on the in-memory driver index
+(app.services.driver_index) against a linear scan of every driver, which is what
+loading all drivers and filtering them costs.
+
+Runs in-process on a synthetic fleet around Ho Chi Minh City, no database or running
+service needed. Half the fleet is spread uniformly, half is clustered around a few
+hotspots (districts with many restaurants). Results are checked against the scan.
+    python benchmarks/bench_driver_index.py --drivers 10000 50000 --queries 2000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.driver_index import METERS_PER_DEGREE, DriverIndex  # noqa: E402
+from app.services.driver_service import DriverLocation  # noqa: E402
+
+CENTER = (10.7769, 106.7009)
+SPAN = 0.25  # degrees around CENTER, roughly 55 x 55 km
+HOTSPOTS = 12
+
+
+def make_fleet(n: int, rng: random.Random):
+    hotspots = [
+        (CENTER[0] + rng.uniform(-SPAN / 3, SPAN / 3), CENTER[1] + rng.uniform(-SPAN / 3, SPAN / 3))
+        for _ in range(HOTSPOTS)
+    ]
+    fleet = []
+    for i in range(n):
+        if i % 2:
+            lat, lng = rng.choice(hotspots)
+            lat, lng = lat + rng.gauss(0, 0.01), lng + rng.gauss(0, 0.01)
+        else:
+            lat, lng = CENTER[0] + rng.uniform(-SPAN, SPAN), CENTER[1] + rng.uniform(-SPAN, SPAN)
+        fleet.append(DriverLocation(f"driver-{i}", lat, lng, "2026-10-18T10:00:00"))
+    return fleet
+
+
+def make_points(n: int, rng: random.Random):
+    return [(CENTER[0] + rng.uniform(-SPAN / 2, SPAN / 2), CENTER[1] + rng.uniform(-SPAN / 2, SPAN / 2))
+            for _ in range(n)]
+
+
+def scan(fleet, latitude: float, longitude: float):
+    """Distance to every driver, closest first"""
+    ky, kx = METERS_PER_DEGREE, METERS_PER_DEGREE * math.cos(math.radians(latitude))
+    return sorted(
+        (math.hypot((d.latitude - latitude) * ky, (d.longitude - longitude) * kx), d.driver_id) for d in fleet
+    )
+
+
+def timed(fn, points):
+    samples = []
+    for latitude, longitude in points:
+        start = time.perf_counter()
+        fn(latitude, longitude)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=2000, help="meters")
+    parser.add_argument("--limit", type=int, default=100, help="radius query limit (GET /drivers/within default)")
+    parser.add_argument("--cell", type=float, default=250, help="grid cell size in meters")
+    parser.add_argument("--scan-queries", type=int, default=50, help="queries for the linear scan baseline")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for n in args.drivers:
+        rng = random.Random(args.seed)
+        fleet = make_fleet(n, rng)
+        points = make_points(args.queries, rng)
+
+        tracemalloc.start()
+        index = DriverIndex(cell_meters=args.cell, ttl=3600)
+        start = time.perf_counter()
+        for location in fleet:
+            index.update(location)
+        load = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # A second round of updates, every driver moved a little (mostly same cell)
+        moved = [
+            DriverLocation(d.driver_id, d.latitude + rng.gauss(0, 0.001), d.longitude + rng.gauss(0, 0.001),
+                           "2026-10-18T10:00:05")
+            for d in fleet
+        ]
+        start = time.perf_counter()
+        for location in moved:
+            index.update(location)
+        update = (time.perf_counter() - start) / n
+        fleet = moved
+
+        for latitude, longitude in points[:args.scan_queries]:
+            expected = scan(fleet, latitude, longitude)
+            nearest = index.nearest(latitude, longitude, args.k, max_radius_m=1e9)
+            assert [round(m, 3) for _, m in nearest] == [round(m, 3) for m, _ in expected[:args.k]]
+            within = index.within(latitude, longitude, args.radius)
+            assert len(within) == sum(1 for m, _ in expected if m <= args.radius)
+            limited = index.within(latitude, longitude, args.radius, limit=args.limit)
+            assert [round(m, 3) for _, m in limited] == [round(m, 3) for _, m in within[:args.limit]]
+
+        knn_p50, knn_p99 = timed(lambda lat, lng: index.nearest(lat, lng, args.k), points)
+        radius_p50, radius_p99 = timed(lambda lat, lng: index.within(lat, lng, args.radius, args.limit), points)
+        all_p50, all_p99 = timed(lambda lat, lng: index.within(lat, lng, args.radius), points)
+        scan_p50, _ = timed(lambda lat, lng: scan(fleet, lat, lng), points[:args.scan_queries])
+        average_hits = sum(len(index.within(lat, lng, args.radius)) for lat, lng in points[:200]) / 200
+
+        print(f"{n} drivers, {index.stats()['cells']} cells of {args.cell:.0f} m, {memory / n:.0f} B/driver")
+        print(f"  load:                     {load * 1000:8.1f} ms   update: {update * 1e6:6.2f} us/driver")
+        print(f"  nearest k={args.k}:              p50 {knn_p50:7.1f} us   p99 {knn_p99:7.1f} us")
+        print(f"  within {args.radius:.0f} m, limit {args.limit}: p50 {radius_p50:7.1f} us   p99 {radius_p99:7.1f} us")
+        print(f"  within {args.radius:.0f} m, all:       p50 {all_p50:7.1f} us   p99 {all_p99:7.1f} us"
+              f"   ({average_hits:.0f} drivers on average)")
+        print(f"  linear scan:              p50 {scan_p50:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
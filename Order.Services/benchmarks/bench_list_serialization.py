@@ -0,0 +1,87 @@
+"""
+Benchmark: OrderListResponse (pydantic, from_attributes) vs the orjson row path
+used when FAST_JSON_RESPONSES=true.
+
+Runs in-process on synthetic rows, no database or running service needed:
+    python benchmarks/bench_list_serialization.py --orders 100 --items 3 --rounds 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import crud, models, schemas, serialization  # noqa: E402
+
+OrderRow = namedtuple("OrderRow", [c.name for c in models.Order.__table__.columns])
+ItemRow = namedtuple("ItemRow", [c.name for c in models.OrderItem.__table__.columns])
+
+
+def make_rows(n_orders: int, n_items: int):
+    now = datetime.utcnow()
+    orders, items_by_order = [], {}
+    for i in range(n_orders):
+        order_id = uuid.uuid4()
+        orders.append(OrderRow(
+            id=order_id, user_id=f"bench-user-{i % 50}", restaurant_id=str(uuid.uuid4()), driver_id=None,
+            status="delivered", payment_status="paid", payment_method="cash",
+            delivery_address=f"{i} Bench Street", delivery_note=None,
+            subtotal=Decimal("95000.00"), delivery_fee=Decimal("15000.00"), discount=Decimal("0.00"),
+            total_amount=Decimal("110000.00"), created_at=now, updated_at=now,
+        ))
+        items_by_order[order_id] = [
+            ItemRow(
+                id=uuid.uuid4(), order_id=order_id, order_created_at=now, product_id=str(uuid.uuid4()),
+                product_name="Cơm tấm", quantity=2, unit_price=Decimal("45000.00"), note=None, created_at=now,
+            )
+            for _ in range(n_items)
+        ]
+    return orders, items_by_order
+
+
+def pydantic_path(orders, items_by_order) -> bytes:
+    # What the route does today: build the wrapper from attribute objects, then FastAPI
+    # re-validates it against response_model and encodes the jsonable output
+    data = [{**order._asdict(), "items": [item._asdict() for item in items_by_order[order.id]]} for order in orders]
+    response = schemas.OrderListResponse(message="ok", data=data, total=len(orders))
+    validated = schemas.OrderListResponse.model_validate(response, from_attributes=True)
+    return json.dumps(validated.model_dump(mode="json"), ensure_ascii=False).encode()
+
+
+def fast_path(orders, items_by_order) -> bytes:
+    response = serialization.order_list_response("ok", orders, items_by_order, crud.ORDER_FIELDS, total=len(orders))
+    return response.body
+
+
+def bench(fn, orders, items_by_order, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(orders, items_by_order)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    orders, items_by_order = make_rows(args.orders, args.items)
+    assert json.loads(pydantic_path(orders, items_by_order)) == json.loads(fast_path(orders, items_by_order))
+
+    slow = bench(pydantic_path, orders, items_by_order, args.rounds)
+    fast = bench(fast_path, orders, items_by_order, args.rounds)
+    print(f"{args.orders} orders x {args.items} items, {args.rounds} rounds")
+    print(f"  pydantic: {slow * 1000:8.2f} ms/response")
+    print(f"  orjson:   {fast * 1000:8.2f} ms/response  ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
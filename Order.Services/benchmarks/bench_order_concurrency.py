@@ -0,0 +1,86 @@
+"""
+Benchmark: concurrent order create/update load, with a /health probe running alongside.
+
+While the event loop is blocked by synchronous DB calls, /health latency climbs with
+the write load; with the async stack it should stay flat. Run once against the
+baseline build and once against the current one to compare.
+
+Usage (service must be running):
+    python benchmarks/bench_order_concurrency.py --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+BASE_URL = os.getenv("ORDER_SERVICE_URL", "http://localhost:8002")
+
+ORDER = {
+    "user_id": "bench-user",
+    "restaurant_id": "bench-restaurant",
+    "delivery_address": "1 Bench Street",
+    "items": [{"product_id": "bench-dish", "product_name": "Phở bò", "quantity": 1, "unit_price": "55000"}],
+}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+
+async def worker(client, queue, latencies):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.post("/api/v1/orders/", json=ORDER)
+        response.raise_for_status()
+        order_id = response.json()["data"]["id"]
+        await client.put(f"/api/v1/orders/{order_id}", json={"delivery_note": "bench"})
+        latencies.append(time.perf_counter() - start)
+
+
+async def probe(client, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60.0, limits=limits) as client:
+        write_latencies, health_latencies = [], []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, health_latencies))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, queue, write_latencies) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe_task
+
+    print(f"create+update: {args.requests} in {elapsed:.2f}s ({args.requests / elapsed:.0f}/s)")
+    print(f"  p50 {percentile(write_latencies, 0.5):.1f}ms  p99 {percentile(write_latencies, 0.99):.1f}ms")
+    print(f"/health under load: mean {statistics.mean(health_latencies) * 1000:.1f}ms"
+          f"  p99 {percentile(health_latencies, 0.99):.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark: in-process fan-out capacity of the order status broker (one worker).
+
+Creates `--subscribers` consumers spread over `--orders` orders, publishes
+`--events` status events, and reports delivery latency and memory per subscriber.
+No database is needed; this measures the per-worker ceiling of the fan-out path.
+
+Usage:
+    python benchmarks/bench_order_fanout.py --subscribers 20000 --orders 5000 --events 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.order_events import OrderEventBroker  # noqa: E402
+
+
+async def consume(subscription, latencies, remaining):
+    while True:
+        payload = await subscription.queue.get()
+        latencies.append(time.perf_counter() - json.loads(payload)["sent"])
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            remaining[1].set()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+
+    broker = OrderEventBroker(dsn="unused", queue_size=16)
+    order_ids = [f"order-{i}" for i in range(args.orders)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions = [broker.subscribe(order_ids[i % args.orders]) for i in range(args.subscribers)]
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+    tracemalloc.stop()
+
+    published = [random.choice(order_ids) for _ in range(args.events)]
+    expected = sum(len(broker._subscribers[order_id]) for order_id in published)
+    latencies = []
+    remaining = [expected, asyncio.Event()]
+    consumers = [asyncio.create_task(consume(s, latencies, remaining)) for s in subscriptions]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for order_id in published:
+        payload = json.dumps({"order_id": order_id, "status": "restaurant_accepted", "sent": time.perf_counter()})
+        broker._on_notify(None, 0, broker.channel, payload)
+        await asyncio.sleep(0)
+    await asyncio.wait_for(remaining[1].wait(), timeout=60)
+    elapsed = time.perf_counter() - start
+
+    for consumer in consumers:
+        consumer.cancel()
+
+    latencies.sort()
+    print(f"{args.subscribers} subscribers on {args.orders} orders, {args.events} events")
+    print(f"delivered {len(latencies)} messages in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} msg/s)")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+    print(f"memory per idle subscriber: {per_subscriber:.0f} bytes; dropped: {broker.dropped}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
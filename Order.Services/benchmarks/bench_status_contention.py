@@ -0,0 +1,66 @@
+"""
+Benchmark: concurrent status transitions racing on the same orders.
+
+For each order, `--racers` clients send PUT status=restaurant_accepted at the same
+time. With the conditional UPDATE exactly one must get 200 and the rest 409.
+
+Usage (service must be running):
+    python benchmarks/bench_status_contention.py --orders 200 --racers 8
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+BASE_URL = os.getenv("ORDER_SERVICE_URL", "http://localhost:8002")
+
+ORDER = {
+    "user_id": "bench-user",
+    "restaurant_id": "bench-restaurant",
+    "delivery_address": "1 Bench Street",
+    "items": [{"product_id": "bench-dish", "product_name": "Bún chả", "quantity": 1, "unit_price": "50000"}],
+}
+
+
+async def race(client, order_id, racers, latencies):
+    async def one():
+        start = time.perf_counter()
+        response = await client.put(f"/api/v1/orders/{order_id}", json={"status": "restaurant_accepted"})
+        latencies.append(time.perf_counter() - start)
+        return response.status_code
+
+    return await asyncio.gather(*(one() for _ in range(racers)))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--racers", type=int, default=8)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.racers * 10)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60.0, limits=limits) as client:
+        batch = {"orders": [ORDER] * args.orders}
+        response = await client.post("/api/v1/orders/batch", json=batch)
+        response.raise_for_status()
+        order_ids = [row["id"] for row in response.json()["data"]]
+
+        latencies = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*(race(client, oid, args.racers, latencies) for oid in order_ids))
+        elapsed = time.perf_counter() - start
+
+    codes = Counter(code for result in results for code in result)
+    double_wins = sum(1 for result in results if result.count(200) > 1)
+    latencies.sort()
+    print(f"{len(latencies)} transitions in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"status codes: {dict(codes)}")
+    print(f"orders with more than one winner: {double_wins}")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.1f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
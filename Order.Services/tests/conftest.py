@@ -0,0 +1,130 @@
+"""
+Test fixtures: the orders router, behind the service middleware, on a SQLite database.
+
+The Postgres-only column types are compiled to SQLite equivalents and the
+database dependencies are overridden, so tests need no running Postgres. The
+sync and async (aiosqlite) engines share one database file per test.
+app.main is not imported: it creates the tables on the real database at import.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app import middleware, models
+from app.database import Base, get_async_db, get_db, get_read_db
+from app.routers import orders
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "CHAR(36)"
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_bigint(type_, compiler, **kw):
+    return "INTEGER"  # So autoincrement primary keys work
+
+
+def _add_postgres_functions(dbapi_connection, connection_record):
+    # Status changes select pg_notify(channel, payload); there is no listener under test
+    dbapi_connection.create_function("pg_notify", 2, lambda channel, payload: None)
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "orders.db"
+
+
+@pytest.fixture
+def engine(database_path):
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _add_postgres_functions)
+    # order_changes is only written by Postgres triggers (see the add_order_change_log migration)
+    Base.metadata.create_all(engine, tables=[table for table in Base.metadata.sorted_tables if table.name != "order_changes"])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def async_session_factory(database_path, engine):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    event.listen(async_engine.sync_engine, "connect", _add_postgres_functions)
+    yield async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    async_engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory, async_session_factory):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    middleware.install(app)
+    app.include_router(orders.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_orders(session_factory):
+    """Insert n orders with two items each, one second apart"""
+    def make(n: int):
+        start = datetime(2026, 1, 1)
+        with session_factory() as db:
+            for i in range(n):
+                created_at = start + timedelta(seconds=i)
+                db.add(models.Order(
+                    user_id="user-1", restaurant_id="1", delivery_address="227 Nguyễn Văn Cừ",
+                    created_at=created_at, updated_at=created_at,
+                    items=[
+                        models.OrderItem(product_id="1", product_name="Phở bò", quantity=1, unit_price=Decimal("50000")),
+                        models.OrderItem(product_id="2", product_name="Trà đá", quantity=2, unit_price=Decimal("5000")),
+                    ],
+                ))
+            db.commit()
+    return make
+
+
+@pytest.fixture
+def menu(monkeypatch):
+    """Menu validation on, against a fake Restaurants.Services; add DishInfo to dishes, read calls"""
+    from app.services import menu_service
+    from app.services.restaurant_service import restaurant_client
+
+    dishes = {}
+    calls = []
+
+    async def get_dishes(dish_ids):
+        calls.append(list(dish_ids))
+        return {dish_id: dishes[dish_id] for dish_id in dish_ids if dish_id in dishes}
+
+    monkeypatch.setattr(menu_service, "MENU_VALIDATION_ENABLED", True)
+    monkeypatch.setattr(restaurant_client, "get_dishes", get_dishes)
+    menu_service.dish_cache.clear()
+    yield dishes, calls
+    menu_service.dish_cache.clear()
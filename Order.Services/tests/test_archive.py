@@ -0,0 +1,51 @@
+"""User history merged from hot and archived orders"""
+import os
+from datetime import datetime
+
+import pytest
+
+from app import models
+from app.services import archive
+
+
+@pytest.fixture
+def archived(monkeypatch, tmp_path, make_orders, session_factory):
+    """10 orders; the 4 oldest archived in two segments of 2, the newer of which is deleted"""
+    monkeypatch.setattr(archive, "ORDER_ARCHIVE_DIR", str(tmp_path / "archive"))
+    make_orders(10)
+    with session_factory() as db:
+        oldest = db.query(models.Order).order_by(models.Order.created_at).limit(4).all()
+        for order in oldest:
+            order.status = "delivered"
+        db.commit()
+        cutoff = datetime(2027, 1, 1)
+        assert archive.archive_batch(db, cutoff, batch_size=2) == 2
+        assert archive.archive_batch(db, cutoff, batch_size=2) == 2
+        newest = db.query(models.OrderArchiveEntry).order_by(models.OrderArchiveEntry.created_at.desc()).first()
+        os.remove(os.path.join(archive.ORDER_ARCHIVE_DIR, newest.segment))
+    archive._read_segment.cache_clear()
+
+
+def test_unreadable_segment_does_not_end_pagination(client, archived):
+    seen = []
+    params = {"limit": 4, "include_total": False}
+    pages = 0
+    while True:
+        body = client.get("/api/v1/orders/user/user-1", params=params).json()
+        pages += 1
+        seen += [order["created_at"] for order in body["data"]]
+        if not body["next_cursor"]:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    # The second page loses its two unreadable orders but still leads to the third
+    assert pages == 3
+    assert len(seen) == 8
+    assert seen == sorted(seen, reverse=True)
+    assert seen[-1] == "2026-01-01T00:00:00"
+
+
+def test_count_with_created_range_includes_archived_orders(client, archived):
+    response = client.get("/api/v1/orders/user/user-1", params={"created_from": "2025-12-01T00:00:00", "limit": 1})
+
+    assert response.json()["total"] == 10
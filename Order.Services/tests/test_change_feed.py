@@ -0,0 +1,99 @@
+"""Restaurant/driver change feed read from order_changes"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, literal, text
+
+from app import crud, models
+
+
+@pytest.fixture
+def change_log(engine, session_factory, monkeypatch):
+    """
+    order_changes as the Postgres triggers would fill it; returns add(order, xid, present=True).
+    Every xid counts as finished unless the test lowers FINISHED_XID_BOUND.
+    """
+    monkeypatch.setattr(crud, "FINISHED_XID_BOUND", literal(10 ** 9))
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE order_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, scope VARCHAR(300) NOT NULL, "
+            "order_id CHAR(36) NOT NULL, xid INTEGER NOT NULL, present BOOLEAN NOT NULL, recorded_at DATETIME)"
+        ))
+
+    def add(order_id, xid, present=True, scope="restaurant:1"):
+        with session_factory() as db:
+            db.execute(insert(models.OrderChange).values(
+                scope=scope, order_id=order_id, xid=xid, present=present, recorded_at=datetime.utcnow()
+            ))
+            db.commit()
+
+    return add
+
+
+@pytest.fixture
+def orders(make_orders, session_factory):
+    make_orders(3)
+    with session_factory() as db:
+        return [order.id for order in db.query(models.Order).order_by(models.Order.created_at)]
+
+
+def feed(client, since, limit=100):
+    response = client.get("/api/v1/orders/restaurant/1", params={"since": since, "limit": limit})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return [order["id"] for order in body["data"]], body["removed"], body["next_since"]
+
+
+def test_each_order_appears_once_in_the_order_of_its_latest_change(client, change_log, orders, session_factory):
+    first, second, third = orders
+    change_log(first, xid=5)
+    change_log(second, xid=6)
+    change_log(first, xid=7)
+    change_log(third, xid=8, present=False)
+    with session_factory() as db:
+        db.query(models.OrderItem).filter(models.OrderItem.order_id == third).delete()
+        db.query(models.Order).filter(models.Order.id == third).delete()
+        db.commit()
+
+    ids, removed, since = feed(client, "")
+
+    assert ids == [str(second), str(first)]
+    assert removed == [{"id": str(third), "reason": "deleted"}]
+    assert crud.decode_since_token(since) == (8, 4)
+    assert feed(client, since) == ([], [], since)
+
+
+def test_pages_resume_after_the_token(client, change_log, orders):
+    for xid, order_id in enumerate(orders, start=1):
+        change_log(order_id, xid=xid)
+
+    ids, _, since = feed(client, "", limit=2)
+    rest, _, _ = feed(client, since, limit=2)
+
+    assert ids + rest == [str(order_id) for order_id in orders]
+
+
+def test_unfinished_transactions_are_held_back(client, change_log, orders, monkeypatch):
+    change_log(orders[0], xid=5)
+    change_log(orders[1], xid=9)  # Still running as far as the snapshot is concerned
+    monkeypatch.setattr(crud, "FINISHED_XID_BOUND", literal(9))
+
+    ids, _, since = feed(client, "")
+
+    assert ids == [str(orders[0])]
+    assert crud.decode_since_token(since) == (5, 1)
+
+
+def test_tokens_order_numerically_by_xid_then_seq():
+    positions = [(9, 100), (10, 2), (10, 11), (100, 1)]
+    decoded = [crud.decode_since_token(crud._encode_change_position(*position)) for position in positions]
+
+    assert decoded == positions == sorted(decoded)
+    assert crud.decode_since_token("") is None
+
+
+def test_malformed_since_token_is_rejected(client):
+    response = client.get("/api/v1/orders/restaurant/1", params={"since": "bm90LWEtdG9rZW4"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid since token")
@@ -0,0 +1,78 @@
+"""Grid index of driver locations (driver_index.DriverIndex) against a brute-force search"""
+import math
+import random
+
+import pytest
+
+from app.services.driver_index import METERS_PER_DEGREE, DriverIndex
+from app.services.driver_service import DriverLocation
+
+
+class CountingCells(dict):
+    """Cell dict that counts lookups, to measure how many cells a query visits"""
+    lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+def index_of(points):
+    index = DriverIndex(cell_meters=250)
+    for i, (lat, lng) in enumerate(points):
+        index.update(DriverLocation(driver_id=f"d{i}", latitude=lat, longitude=lng))
+    return index
+
+
+def brute_force(points, latitude, longitude, radius_m):
+    """(driver_id, distance) within radius_m, closest first, with the index's distance approximation"""
+    ky = METERS_PER_DEGREE
+    kx = METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-9)
+    found = []
+    for i, (lat, lng) in enumerate(points):
+        distance = math.hypot((lat - latitude) * ky, ((lng - longitude + 180) % 360 - 180) * kx)
+        if distance <= radius_m:
+            found.append((distance, f"d{i}"))
+    return [driver_id for _, driver_id in sorted(found)]
+
+
+@pytest.mark.parametrize("radius_m", [1000, 3000])  # Box and ring search; band scan
+@pytest.mark.parametrize("latitude, longitude", [
+    (10.7626, 106.6602),  # Ho Chi Minh City
+    (0.0, 179.99),  # Antimeridian
+    (-45.0, -179.995),
+    (89.9, 30.0),  # Near the pole
+])
+def test_queries_match_brute_force(latitude, longitude, radius_m):
+    rng = random.Random(42)
+    points = [
+        (max(-90.0, min(90.0, latitude + rng.uniform(-0.05, 0.05))), (longitude + rng.uniform(-0.05, 0.05) + 180) % 360 - 180)
+        for _ in range(300)
+    ]
+    index = index_of(points)
+
+    within = [location.driver_id for location, _ in index.within(latitude, longitude, radius_m)]
+    nearest = [location.driver_id for location, _ in index.nearest(latitude, longitude, 10, max_radius_m=radius_m)]
+
+    expected = brute_force(points, latitude, longitude, radius_m)
+    assert within == expected
+    assert nearest == expected[:10]
+
+
+def test_finds_drivers_across_the_antimeridian():
+    index = index_of([(0.0, 179.999), (0.0, -179.999)])
+
+    assert {location.driver_id for location, _ in index.within(0.0, -179.9995, 500)} == {"d0", "d1"}
+    assert [location.driver_id for location, _ in index.nearest(0.0, 179.9995, 1)] in (["d0"], ["d1"])
+
+
+def test_query_near_pole_visits_no_more_than_the_occupied_cells():
+    index = index_of([(10.0 + i * 0.01, 106.0) for i in range(50)] + [(89.999, 0.0)])
+    index._cells = CountingCells(index._cells)
+
+    within = index.within(89.999, 120.0, 5000)
+    nearest = index.nearest(89.999, 120.0, 5, max_radius_m=20000)
+
+    assert [location.driver_id for location, _ in within] == ["d50"]
+    assert [location.driver_id for location, _ in nearest] == ["d50"]
+    assert index._cells.lookups == 0  # Scanned the occupied cells of the band instead of the box
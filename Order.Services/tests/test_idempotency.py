@@ -0,0 +1,96 @@
+"""Idempotency-Key replay, mismatch and claim races"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app import models
+from app.services import idempotency
+
+
+def order_body(delivery_note=None):
+    return {
+        "user_id": "user-1",
+        "restaurant_id": "10",
+        "delivery_address": "227 Nguyễn Văn Cừ",
+        "delivery_note": delivery_note,
+        "items": [{"product_id": "1", "product_name": "Phở bò", "quantity": 1, "unit_price": "50000"}],
+    }
+
+
+def order_count(session_factory):
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(models.Order))
+
+
+def test_retry_replays_the_first_response(client, session_factory):
+    headers = {"Idempotency-Key": "order-1"}
+
+    first = client.post("/api/v1/orders/", json=order_body(), headers=headers)
+    retry = client.post("/api/v1/orders/", json=order_body(), headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["data"]["id"] == first.json()["data"]["id"]
+    assert retry.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert idempotency.REPLAYED_HEADER not in first.headers
+    assert order_count(session_factory) == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, session_factory):
+    headers = {"Idempotency-Key": "order-1"}
+    client.post("/api/v1/orders/", json=order_body(), headers=headers)
+
+    response = client.post("/api/v1/orders/", json=order_body(delivery_note="Gọi trước"), headers=headers)
+
+    assert response.status_code == 422
+    assert order_count(session_factory) == 1
+
+
+def test_expired_key_is_taken_over(client, session_factory):
+    headers = {"Idempotency-Key": "order-1"}
+    first = client.post("/api/v1/orders/", json=order_body(), headers=headers)
+    with session_factory() as db:
+        db.query(models.IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+
+    retry = client.post("/api/v1/orders/", json=order_body(delivery_note="Gọi trước"), headers=headers)
+
+    assert retry.status_code == 201
+    assert retry.json()["data"]["id"] != first.json()["data"]["id"]
+    assert order_count(session_factory) == 2
+
+
+def test_claim_retries_when_the_key_is_swept_in_between(async_session_factory):
+    key, fingerprint = idempotency.key_hash("order-1"), b"0" * 16
+
+    async def scenario():
+        async with async_session_factory() as db:
+            db.add(models.IdempotencyKey(
+                key_hash=key, request_hash=fingerprint, status_code=201, response_body=b"",
+                expires_at=datetime.utcnow() + timedelta(seconds=60),
+            ))
+            await db.commit()
+
+            # The sweeper deletes the row right after the INSERT hit the conflict
+            execute = db.execute
+            statements = []
+
+            async def sweep_after_insert(statement, *args, **kwargs):
+                result = await execute(statement, *args, **kwargs)
+                statements.append(statement)
+                if len(statements) == 1:
+                    await execute(delete(models.IdempotencyKey))
+                return result
+
+            db.execute = sweep_after_insert
+            claimed = await idempotency.claim(db, key, fingerprint)
+            del db.execute
+            await db.commit()
+            stored = (await db.execute(select(models.IdempotencyKey))).scalar_one()
+            return claimed, stored, len(statements)
+
+    claimed, stored, executed = asyncio.run(scenario())
+
+    assert claimed is None  # Owned by the caller, not a replay of a missing row
+    assert stored.status_code is None
+    assert executed == 3  # INSERT, SELECT, INSERT
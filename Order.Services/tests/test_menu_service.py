@@ -0,0 +1,43 @@
+"""Menu checks against Restaurants.Services (menu_service, restaurant_service)"""
+import asyncio
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app import schemas
+from app.services import menu_service
+from app.services.restaurant_service import RestaurantServiceClient
+
+
+def new_order(product_id="1"):
+    return schemas.OrderCreate(
+        user_id="user-1", restaurant_id="10", delivery_address="227 Nguyễn Văn Cừ",
+        items=[schemas.OrderItemCreate(product_id=product_id, product_name="Phở", quantity=1, unit_price=Decimal("1"))],
+    )
+
+
+def test_validation_off_skips_restaurants_service(monkeypatch):
+    monkeypatch.setattr(menu_service, "MENU_VALIDATION_ENABLED", False)
+    order = new_order(product_id="not-a-dish")
+
+    assert asyncio.run(menu_service.verify_order_items(order)) == order
+
+
+def test_dish_lookup_fails_fast_once_breaker_opens(monkeypatch):
+    monkeypatch.setenv("RESTAURANT_SERVICE_BREAKER_FAILURE_THRESHOLD", "2")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(500)
+
+    client = RestaurantServiceClient(base_url="http://restaurants")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def lookups():
+        return [await client.get_dishes([1, 2]) for _ in range(4)]
+
+    assert asyncio.run(lookups()) == [None] * 4
+    assert len(requests) == 2
+    assert client.breaker("GET /api/v1/menu/dishes").state == "open"
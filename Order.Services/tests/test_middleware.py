@@ -0,0 +1,46 @@
+"""Requests through the full middleware stack (middleware.install)"""
+import pytest
+
+from app import sql_accounting
+from app.database import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, replicas
+
+
+@pytest.fixture
+def with_replica(monkeypatch):
+    # ReadYourWritesMiddleware only acts when replicas are configured; it never reads from them
+    monkeypatch.setattr(replicas, "replicas", [object()])
+
+
+@pytest.fixture(params=[True, False], ids=["sql_accounting", "no_sql_accounting"])
+def sql_accounting_enabled(request, monkeypatch):
+    monkeypatch.setattr(sql_accounting, "SQL_ACCOUNTING_ENABLED", request.param)
+    return request.param
+
+
+def test_read_passes_through_stack(client, make_orders, sql_accounting_enabled):
+    make_orders(3)
+
+    response = client.get("/api/v1/orders/", params={"include_total": False})
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
+    assert ("server-timing" in response.headers) == sql_accounting_enabled
+    assert READ_YOUR_WRITES_HEADER not in response.headers
+
+
+def test_write_sets_read_your_writes_token(client, with_replica, sql_accounting_enabled):
+    client.app.add_api_route("/echo", lambda: {"ok": True}, methods=["POST"])
+
+    response = client.post("/echo")
+
+    assert response.status_code == 200
+    assert float(response.headers[READ_YOUR_WRITES_HEADER]) > 0
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+    assert ("server-timing" in response.headers) == sql_accounting_enabled
+
+
+def test_failed_write_sets_no_token(client, with_replica):
+    response = client.post("/api/v1/orders/", json={})
+
+    assert response.status_code == 422
+    assert READ_YOUR_WRITES_HEADER not in response.headers
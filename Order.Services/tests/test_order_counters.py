@@ -0,0 +1,48 @@
+"""Sharded order counters behind the list totals"""
+from sqlalchemy import select
+
+from app import crud, models
+
+
+def order_body(user_id):
+    return {
+        "user_id": user_id,
+        "restaurant_id": "10",
+        "delivery_address": "227 Nguyễn Văn Cừ",
+        "items": [{"product_id": "1", "product_name": "Phở bò", "quantity": 1, "unit_price": "50000"}],
+    }
+
+
+def counters(session_factory):
+    with session_factory() as db:
+        return dict(db.execute(select(models.OrderCounter.scope, models.OrderCounter.count)).all())
+
+
+def total(client, path):
+    return client.get(path, params={"limit": 1}).json()["total"]
+
+
+def test_created_orders_are_counted_across_shards(client, session_factory):
+    ids = [client.post("/api/v1/orders/", json=order_body(f"user-{i % 2}")).json()["data"]["id"] for i in range(12)]
+    client.post("/api/v1/orders/batch", json={"orders": [order_body("user-0"), order_body("user-2")]})
+
+    rows = counters(session_factory)
+    shards = {scope: count for scope, count in rows.items() if scope in crud.ALL_ORDERS_SCOPES}
+    assert sum(shards.values()) == 14
+    assert len(shards) > 1  # Spread over the shards by order id
+    assert (rows["user:user-0"], rows["user:user-1"], rows["user:user-2"]) == (7, 6, 1)
+    assert total(client, "/api/v1/orders/") == 14
+    assert total(client, "/api/v1/orders/user/user-0") == 7
+
+    client.delete(f"/api/v1/orders/{ids[0]}")
+
+    assert total(client, "/api/v1/orders/") == 13
+    assert total(client, "/api/v1/orders/user/user-0") == 6
+
+
+def test_unseeded_counters_fall_back_to_count(client, make_orders, session_factory):
+    make_orders(5)  # Inserted directly, so no counter rows exist
+
+    assert counters(session_factory) == {}
+    assert total(client, "/api/v1/orders/") == 5
+    assert total(client, "/api/v1/orders/user/user-1") == 5
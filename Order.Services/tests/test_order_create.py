@@ -0,0 +1,108 @@
+"""Order creation: menu checks, batches, outbox rows and Idempotency-Key replay"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app import models
+from app.services.restaurant_service import DishInfo
+
+
+@pytest.fixture
+def dishes(menu):
+    dishes, calls = menu
+    dishes[1] = DishInfo(1, "10", "Phở bò", Decimal("50000"), Decimal("45000"), True, stock_quantity=5)
+    dishes[2] = DishInfo(2, "10", "Trà đá", Decimal("5000"), None, True)
+    return calls
+
+
+def order_body(unit_price="45000", quantity=1, product_id="1", user_id="user-1"):
+    return {
+        "user_id": user_id,
+        "restaurant_id": "10",
+        "delivery_address": "227 Nguyễn Văn Cừ",
+        "items": [
+            {"product_id": product_id, "product_name": "tên do client gửi", "quantity": quantity, "unit_price": unit_price},
+            {"product_id": "2", "product_name": "Trà đá", "quantity": 2, "unit_price": "5000"},
+        ],
+    }
+
+
+def count(session_factory, model):
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def test_create_order_uses_menu_name_and_writes_outbox(client, session_factory, dishes):
+    response = client.post("/api/v1/orders/", json=order_body())
+
+    assert response.status_code == 201, response.text
+    order = response.json()["data"]
+    assert order["items"][0]["product_name"] == "Phở bò"
+    assert Decimal(order["total_amount"]) == Decimal("70000")
+    with session_factory() as db:
+        assert db.scalars(select(models.OrderOutbox.event_type)).all() == ["pending_restaurant"]
+
+
+@pytest.mark.parametrize("body, status_code", [
+    (order_body(unit_price="50000"), 409),  # Not the discounted price
+    (order_body(quantity=6), 409),  # Out of stock
+    (order_body(product_id="99"), 400),  # Not on the menu
+])
+def test_create_order_rejects_items_not_matching_menu(client, session_factory, dishes, body, status_code):
+    response = client.post("/api/v1/orders/", json=body)
+
+    assert response.status_code == status_code, response.text
+    assert count(session_factory, models.Order) == 0
+
+
+def test_batch_checks_all_orders_with_one_menu_call(client, session_factory, dishes):
+    response = client.post("/api/v1/orders/batch", json={"orders": [order_body(), order_body(user_id="user-2")]})
+
+    assert response.status_code == 201, response.text
+    assert [row["index"] for row in response.json()["data"]] == [0, 1]
+    assert dishes == [[1, 2]]
+    assert count(session_factory, models.Order) == 2
+    assert count(session_factory, models.OrderOutbox) == 2
+    with session_factory() as db:
+        assert set(db.scalars(select(models.OrderItem.product_name))) == {"Phở bò", "Trà đá"}
+
+
+def test_batch_rejects_a_client_price_and_creates_nothing(client, session_factory, dishes):
+    response = client.post("/api/v1/orders/batch", json={"orders": [order_body(), order_body(unit_price="1000")]})
+
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith("Đơn hàng thứ 1:")
+    assert count(session_factory, models.Order) == 0
+    assert count(session_factory, models.OrderOutbox) == 0
+
+
+def test_batch_checks_stock_across_orders(client, session_factory, dishes):
+    response = client.post("/api/v1/orders/batch", json={"orders": [order_body(quantity=3), order_body(quantity=3)]})
+
+    assert response.status_code == 409
+    assert count(session_factory, models.Order) == 0
+
+
+def test_menu_unavailable_returns_503(client, monkeypatch, dishes):
+    from app.services.restaurant_service import restaurant_client
+
+    async def unavailable(dish_ids):
+        return None
+
+    monkeypatch.setattr(restaurant_client, "get_dishes", unavailable)
+
+    assert client.post("/api/v1/orders/", json=order_body()).status_code == 503
+
+
+def test_batch_retry_with_idempotency_key_replays(client, session_factory, dishes):
+    body = {"orders": [order_body(), order_body(user_id="user-2")]}
+    headers = {"Idempotency-Key": "batch-1"}
+
+    first = client.post("/api/v1/orders/batch", json=body, headers=headers)
+    retry = client.post("/api/v1/orders/batch", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert count(session_factory, models.Order) == 2
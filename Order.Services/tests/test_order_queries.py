@@ -0,0 +1,33 @@
+"""Statement counts of order list endpoints (guards against N+1 item loading)"""
+import pytest
+from sqlalchemy import event
+
+from app import serialization
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("fast_json", [True, False])
+def test_read_orders_page_loads_items_in_one_query(client, make_orders, statements, monkeypatch, fast_json):
+    monkeypatch.setattr(serialization, "FAST_JSON_RESPONSES", fast_json)
+    make_orders(100)
+    statements.clear()
+
+    response = client.get("/api/v1/orders/", params={"limit": 100, "include_total": False})
+
+    assert response.status_code == 200
+    orders = response.json()["data"]
+    assert len(orders) == 100
+    assert all(len(order["items"]) == 2 for order in orders)
+    # One SELECT for the page of orders, one SELECT ... IN for all of their items
+    assert len(statements) == 2, statements
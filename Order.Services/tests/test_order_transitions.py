@@ -0,0 +1,66 @@
+"""PUT /orders/{id} status transitions: 400 invalid, 409 changed underneath, 404 missing"""
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app import crud_async, models
+
+
+@pytest.fixture
+def order_id(make_orders, session_factory):
+    make_orders(1)
+    with session_factory() as db:
+        return str(db.scalar(select(models.Order.id)))
+
+
+def set_status(session_factory, order_id, status):
+    with session_factory() as db:
+        db.execute(update(models.Order).where(models.Order.id == uuid.UUID(order_id)).values(status=status))
+        db.commit()
+
+
+def put_status(client, order_id, status):
+    return client.put(f"/api/v1/orders/{order_id}", json={"status": status})
+
+
+def test_valid_transition_writes_outbox_row(client, session_factory, order_id):
+    response = put_status(client, order_id, "restaurant_accepted")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["status"] == "restaurant_accepted"
+    with session_factory() as db:
+        assert db.scalars(select(models.OrderOutbox.event_type)).all() == ["restaurant_accepted"]
+
+
+def test_invalid_transition_returns_400(client, session_factory, order_id):
+    set_status(session_factory, order_id, "driver_accepted")
+
+    response = put_status(client, order_id, "restaurant_accepted")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid status transition from driver_accepted to restaurant_accepted"
+
+
+def test_status_changed_underneath_returns_409(client, session_factory, order_id, monkeypatch):
+    read_status = crud_async.get_order_status
+
+    async def read_then_lose_race(db, oid):
+        status = await read_status(db, oid)
+        # Another request wins between validation and the conditional UPDATE
+        set_status(session_factory, order_id, "restaurant_rejected")
+        return status
+
+    monkeypatch.setattr(crud_async, "get_order_status", read_then_lose_race)
+
+    response = put_status(client, order_id, "restaurant_accepted")
+
+    assert response.status_code == 409
+    assert "restaurant_rejected" in response.json()["detail"]
+    with session_factory() as db:
+        assert db.scalar(select(models.Order.status)) == "restaurant_rejected"
+        assert db.scalars(select(models.OrderOutbox)).all() == []
+
+
+def test_missing_order_returns_404(client):
+    assert put_status(client, str(uuid.uuid4()), "restaurant_accepted").status_code == 404
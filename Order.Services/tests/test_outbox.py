@@ -0,0 +1,57 @@
+"""Outbox dispatch (OutboxDispatcher) on the async SQLite session"""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.services import outbox
+from app.services.status_handler import StatusHandler
+
+
+@pytest.fixture
+def outbox_row(make_orders, session_factory):
+    make_orders(1)
+    with session_factory() as db:
+        order_id = db.scalar(select(models.Order.id))
+        db.add(models.OrderOutbox(order_id=order_id, event_type="restaurant_accepted"))
+        db.commit()
+
+
+def dispatch_once(async_session_factory, lease_seconds=1.0):
+    dispatcher = outbox.OutboxDispatcher(session_factory=async_session_factory, lease_seconds=lease_seconds)
+    return asyncio.run(dispatcher.dispatch_batch())
+
+
+def stored_row(session_factory):
+    with session_factory() as db:
+        return db.scalars(select(models.OrderOutbox)).one()
+
+
+def test_dispatch_marks_row_done(outbox_row, async_session_factory, session_factory, monkeypatch):
+    handled = []
+
+    async def handle(self, order, status):
+        handled.append((order.id, status))
+
+    monkeypatch.setattr(StatusHandler, "handle_status_update", handle)
+
+    assert dispatch_once(async_session_factory) == 1
+    row = stored_row(session_factory)
+    assert row.status == "done"
+    assert [status for _, status in handled] == ["restaurant_accepted"]
+
+
+def test_attempt_is_cut_off_within_its_lease(outbox_row, async_session_factory, session_factory, monkeypatch):
+    async def slow(self, order, status):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(StatusHandler, "handle_status_update", slow)
+
+    dispatch_once(async_session_factory, lease_seconds=0.2)
+
+    row = stored_row(session_factory)
+    assert row.status == "pending"
+    assert row.attempts == 1
+    # Rescheduled by backoff, not left to the lease
+    assert row.available_at > row.created_at
@@ -0,0 +1,65 @@
+"""Keyset (cursor) pagination of order lists"""
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app import crud, models
+
+
+def walk(client, path, limit, **params):
+    """Follow next_cursor from the first page to the last; returns the pages of ids"""
+    pages = []
+    params["limit"] = limit
+    while True:
+        body = client.get(path, params=params).json()
+        pages.append([order["id"] for order in body["data"]])
+        if not body["next_cursor"]:
+            return pages
+        params["cursor"] = body["next_cursor"]
+
+
+def test_cursor_walks_every_order_once_newest_first(client, make_orders):
+    make_orders(20)
+
+    pages = walk(client, "/api/v1/orders/", 7, include_total=False)
+    offset = client.get("/api/v1/orders/", params={"limit": 100, "include_total": False}).json()["data"]
+
+    assert [len(page) for page in pages] == [7, 7, 6]
+    assert sum(pages, []) == [order["id"] for order in offset]
+
+
+def test_cursor_breaks_created_at_ties_on_id(client, session_factory):
+    created_at = datetime(2026, 1, 1)
+    ids = sorted((uuid.uuid4() for _ in range(5)), reverse=True)
+    with session_factory() as db:
+        db.add_all(
+            models.Order(id=order_id, user_id="user-1", restaurant_id="1", delivery_address="227 Nguyễn Văn Cừ",
+                         created_at=created_at, updated_at=created_at)
+            for order_id in ids
+        )
+        db.commit()
+
+    pages = walk(client, "/api/v1/orders/user/user-1", 2, include_total=False)
+
+    assert sum(pages, []) == [str(order_id) for order_id in ids]
+
+
+def test_full_last_page_is_followed_by_an_empty_one(client, make_orders):
+    make_orders(4)
+
+    assert [len(page) for page in walk(client, "/api/v1/orders/", 2, include_total=False)] == [2, 2, 0]
+
+
+def test_cursor_round_trip():
+    order = models.Order(id=uuid.uuid4(), created_at=datetime(2026, 1, 1, 12, 30, 15, 123456))
+
+    assert crud.decode_cursor(crud.encode_cursor(order)) == (order.created_at, order.id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "MjAyNi0wMS0wMQ"])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get("/api/v1/orders/", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid cursor")
@@ -0,0 +1,21 @@
+"""Partition maintainer startup"""
+import asyncio
+
+from app.services import partitions
+
+
+class FailingEngine:
+    def begin(self):
+        raise ConnectionError("database unavailable")
+
+
+def test_failed_first_run_does_not_block_startup():
+    maintainer = partitions.PartitionMaintainer(engine=FailingEngine(), interval=3600)
+
+    async def scenario():
+        await maintainer.start()
+        running = maintainer._task is not None
+        await maintainer.stop()
+        return running
+
+    assert asyncio.run(scenario())
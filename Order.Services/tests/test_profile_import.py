@@ -0,0 +1,55 @@
+"""Profile import batches that lose a race on a unique key"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services import profile_import
+
+
+class UniqueViolation(Exception):
+    class diag:
+        message_detail = "Key (email)=(lan@example.com) already exists."
+
+
+ROWS = [
+    (2, {"user_id": "user-1", "name": "Lan", "email": "lan@example.com", "phone": "0901000001"}),
+    (3, {"user_id": "user-2", "name": "Minh", "email": "minh@example.com", "phone": "0901000002"}),
+]
+
+
+@pytest.fixture
+def merges(monkeypatch):
+    """merge_batch that fails with a unique violation the first `failures` times"""
+    calls = []
+
+    def install(failures):
+        def merge_batch(db, profiles):
+            calls.append([index for index, _ in profiles])
+            if len(calls) <= failures:
+                raise IntegrityError("INSERT INTO profiles ...", {}, UniqueViolation())
+            return profile_import.ImportResult(inserted=len(profiles))
+
+        monkeypatch.setattr(profile_import, "merge_batch", merge_batch)
+        return calls
+
+    return install
+
+
+def test_batch_is_retried_after_a_lost_race(merges, session_factory):
+    calls = merges(failures=1)
+
+    result = profile_import.import_rows(ROWS, session_factory=session_factory)
+
+    assert calls == [[2, 3], [2, 3]]
+    assert result.inserted == 2
+    assert result.conflicts == []
+
+
+def test_batch_failing_twice_is_reported_with_the_key(merges, session_factory):
+    calls = merges(failures=2)
+
+    result = profile_import.import_rows(ROWS, session_factory=session_factory)
+
+    assert len(calls) == 2
+    assert result.inserted == 0
+    assert [conflict["index"] for conflict in result.conflicts] == [2, 3]
+    assert result.conflicts[0]["reason"] == "batch not imported: Key (email)=(lan@example.com) already exists."
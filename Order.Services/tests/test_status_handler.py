@@ -0,0 +1,17 @@
+"""Status transition table (StatusHandler) and the statuses derived from it"""
+from app import crud, schemas
+from app.services.status_handler import TERMINAL_STATUSES, VALID_TRANSITIONS, StatusHandler
+
+
+def test_sales_statuses_are_terminal_and_reachable():
+    reachable = {status.value for targets in VALID_TRANSITIONS.values() for status in targets}
+    assert crud.SALES_STATUSES == {"driver_accepted"}
+    assert crud.SALES_STATUSES <= reachable
+    assert crud.SALES_STATUSES <= {status.value for status in TERMINAL_STATUSES}
+
+
+def test_no_transition_leaves_a_sales_status():
+    handler = StatusHandler(db=None)
+    for current in crud.SALES_STATUSES:
+        for status in schemas.OrderStatus:
+            assert not handler.validate_status_transition(current, status)
@@ -10,10 +10,12 @@ from app.schemas.menu import (
     MenuItemCreate, MenuItemUpdate, MenuItemResponse
 )
 from app.crud import menu as crud_menu
-from app.utils import save_dish_image
+from app.utils import save_dish_image, FAST_JSON_RESPONSES, dish_list_response
 
 router = APIRouter()
 
+MAX_DISH_IDS = 100  # Per batch lookup (GET /dishes?ids=...)
+
 
 # ==================== CATEGORY ENDPOINTS ====================
 
@@ -187,16 +189,37 @@ def list_dishes(
     - **category_id**: Filter by specific category
     - **available_only**: Only show items that are in stock
     """
-    return crud_menu.get_dishes_by_restaurant(
+    dishes = crud_menu.get_dishes_by_restaurant(
         db, 
         restaurant_id, 
         category_id=category_id,
-        available_only=available_only
+        available_only=available_only,
+        as_rows=FAST_JSON_RESPONSES
     )
+    if FAST_JSON_RESPONSES:
+        return dish_list_response(dishes)
+    return dishes
+
+
+def _parse_dish_ids(ids: str) -> List[int]:
+    try:
+        dish_ids = sorted({int(value) for value in ids.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of dish IDs"
+        )
+    if len(dish_ids) > MAX_DISH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_DISH_IDS} dish IDs per request"
+        )
+    return dish_ids
 
 
 @router.get("/dishes", response_model=List[MenuItemResponse])
 def list_all_dishes(
+    ids: Optional[str] = Query(None, description="Comma-separated dish IDs to look up (max 100)"),
     category_id: Optional[int] = Query(None, description="Filter by category"),
     available_only: bool = Query(False, description="Show only available items"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -207,6 +230,8 @@ def list_all_dishes(
     Get all menu items from all restaurants with optional filters.
     
     **Query Parameters:**
+    - **ids** (optional): Batch lookup of specific dishes, e.g. `ids=3,8,15` (max 100).
+      Unknown IDs are left out of the result; skip/limit are ignored.
     - **category_id** (optional): Filter by specific category
     - **available_only** (optional): Only show items that are in stock (default: false)
     - **skip** (optional): Number of records to skip for pagination (default: 0)
@@ -215,13 +240,26 @@ def list_all_dishes(
     **Returns:**
     List of dishes from all restaurants
     """
-    return crud_menu.get_all_dishes(
-        db,
-        category_id=category_id,
-        available_only=available_only,
-        skip=skip,
-        limit=limit
-    )
+    if ids is not None:
+        dishes = crud_menu.get_dishes_by_ids(
+            db,
+            _parse_dish_ids(ids),
+            category_id=category_id,
+            available_only=available_only,
+            as_rows=FAST_JSON_RESPONSES
+        )
+    else:
+        dishes = crud_menu.get_all_dishes(
+            db,
+            category_id=category_id,
+            available_only=available_only,
+            skip=skip,
+            limit=limit,
+            as_rows=FAST_JSON_RESPONSES
+        )
+    if FAST_JSON_RESPONSES:
+        return dish_list_response(dishes)
+    return dishes
 
 
 @router.get("/categories/{category_id}/dishes", response_model=List[MenuItemResponse])
@@ -16,6 +16,7 @@ from app.crud.menu import (
     get_dish,
     get_dishes_by_restaurant,
     get_all_dishes,
+    get_dishes_by_ids,
     get_dishes_by_category,
     update_dish,
     toggle_dish_availability,
@@ -39,6 +40,7 @@ __all__ = [
     "get_dish",
     "get_dishes_by_restaurant",
     "get_all_dishes",
+    "get_dishes_by_ids",
     "get_dishes_by_category",
     "update_dish",
     "toggle_dish_availability",
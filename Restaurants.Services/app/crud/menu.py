@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from app.models.menu import Category, MenuItem
+from app.utils.serialization import DISH_FIELDS
 from app.schemas.menu import (
     CategoryCreate, CategoryUpdate,
     MenuItemCreate, MenuItemUpdate
@@ -72,11 +73,19 @@ def get_dish(db: Session, dish_id: int) -> Optional[MenuItem]:
     return db.query(MenuItem).filter(MenuItem.id == dish_id).first()
 
 
+def _dish_query(db: Session, as_rows: bool):
+    """Query over MenuItem objects, or over plain tuples in DISH_FIELDS order"""
+    if as_rows:
+        return db.query(*(getattr(MenuItem, field) for field in DISH_FIELDS))
+    return db.query(MenuItem)
+
+
 def get_dishes_by_restaurant(
     db: Session, 
     restaurant_id: int,
     category_id: Optional[int] = None,
-    available_only: bool = False
+    available_only: bool = False,
+    as_rows: bool = False
 ) -> List[MenuItem]:
     """
     Get all menu items for a restaurant with optional filters
@@ -86,8 +95,9 @@ def get_dishes_by_restaurant(
         restaurant_id: Restaurant ID
         category_id: Optional filter by category
         available_only: If True, only return available items
+        as_rows: If True, return plain row tuples (see DISH_FIELDS) instead of MenuItem objects
     """
-    query = db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id)
+    query = _dish_query(db, as_rows).filter(MenuItem.restaurant_id == restaurant_id)
     
     if category_id is not None:
         query = query.filter(MenuItem.category_id == category_id)
@@ -103,7 +113,8 @@ def get_all_dishes(
     category_id: Optional[int] = None,
     available_only: bool = False,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    as_rows: bool = False
 ) -> List[MenuItem]:
     """
     Get all menu items from all restaurants with optional filters
@@ -114,8 +125,9 @@ def get_all_dishes(
         available_only: If True, only return available items
         skip: Number of records to skip for pagination
         limit: Maximum number of records to return
+        as_rows: If True, return plain row tuples (see DISH_FIELDS) instead of MenuItem objects
     """
-    query = db.query(MenuItem)
+    query = _dish_query(db, as_rows)
     
     if category_id is not None:
         query = query.filter(MenuItem.category_id == category_id)
@@ -126,6 +138,34 @@ def get_all_dishes(
     return query.offset(skip).limit(limit).all()
 
 
+def get_dishes_by_ids(
+    db: Session,
+    dish_ids: List[int],
+    category_id: Optional[int] = None,
+    available_only: bool = False,
+    as_rows: bool = False
+) -> List[MenuItem]:
+    """
+    Get the menu items with the given IDs in one query; unknown IDs are left out
+
+    Args:
+        db: Database session
+        dish_ids: Menu item IDs
+        category_id: Optional filter by category
+        available_only: If True, only return available items
+        as_rows: If True, return plain row tuples (see DISH_FIELDS) instead of MenuItem objects
+    """
+    query = _dish_query(db, as_rows).filter(MenuItem.id.in_(dish_ids))
+
+    if category_id is not None:
+        query = query.filter(MenuItem.category_id == category_id)
+
+    if available_only:
+        query = query.filter(MenuItem.is_available == True)
+
+    return query.order_by(MenuItem.id).all()
+
+
 def get_dishes_by_category(db: Session, category_id: int) -> List[MenuItem]:
     """Get all menu items in a category"""
     return db.query(MenuItem).filter(MenuItem.category_id == category_id).all()
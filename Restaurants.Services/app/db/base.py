@@ -3,11 +3,14 @@ from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from dotenv import load_dotenv
 import os
 
+from app.utils.metrics import TimedQueuePool, register_pool
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, pool_logging_name="primary")
+register_pool("primary", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
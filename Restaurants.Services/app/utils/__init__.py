@@ -5,11 +5,15 @@ from app.utils.file_upload import (
     delete_file,
     ensure_upload_directories
 )
+from app.utils.serialization import FAST_JSON_RESPONSES, DISH_FIELDS, dish_list_response
 
 __all__ = [
     "save_business_license",
     "save_food_safety_certificate",
     "save_dish_image",
     "delete_file",
-    "ensure_upload_directories"
+    "ensure_upload_directories",
+    "FAST_JSON_RESPONSES",
+    "DISH_FIELDS",
+    "dish_list_response"
 ]
@@ -0,0 +1,34 @@
+"""
+Fast JSON path for dish list endpoints.
+
+With FAST_JSON_RESPONSES enabled, dish lists are read as plain row tuples and
+encoded by orjson directly, skipping from_attributes validation of
+List[MenuItemResponse]. The JSON matches what the response_model would emit.
+"""
+import os
+from decimal import Decimal
+from typing import Any, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+# Column order of MenuItemResponse
+DISH_FIELDS = (
+    "name", "description", "price", "discounted_price", "image_url",
+    "category_id", "is_available", "stock_quantity", "id", "restaurant_id",
+)
+
+
+def _default(value: Any) -> Any:
+    # pydantic emits Decimal as a JSON string; orjson has no native Decimal support
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dish_list_response(rows: Sequence) -> Response:
+    """Encode a List[MenuItemResponse]-shaped payload from dish rows"""
+    payload = [dict(zip(DISH_FIELDS, row)) for row in rows]
+    return Response(orjson.dumps(payload, default=_default), media_type="application/json")